@@ -1,16 +1,34 @@
 # ... (existing imports) ...
 from datetime import datetime, timedelta
 from App.controllers.room import get_room
+from App.controllers.location_cache import get_location_snapshot
+from App.controllers.csvsource import open_csv_source
 from App.models import Asset, Room
-import os, csv
+import os, csv, json, base64
+from itertools import islice
 from App.controllers.assignee import *
-from App.controllers.scanevent import add_scan_event
+from App.controllers.scanevent import add_scan_event, add_scan_events_bulk
+from App.controllers.status_counts import adjust_status_counts
+from App.controllers.dataversion import bump_data_version
 from flask_jwt_extended import current_user
 from sqlalchemy.exc import IntegrityError # Import IntegrityError
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import aliased
 
 from App.database import db
 from App.models.room import Room
+from App.models.asset import NO_LAST_UPDATE
+from App.models.floor import Floor
+from App.models.assignee import Assignee, assignee_name_key
 from App.models.scanevent import ScanEvent
+from App.models.scaneventarchive import ScanEventArchive
+
+# DataVersion row bumped by every asset write; the asset list's ETag is built from it
+ASSET_VERSION = "asset"
+
+def touch_asset_version():
+    """Mark the assets as changed in the current transaction."""
+    bump_data_version(ASSET_VERSION)
 
 # --- Existing functions (get_asset, get_all_assets, etc.) ---
 def get_asset(id):
@@ -37,6 +55,206 @@ def get_all_assets_by_room_json(room_id):
     assets = [asset.get_json() for asset in assets]
     return assets
 
+def _asset_view_query():
+    """Asset rows joined with their room, last located room and assignee names."""
+    assigned_room = aliased(Room)
+    located_room = aliased(Room)
+    return (
+        db.session.query(
+            Asset,
+            assigned_room.room_name,
+            located_room.room_name,
+            Assignee.fname,
+            Assignee.lname,
+            Assignee.id
+        )
+        .outerjoin(assigned_room, Asset.room_id == assigned_room.room_id)
+        .outerjoin(located_room, Asset.last_located == located_room.room_id)
+        .outerjoin(Assignee, Asset.assignee_id == Assignee.id)
+    )
+
+def _asset_view_row(row):
+    asset, room_name, last_located_name, fname, lname, assignee_id = row
+    assignee_name = None
+    if assignee_id is not None:
+        # Same format as Assignee.__str__
+        assignee_name = f'{fname} {lname}' if lname else fname
+    return asset.get_json(), room_name, last_located_name, assignee_name
+
+def _filter_asset_view_query(query, room_id=None, statuses=None, building_id=None, assignee_id=None):
+    if room_id is not None:
+        query = query.filter(Asset.room_id == room_id)
+    if statuses:
+        query = query.filter(Asset.status.in_(statuses))
+    if building_id is not None:
+        building_rooms = (
+            select(Room.room_id)
+            .join(Floor, Room.floor_id == Floor.floor_id)
+            .where(Floor.building_id == building_id)
+        )
+        query = query.filter(Asset.room_id.in_(building_rooms))
+    if assignee_id is not None:
+        query = query.filter(Asset.assignee_id == assignee_id)
+    return query
+
+def iter_asset_views(room_id=None, statuses=None, batch_size=1000):
+    """Yield asset views like get_asset_views() without loading them all at once.
+
+    Rows are read from a server-side cursor batch_size rows at a time.
+    """
+    query = _filter_asset_view_query(_asset_view_query(), room_id=room_id, statuses=statuses)
+    for row in query.yield_per(batch_size):
+        yield _asset_view_row(row)
+
+# Columns of the CSV reports (discrepancy and full inventory)
+ASSET_REPORT_COLUMNS = [
+    'Asset ID', 'Description', 'Status',
+    'Assigned Room', 'Last Located',
+    'Brand', 'Model', 'Serial Number',
+    'Last Update'
+]
+
+def iter_asset_report_rows(statuses=None, batch_size=1000):
+    """Yield one ASSET_REPORT_COLUMNS row per asset, optionally only those with these statuses.
+
+    Only the report columns are selected, joined with the room names, and
+    read from a server-side cursor, so rows are produced as the database
+    returns them without building Asset objects.
+    """
+    assigned_room = aliased(Room)
+    located_room = aliased(Room)
+    query = db.session.query(
+        Asset.id, Asset.description, Asset.status,
+        Asset.room_id, assigned_room.room_name,
+        Asset.last_located, located_room.room_name,
+        Asset.brand, Asset.model, Asset.serial_number, Asset.last_update
+    ) \
+        .outerjoin(assigned_room, Asset.room_id == assigned_room.room_id) \
+        .outerjoin(located_room, Asset.last_located == located_room.room_id)
+    query = _filter_asset_view_query(query, statuses=statuses)
+
+    for (asset_id, description, status, room_id, room_name, last_located, last_located_name,
+         brand, model, serial_number, last_update) in query.yield_per(batch_size):
+        if room_id:
+            room_name = room_name if room_name is not None else f"Room {room_id}"
+        else:
+            room_name = "Unknown"
+        # Last located room name, only when it differs from the expected room
+        if last_located and last_located != room_id:
+            last_located_name = last_located_name if last_located_name is not None else f"Room {last_located}"
+        else:
+            last_located_name = room_name
+        yield [asset_id, description, status, room_name, last_located_name,
+               brand, model, serial_number, last_update]
+
+def get_asset_views(room_id=None, statuses=None, asset_ids=None):
+    """Get assets together with their display names using one joined query.
+
+    Args:
+        room_id: Only return assets assigned to this room.
+        statuses: Only return assets whose status is in this list.
+        asset_ids: Only return assets with these ids.
+
+    Returns:
+        List of (asset_json, room_name, last_located_name, assignee_name) tuples.
+        A name is None when the referenced room or assignee does not exist.
+    """
+    query = _filter_asset_view_query(_asset_view_query(), room_id=room_id, statuses=statuses)
+    if asset_ids is not None:
+        query = query.filter(Asset.id.in_(asset_ids))
+    return [_asset_view_row(row) for row in query.all()]
+
+# Columns the asset list can be ordered by. Asset.id is always the tie-breaker.
+# last_update can be NULL, so it sorts on the same never-NULL expression as
+# ix_asset_last_update_key: a NULL in the cursor would match no row at all.
+ASSET_SORT_KEYS = {
+    'id': Asset.id,
+    'last_update': db.func.coalesce(Asset.last_update, db.literal_column(f"'{NO_LAST_UPDATE}'"), type_=db.DateTime),
+    'status': Asset.status
+}
+
+def _asset_sort_value(asset, sort):
+    if sort == 'last_update':
+        return asset.last_update or datetime.fromisoformat(NO_LAST_UPDATE)
+    return getattr(asset, sort)
+
+def _encode_asset_cursor(sort, descending, value, asset_id):
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([sort, descending, value, asset_id])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+def _decode_asset_cursor(cursor, sort, descending):
+    try:
+        payload = base64.urlsafe_b64decode(cursor.encode('ascii'))
+        cursor_sort, cursor_descending, value, asset_id = json.loads(payload)
+        if sort == 'last_update' and value is not None:
+            value = datetime.fromisoformat(value)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if cursor_sort != sort or cursor_descending != descending:
+        raise ValueError("Cursor does not match the requested sort order")
+    return value, asset_id
+
+def get_asset_views_page(limit=100, cursor=None, sort='id', descending=False,
+                         statuses=None, room_id=None, building_id=None, assignee_id=None):
+    """Get one page of asset views using keyset pagination.
+
+    Rows are ordered by the sort column and then by asset id, and the cursor
+    holds the last (value, id) pair of the previous page, so every page is a
+    bounded index range scan no matter how deep the client has scrolled.
+    Assets without a last_update sort as if updated at the epoch, so they
+    come first ascending and last descending.
+
+    Args:
+        limit: Maximum number of assets to return.
+        cursor: Opaque cursor returned with the previous page, or None.
+        sort: One of ASSET_SORT_KEYS.
+        descending: Sort direction.
+        statuses, room_id, building_id, assignee_id: Optional filters.
+
+    Returns:
+        Tuple of (views, next_cursor). views has the same shape as
+        get_asset_views(); next_cursor is None on the last page.
+
+    Raises:
+        ValueError: If the sort key or the cursor is invalid.
+    """
+    if sort not in ASSET_SORT_KEYS:
+        raise ValueError(f"Unknown sort key: {sort}")
+    sort_column = ASSET_SORT_KEYS[sort]
+
+    query = _filter_asset_view_query(
+        _asset_view_query(),
+        room_id=room_id,
+        statuses=statuses,
+        building_id=building_id,
+        assignee_id=assignee_id
+    )
+
+    if cursor:
+        value, asset_id = _decode_asset_cursor(cursor, sort, descending)
+        if sort == 'id':
+            query = query.filter(Asset.id < asset_id if descending else Asset.id > asset_id)
+        else:
+            key = tuple_(sort_column, Asset.id)
+            query = query.filter(key < tuple_(value, asset_id) if descending else key > tuple_(value, asset_id))
+
+    if sort == 'id':
+        order_by = [Asset.id.desc() if descending else Asset.id]
+    else:
+        order_by = [sort_column.desc(), Asset.id.desc()] if descending else [sort_column, Asset.id]
+
+    # Fetch one extra row to find out whether there is a next page
+    rows = query.order_by(*order_by).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_asset = rows[-1][0]
+        next_cursor = _encode_asset_cursor(sort, descending, _asset_sort_value(last_asset, sort), last_asset.id)
+
+    return [_asset_view_row(row) for row in rows], next_cursor
+
 def add_asset(id, description, model, brand, serial_number, room_id, last_located, assignee_id, last_update, notes):
     # Check if room exists
     existing_room = Room.query.filter_by(room_id=room_id).first()
@@ -56,6 +274,8 @@ def add_asset(id, description, model, brand, serial_number, room_id, last_locate
 
     try:
         db.session.add(newAsset)
+        touch_asset_version()
+        adjust_status_counts([(None, None, room_id, status)])
         db.session.commit()
         return newAsset
     except IntegrityError: # Catch specific duplicate key error
@@ -71,18 +291,194 @@ def add_asset(id, description, model, brand, serial_number, room_id, last_locate
 def set_last_located(id,last_located):
     new_asset = get_asset(id)
     new_asset.last_located = last_located
+    touch_asset_version()
 
 def set_status(id):
     new_asset= Asset.query.filter_by(id = id).first()
+    old_status = new_asset.status
     if new_asset.room_id == new_asset.last_located :
         new_asset.status = "Good"
     else:
         new_asset.status = "Misplaced"
+    touch_asset_version()
+    adjust_status_counts([(new_asset.room_id, old_status, new_asset.room_id, new_asset.status)])
 
     return new_asset
 
 
-def upload_csv(file_path):
+# Columns an asset CSV must have
+ASSET_CSV_COLUMNS = ["Item", "Asset Tag", "Model", "Brand", "Serial Number",
+                     "Location", "Condition", "Assignee"]
+
+# Conditions worked out from the room; any other CSV condition (e.g. Missing, Lost) is kept as the status
+DERIVED_CONDITIONS = ["Good", "Misplaced", "Unassigned", "Found"]
+
+def _preload_import_lookups():
+    """Load the room and asset ids row validation needs; assignees are resolved per group of rows."""
+    room_ids = set(get_location_snapshot()['rooms'])
+    asset_ids = {asset_id for (asset_id,) in db.session.query(Asset.id)}
+    # assignee id -> whether it exists, and name key -> assignee id (or None)
+    return room_ids, asset_ids, {}, {}
+
+def _clean_import_row(row):
+    return {key.strip(): (value.strip() if isinstance(value, str) else value)
+            for key, value in row.items() if key is not None}
+
+def _resolve_import_assignees(rows, lookups):
+    """Look up the Assignee cells (ids or full names) of a group of rows not seen yet.
+
+    Ids are checked with one query and names go through one
+    get_or_create_assignees_by_name call, which creates the new ones
+    inside the import transaction.
+    """
+    _, _, assignee_ids, assignee_names = lookups
+    cells = list(dict.fromkeys(row.get('Assignee') or '' for row in rows))
+    ids = sorted({int(value) for value in cells if value.isdigit()} - set(assignee_ids))
+    for chunk in _chunks(ids, SET_UPDATE_CHUNK):
+        found = {assignee_id for (assignee_id,) in db.session.query(Assignee.id).filter(Assignee.id.in_(chunk))}
+        assignee_ids.update((assignee_id, assignee_id in found) for assignee_id in chunk)
+
+    names = [value for value in cells
+             if value and not value.isdigit() and assignee_name_key(value) not in assignee_names]
+    if names:
+        resolved = get_or_create_assignees_by_name(names, commit=False)
+        for name in names:
+            key = assignee_name_key(name)
+            assignee_names[key] = resolved[key].id if key in resolved else None
+
+def _resolve_import_assignee(value, assignee_ids, assignee_names):
+    """Map an Assignee cell (an id or a full name) to an assignee id, or None."""
+    if value.isdigit():
+        return int(value) if assignee_ids.get(int(value)) else None
+    return assignee_names.get(assignee_name_key(value))
+
+def _parse_asset_row(row, row_num, lookups, now, errors):
+    """Validate one cleaned CSV row in memory and return the values to insert, or None to skip it."""
+    room_ids, asset_ids, assignee_ids, assignee_names = lookups
+
+    asset_id = row.get('Asset Tag') or ''
+    description = row.get('Item') or ''
+    room_id = row.get('Location') or ''
+    condition = row.get('Condition') or 'Good'
+    assignee = row.get('Assignee') or ''
+
+    if not asset_id:
+        errors.append(f"Row {row_num}: Missing Asset Tag (required)")
+        return None
+    if not description:
+        errors.append(f"Row {row_num}: Missing Item description (required)")
+        return None
+    if asset_id in asset_ids:
+        errors.append(f"Row {row_num}: Asset Tag '{asset_id}' already exists, skipped.")
+        return None
+    # assignee_id is a required foreign key: names are created as needed, but a
+    # blank cell or an unknown id has nothing valid to point at
+    if not assignee:
+        errors.append(f"Row {row_num}: Missing Assignee (required)")
+        return None
+    assignee_id = _resolve_import_assignee(assignee, assignee_ids, assignee_names)
+    if assignee_id is None:
+        errors.append(f"Row {row_num}: Assignee '{assignee}' not found, skipped.")
+        return None
+
+    if room_id in room_ids:
+        status = "Good"
+    else:
+        errors.append(f"Row {row_num}: Location '{room_id}' not found, assigned to Unknown Room")
+        room_id = "UNKNOWN"
+        status = "Unassigned"
+    if condition not in DERIVED_CONDITIONS:
+        status = condition
+
+    asset_ids.add(asset_id)
+    return {
+        'id': asset_id,
+        'description': description,
+        'model': row.get('Model', ''),
+        'brand': row.get('Brand', ''),
+        'serial_number': row.get('Serial Number', ''),
+        'room_id': room_id,
+        'last_located': room_id,
+        'assignee_id': assignee_id,
+        'last_update': now,
+        'notes': None,
+        'status': status
+    }
+
+def _insert_asset_batch(batch):
+    db.session.execute(Asset.__table__.insert(), batch)
+    touch_asset_version()
+    adjust_status_counts((None, None, values['room_id'], values['status']) for values in batch)
+
+def import_asset_rows(reader, results, batch_size=1000, chunk_size=None, progress=None):
+    """Validate and insert asset rows from a csv.DictReader, updating results in place.
+
+    Valid rows are written with multi-row INSERT statements of batch_size rows.
+    With chunk_size=None the whole import is one transaction; otherwise it
+    commits every chunk_size rows, calling progress(results) after each
+    commit. If anything fails, the uncommitted rows are rolled back, counted
+    as skipped and the import stops.
+    """
+    lookups = _preload_import_lookups()
+    now = datetime.now()
+    batch = []
+    uncommitted = 0
+    row_num = 1
+
+    try:
+        rows = enumerate(reader, start=2)  # Start at 2 to account for header row
+        while True:
+            group = [(row_num, _clean_import_row(row)) for row_num, row in islice(rows, batch_size)]
+            if not group:
+                break
+            _resolve_import_assignees([row for _, row in group], lookups)
+
+            for row_num, row in group:
+                results['total'] += 1
+                values = _parse_asset_row(row, row_num, lookups, now, results['errors'])
+                if values is None:
+                    results['skipped'] += 1
+                    continue
+
+                batch.append(values)
+                uncommitted += 1
+                chunk_full = chunk_size and uncommitted >= chunk_size
+                if len(batch) >= batch_size or chunk_full:
+                    _insert_asset_batch(batch)
+                    batch = []
+                if chunk_full:
+                    db.session.commit()
+                    results['imported'] += uncommitted
+                    uncommitted = 0
+                    if progress:
+                        progress(results)
+
+        if batch:
+            _insert_asset_batch(batch)
+        db.session.commit()
+        results['imported'] += uncommitted
+    except Exception as e:
+        db.session.rollback()
+        results['skipped'] += uncommitted
+        results['errors'].append(f"Import stopped at row {row_num}: {str(e)}. {uncommitted} uncommitted row(s) were rolled back.")
+
+    return results
+
+def upload_csv(source, batch_size=1000, chunk_size=None, progress=None):
+    """Bulk import assets from a CSV file path, file object or iterable of lines.
+
+    The source is parsed incrementally (see open_csv_source), so uploads can
+    be imported straight from the request stream without a copy on disk.
+
+    Room ids and existing asset ids are loaded once up front, assignees are
+    resolved once per batch of rows, rows are validated in memory and the
+    valid ones are inserted in batches (see
+    import_asset_rows). The target is at least 20k rows/s on SQLite, so a
+    50k row file imports in a few seconds.
+
+    Returns:
+        Dict with success, total, imported, skipped and errors (one message per problem row).
+    """
     results = {
         'success': False,
         'total': 0,
@@ -92,101 +488,16 @@ def upload_csv(file_path):
     }
 
     try:
-        with open(file_path, 'r', encoding='utf-8-sig') as file:
+        with open_csv_source(source) as file:
             reader = csv.DictReader(file)
 
-
-            expected_columns = ["Item", "Asset Tag", "Model", "Brand", "Serial Number",
-                               "Location", "Condition", "Assignee"]
-            actual_columns = [col.strip() for col in reader.fieldnames]
-
-            missing_columns = [col for col in expected_columns if col not in actual_columns]
+            actual_columns = [col.strip() for col in reader.fieldnames or []]
+            missing_columns = [col for col in ASSET_CSV_COLUMNS if col not in actual_columns]
             if missing_columns:
                 results['errors'].append(f"Missing required columns: {', '.join(missing_columns)}")
                 return results
 
-            for row_num, row in enumerate(reader, start=2):  # Start at 2 to account for header row
-                results['total'] += 1
-
-                try:
-                    row = {key.strip(): (value.strip() if isinstance(value, str) else value)
-                          for key, value in row.items()}
-
-                    new_item = row.get('Item', '')
-                    new_id = row.get('Asset Tag', '')
-                    new_model = row.get('Model', '')
-                    new_brand = row.get('Brand', '')
-                    new_sn = row.get('Serial Number', '')
-                    new_room = row.get('Location', '')
-                    new_condition = row.get('Condition', 'Good')  # Get condition from CSV
-                    new_assignee = row.get('Assignee', '')
-                    new_last = datetime.now()
-                    new_notes = None  # Default to None
-
-                    if not new_id:
-                        results['errors'].append(f"Row {row_num}: Missing Asset Tag (required)")
-                        results['skipped'] += 1
-                        continue
-
-                    if not new_item:
-                        results['errors'].append(f"Row {row_num}: Missing Item description (required)")
-                        results['skipped'] += 1
-                        continue
-
-                    existing_room = Room.query.filter_by(room_id=new_room).first()
-                    if existing_room is None:
-                        # Room doesn't exist, log that it's being redirected to Unknown Room
-                        results['errors'].append(f"Row {row_num}: Location '{row.get('Location', '')}' not found, assigned to Unknown Room")
-
-                    # Let add_asset handle the room assignment and status determination
-                    new_asset = add_asset(
-                        id=new_id,
-                        description=new_item,
-                        model=new_model,
-                        brand=new_brand,
-                        serial_number=new_sn,
-                        room_id=new_room,
-                        last_located=new_room,  # Initially set last_located to match room_id
-                        assignee_id=new_assignee,
-                        last_update=new_last,
-                        notes=new_notes
-                    )
-
-                    if new_asset:
-                        # If the condition from CSV doesn't match the calculated status,
-                        # override it (e.g., for "Missing" or "Lost" conditions)
-                        if new_condition not in ["Good", "Misplaced", "Unassigned", "Found"]: # Added Found
-                            new_asset.status = new_condition
-                            db.session.commit()
-
-                        results['imported'] += 1
-                    else:
-                        # Check if the error was due to duplicate ID
-                        if f"Asset with ID {new_id} already exists." in str(db.session.rollback): # Approximate check
-                             results['errors'].append(f"Row {row_num}: Asset Tag '{new_id}' already exists, skipped.")
-                        else:
-                             results['errors'].append(f"Row {row_num}: Failed to add asset to database.")
-                        results['skipped'] += 1
-
-
-                except IntegrityError as e:
-                    db.session.rollback()
-                    # Check if it's specifically a duplicate primary key error
-                    # This check depends slightly on the DB engine, but often contains 'UNIQUE constraint' or 'Duplicate entry'
-                    error_str = str(e).lower() # Convert error to lowercase string for easier checking
-                    if 'unique constraint' in error_str \
-                    or 'duplicate entry' in error_str \
-                    or 'violates unique constraint' in error_str \
-                    or (hasattr(e, 'orig') and 'duplicate key value violates unique constraint' in str(e.orig).lower()): # More specific check for psycopg2
-                        results['errors'].append(f"Row {row_num}: Asset Tag '{row.get('Asset Tag', '')}' already exists, skipped.")
-                    else:
-                        # Other type of IntegrityError (e.g., foreign key violation if a room didn't exist and wasn't handled)
-                        results['errors'].append(f"Row {row_num}: Database integrity error - {str(e)}")
-                    results['skipped'] += 1
-                except Exception as e:
-                    db.session.rollback()
-                    results['errors'].append(f"Row {row_num}: Error processing row - {str(e)}")
-                    results['skipped'] += 1
+            import_asset_rows(reader, results, batch_size=batch_size, chunk_size=chunk_size, progress=progress)
 
             # Set success if at least one asset was imported
             results['success'] = results['imported'] > 0
@@ -210,9 +521,12 @@ def delete_asset(id):
                  # Option 2: Delete scan events first (use with caution!)
                  ScanEvent.query.filter_by(asset_id=id).delete()
                  print(f"Warning: Deleted {scan_events} scan events associated with asset {id}.")
-
+            # Archived history goes with the asset too
+            ScanEventArchive.query.filter_by(asset_id=id).delete()
 
             db.session.delete(asset)
+            touch_asset_version()
+            adjust_status_counts([(asset.room_id, asset.status, None, None)])
             db.session.commit()
             return True, f"Asset {id} was successfully deleted."
         except Exception as e: # Catch specific exceptions if needed
@@ -262,12 +576,15 @@ def update_asset_location(asset_id, new_location, user_id=None):
         if not user_id:
             user_id = "SYSTEM" # Or handle as an error if user context is mandatory
 
+        touch_asset_version()
+        adjust_status_counts([(asset.room_id, old_status, asset.room_id, asset.status)])
         scan_event = add_scan_event(
             asset_id=asset_id,
             user_id=user_id,
             room_id=new_location, # Log the room where it was scanned/found
             status=asset.status,
-            notes=notes
+            notes=notes,
+            commit=False
         )
         if not scan_event:
              print(f"Warning: Failed to create scan event for asset {asset_id} update.")
@@ -283,7 +600,26 @@ def update_asset_location(asset_id, new_location, user_id=None):
 
 # Function to mark assets as missing (from audit)
 
-def mark_assets_missing(asset_ids, user_id=None, misplaced_threshold_days=30):
+# Ids per IN (...) list in set-based statements
+SET_UPDATE_CHUNK = 1000
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def mark_assets_missing(asset_ids, user_id=None, misplaced_threshold_days=30, commit=True):
+    """Mark assets Missing at the end of an audit using set-based statements.
+
+    Lost assets are skipped and assets misplaced within the last
+    misplaced_threshold_days keep their status; every other asset becomes
+    Missing. Statuses are read with one SELECT and written with one UPDATE
+    per SET_UPDATE_CHUNK ids, and the scan events are inserted in bulk.
+    With commit=False the changes join the caller's transaction and database
+    errors are raised instead of returned.
+
+    Returns:
+        Tuple of (processed_count, error_count, errors list)
+    """
     processed_count = 0
     error_count = 0
     errors = []
@@ -299,88 +635,102 @@ def mark_assets_missing(asset_ids, user_id=None, misplaced_threshold_days=30):
         else:
             user_id = "SYSTEM" # Or raise error if user is required
 
-    # Collect all assets to update first to ensure batch processing works correctly
-    assets_to_update = []
+    # Load the current status of every asset up front (locked on Postgres)
+    statuses = {}
+    for chunk in _chunks(list(set(asset_ids)), SET_UPDATE_CHUNK):
+        rows = db.session.query(Asset.id, Asset.status, Asset.last_update, Asset.room_id) \
+            .filter(Asset.id.in_(chunk)) \
+            .with_for_update()
+        for asset_id, status, last_update, room_id in rows:
+            statuses[asset_id] = [status, last_update, room_id]
+
+    # Apply the rule in memory, in input order, to build the messages and scan events
+    ids_to_update = set()
     scan_events_to_add = []
+    status_changes = []
 
     for asset_id in asset_ids:
-        asset = get_asset(asset_id)
-        if asset:
-            if asset.status == "Lost":
-                # Don't override "Lost" status
-                print(f"Info: Asset {asset_id} already marked as Lost, skipping.")
-                error_count += 1
-                errors.append(f"Asset {asset_id} already Lost.")
-            elif asset.status == "Misplaced":
-                # Check if the asset has been misplaced for longer than the threshold
-                last_update_time = asset.last_update
-                
-                if last_update_time < threshold_date:
-                    # Asset has been misplaced for too long, mark as missing
-                    old_status = asset.status
-                    asset.status = "Missing"
-                    asset.last_update = current_time
-                    
-                    notes = f"Asset marked as Missing during audit. Previously misplaced for over {misplaced_threshold_days} days. Previous status: {old_status}."
-                    scan_event_data = {
-                        'asset_id': asset_id,
-                        'user_id': user_id,
-                        'room_id': asset.room_id,
-                        'status': "Missing",
-                        'notes': notes
-                    }
-                    
-                    assets_to_update.append(asset)
-                    scan_events_to_add.append(scan_event_data)
-                    processed_count += 1
-                else:
-                    # Asset was recently misplaced, keep as misplaced
-                    print(f"Info: Asset {asset_id} was recently misplaced (less than {misplaced_threshold_days} days ago), keeping status.")
-                    error_count += 1
-                    errors.append(f"Asset {asset_id} recently misplaced.")
-            else:
-                # For any other status, mark as missing
-                old_status = asset.status
-                asset.status = "Missing"
-                asset.last_update = current_time
-                
-                notes = f"Asset marked as Missing during audit. Previous status: {old_status}."
-                scan_event_data = {
-                    'asset_id': asset_id,
-                    'user_id': user_id,
-                    'room_id': asset.room_id,
-                    'status': "Missing",
-                    'notes': notes
-                }
-                
-                assets_to_update.append(asset)
-                scan_events_to_add.append(scan_event_data)
-                processed_count += 1
-        else:
+        current = statuses.get(asset_id)
+        if current is None:
             errors.append(f"Asset {asset_id} not found.")
             error_count += 1
+            continue
+
+        old_status, last_update_time, room_id = current
+        if old_status == "Lost":
+            # Don't override "Lost" status
+            print(f"Info: Asset {asset_id} already marked as Lost, skipping.")
+            error_count += 1
+            errors.append(f"Asset {asset_id} already Lost.")
+            continue
+        if old_status == "Misplaced":
+            if last_update_time is not None and last_update_time >= threshold_date:
+                # Asset was recently misplaced, keep as misplaced
+                print(f"Info: Asset {asset_id} was recently misplaced (less than {misplaced_threshold_days} days ago), keeping status.")
+                error_count += 1
+                errors.append(f"Asset {asset_id} recently misplaced.")
+                continue
+            # Asset has been misplaced for too long, mark as missing
+            notes = f"Asset marked as Missing during audit. Previously misplaced for over {misplaced_threshold_days} days. Previous status: {old_status}."
+        else:
+            # For any other status, mark as missing
+            notes = f"Asset marked as Missing during audit. Previous status: {old_status}."
+
+        current[0] = "Missing"
+        current[1] = current_time
+        ids_to_update.add(asset_id)
+        status_changes.append((room_id, old_status, room_id, "Missing"))
+        scan_events_to_add.append({
+            'asset_id': asset_id,
+            'user_id': user_id,
+            'room_id': room_id,
+            'status': "Missing",
+            'notes': notes
+        })
+        processed_count += 1
 
     try:
         if processed_count > 0:
-            # Explicitly add all assets to the session
-            for asset in assets_to_update:
-                db.session.add(asset)
-                
-            # Create all scan events
-            for event_data in scan_events_to_add:
-                add_scan_event(**event_data)
+            # The WHERE clause restates the rule so the UPDATE never touches
+            # a Lost or recently misplaced asset
+            still_missing = db.and_(
+                Asset.status != "Lost",
+                db.or_(
+                    Asset.status != "Misplaced",
+                    Asset.last_update.is_(None),
+                    Asset.last_update < threshold_date
+                )
+            )
+            for chunk in _chunks(sorted(ids_to_update), SET_UPDATE_CHUNK):
+                db.session.execute(
+                    db.update(Asset)
+                    .where(Asset.id.in_(chunk), still_missing)
+                    .values(status="Missing", last_update=current_time)
+                    .execution_options(synchronize_session=False)
+                )
+            # Expire loaded assets so they pick up the new status
+            db.session.expire_all()
+            touch_asset_version()
+            adjust_status_counts(status_changes)
+
+            # Create all scan events in one statement
+            add_scan_events_bulk(scan_events_to_add)
                 
             # Commit all changes at once
-            db.session.commit()
+            if commit:
+                db.session.commit()
             print(f"Successfully marked {processed_count} assets as missing")
         return processed_count, error_count, errors
     except Exception as e:
+        if not commit:
+            raise
         db.session.rollback()
         print(f"Error committing missing assets update: {e}")
         # Add a general error if commit fails
         errors.append(f"Database commit error: {e}")
         return 0, len(asset_ids), errors # Assume all failed if commit fails
-    
+
+
 # --- (get_assets_by_status, get_discrepant_assets remain the same) ---
 def get_assets_by_status(status):
     assets = Asset.query.filter_by(status=status).all()
@@ -428,12 +778,16 @@ def mark_asset_lost(asset_id, user_id=None):
     # Create a scan event to record this update
     notes = f"Asset marked as Lost. Previous status: {old_status}."
 
+    touch_asset_version()
+    adjust_status_counts([(asset.room_id, old_status, asset.room_id, "Lost")])
+
     scan_event = add_scan_event(
         asset_id=asset_id,
         user_id=user_id,
         room_id=asset.room_id, # Log against assigned room
         status="Lost",
-        notes=notes
+        notes=notes,
+        commit=False
     )
     if not scan_event:
          print(f"Warning: Failed to create scan event for Lost asset {asset_id}.")
@@ -499,12 +853,16 @@ def mark_asset_found(asset_id, user_id=None, return_to_room=True, notes_prefix="
     # Create scan event notes
     scan_notes = f"{notes_prefix}Asset marked as Found and {action_desc}. Previous status: {old_status}."
 
+    touch_asset_version()
+    adjust_status_counts([(old_location_id, old_status, asset.room_id, "Good")])
+
     scan_event = add_scan_event(
         asset_id=asset_id,
         user_id=user_id,
         room_id=final_room_id, # Log against the final room
         status="Good",
-        notes=scan_notes
+        notes=scan_notes,
+        commit=False
     )
     if not scan_event:
          print(f"Warning: Failed to create scan event for Found asset {asset_id}.")
@@ -541,6 +899,7 @@ def update_asset_details(asset_id, description, model, brand, serial_number, ass
 
     # Automatically update the last_update timestamp
     asset.last_update = datetime.now()
+    touch_asset_version()
 
     try:
         # Add a scan event or audit log entry here if desired
@@ -563,7 +922,7 @@ def bulk_mark_assets_found(asset_ids, user_id, notes="", skip_failed_scan_events
         asset_ids: List of asset IDs to mark as found
         user_id: ID of the user performing the action
         notes: Optional notes to add to scan events
-        skip_failed_scan_events: If True, continue processing assets even if scan event creation fails
+        skip_failed_scan_events: If True, still commit the asset updates when the scan events can't be written
     
     Returns:
         Tuple of (processed_count, error_count, errors list)
@@ -586,6 +945,7 @@ def bulk_mark_assets_found(asset_ids, user_id, notes="", skip_failed_scan_events
     # First update all assets in memory
     assets_to_update = []
     scan_events_to_add = []
+    status_changes = []
     
     # Prepare all updates as a batch
     for asset_id in asset_ids:
@@ -602,6 +962,7 @@ def bulk_mark_assets_found(asset_ids, user_id, notes="", skip_failed_scan_events
         asset.last_located = asset.room_id  # Return to assigned room
         asset.status = "Good"
         asset.last_update = datetime.now()
+        status_changes.append((asset.room_id, old_status, asset.room_id, "Good"))
         
         # Create scan event notes
         scan_notes = f"{notes_prefix}Asset marked as Found and returned to assigned room. Previous status: {old_status}."
@@ -623,21 +984,22 @@ def bulk_mark_assets_found(asset_ids, user_id, notes="", skip_failed_scan_events
         # Add all updated assets to the session
         for asset in assets_to_update:
             db.session.add(asset)
+        touch_asset_version()
+        adjust_status_counts(status_changes)
             
-        # Try to create all scan events
-        for event_data in scan_events_to_add:
-            try:
-                add_scan_event(**event_data)
-                processed_count += 1
-            except Exception as e:
-                if skip_failed_scan_events:
-                    # Log the error but continue processing
-                    print(f"Warning: Failed to create scan event for Found asset {event_data['asset_id']}. Error: {str(e)}")
-                    errors.append(f"Scan event creation failed for asset {event_data['asset_id']}: {str(e)}")
-                    error_count += 1
-                else:
-                    # Re-raise the exception if we're not skipping failures
-                    raise
+        # Create all scan events in one statement, inside a savepoint so a
+        # failure can be skipped without losing the asset updates
+        try:
+            with db.session.begin_nested():
+                add_scan_events_bulk(scan_events_to_add)
+        except Exception as e:
+            if not skip_failed_scan_events:
+                raise
+            # Log the error but continue processing
+            print(f"Warning: Failed to create scan events for Found assets. Error: {str(e)}")
+            errors.append(f"Scan event creation failed for {len(scan_events_to_add)} asset(s): {str(e)}")
+            error_count += len(scan_events_to_add)
+        processed_count = len(assets_to_update)
         
         # Commit all changes at once
         db.session.commit()
@@ -672,6 +1034,7 @@ def bulk_relocate_assets(asset_ids, new_room_id, user_id, notes=""):
 
     assets_to_update = []
     scan_events_to_add = []
+    status_changes = []
 
     for asset_id in asset_ids:
         asset = get_asset(asset_id)
@@ -689,6 +1052,7 @@ def bulk_relocate_assets(asset_ids, new_room_id, user_id, notes=""):
         asset.status = "Good"
         asset.last_update = datetime.now()
         assets_to_update.append(asset) # Add to list for bulk save
+        status_changes.append((old_location_id, old_status, new_room_id, "Good"))
 
         # Prepare scan event data (don't create yet)
         old_room_name = get_room(old_location_id).room_name if get_room(old_location_id) else f"Room {old_location_id}"
@@ -711,11 +1075,11 @@ def bulk_relocate_assets(asset_ids, new_room_id, user_id, notes=""):
         try:
             # Bulk save assets
             db.session.add_all(assets_to_update)
+            touch_asset_version()
+            adjust_status_counts(status_changes)
 
-            # Bulk create scan events (more efficient if add_scan_event supports bulk or direct insert)
-            # For simplicity, calling add_scan_event individually here, but consider optimizing
-            for event_data in scan_events_to_add:
-                 add_scan_event(**event_data) # Unpack dict as arguments
+            # Bulk create scan events in the same transaction
+            add_scan_events_bulk(scan_events_to_add)
 
             db.session.commit()
         except Exception as e:
@@ -0,0 +1,80 @@
+import base64, json, re
+from sqlalchemy import func, literal_column, select, table, text, tuple_
+from App.database import db
+from App.models import Asset
+from App.models.assetsearch import ASSET_SEARCH_WEIGHTS
+from App.controllers.asset import get_asset_views
+
+# Words beyond this many in one query are ignored
+MAX_SEARCH_TERMS = 8
+
+
+def get_search_terms(query):
+    """Lower-cased words of a search string; punctuation separates words, as in the index."""
+    return re.findall(r'\w+', (query or '').lower())[:MAX_SEARCH_TERMS]
+
+def _encode_search_cursor(terms, score, asset_id):
+    payload = json.dumps([terms, score, asset_id])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+def _decode_search_cursor(cursor, terms):
+    try:
+        payload = base64.urlsafe_b64decode(cursor.encode('ascii'))
+        cursor_terms, score, asset_id = json.loads(payload)
+        score = float(score)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if cursor_terms != terms:
+        raise ValueError("Cursor does not match the search query")
+    return score, asset_id
+
+def _search_hits(terms):
+    """Select (id, score) of the assets matching every term as a word prefix; lower scores rank higher."""
+    if db.engine.dialect.name == 'postgresql':
+        query = func.to_tsquery('simple', ' & '.join(f"{term}:*" for term in terms))
+        vector = literal_column('asset.search_vector')
+        return select(Asset.id.label('id'), (-func.ts_rank(vector, query)).label('score')) \
+            .where(vector.op('@@')(query))
+
+    fts = literal_column('asset_fts')
+    return select(Asset.id.label('id'), func.bm25(fts, *ASSET_SEARCH_WEIGHTS).label('score')) \
+        .select_from(table('asset_fts')) \
+        .join(Asset, text('asset.rowid = asset_fts.rowid')) \
+        .where(fts.op('MATCH')(' '.join(f'"{term}"*' for term in terms)))
+
+def search_assets(query, limit=50, cursor=None, statuses=None):
+    """Full-text search over asset id, description, model, brand, serial number and notes.
+
+    Every word of the query must match the start of a word in one of those
+    columns, so "dell lat" finds "Dell Latitude 7420" and "5CG12" finds
+    serial 5CG1234XYZ. Matching uses the asset search index (SQLite FTS5,
+    Postgres tsvector/GIN). Results are ranked by relevance (bm25 /
+    ts_rank), with the asset id breaking ties, and the cursor holds the
+    last (score, id) of the previous page.
+
+    Returns:
+        (views, next_cursor) where views has the same shape as
+        get_asset_views(), in rank order. Raises ValueError for an invalid
+        cursor.
+    """
+    terms = get_search_terms(query)
+    if not terms:
+        return [], None
+
+    hits = _search_hits(terms)
+    if statuses:
+        hits = hits.where(Asset.status.in_(statuses))
+    hits = hits.subquery()
+    page = select(hits.c.id, hits.c.score)
+    if cursor:
+        page = page.where(tuple_(hits.c.score, hits.c.id) > tuple_(*_decode_search_cursor(cursor, terms)))
+    # Fetch one extra row to find out whether there is a next page
+    rows = db.session.execute(page.order_by(hits.c.score, hits.c.id).limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_search_cursor(terms, rows[-1].score, rows[-1].id)
+
+    views = {view[0]['id']: view for view in get_asset_views(asset_ids=[row.id for row in rows])} if rows else {}
+    return [views[row.id] for row in rows if row.id in views], next_cursor
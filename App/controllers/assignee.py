@@ -1,7 +1,16 @@
 from App.models import Assignee
+from App.models.assignee import assignee_name_key
 from App import db
+from App.controllers.dataversion import bump_data_version
 import re
 
+# DataVersion row bumped when an assignee changes; asset lists show their names
+ASSIGNEE_VERSION = "assignee"
+
+def touch_assignee_version():
+    """Mark the assignees as changed in the current transaction."""
+    bump_data_version(ASSIGNEE_VERSION)
+
 def create_assignee(fname, lname=None, email=None, room_id=None):
     if email and Assignee.query.filter_by(email=email).first():
         print(f"Warning: Email {email} already exists. Cannot create duplicate.")
@@ -52,7 +61,9 @@ def update_assignee(assignee_id, fname, lname, email, room_id):
         assignee.lname = lname
         assignee.email = email
         assignee.room_id = room_id
+        assignee.name_key = assignee_name_key(fname, lname)
         try:
+            touch_assignee_version()
             db.session.commit()
             return assignee
         except Exception as e:
@@ -61,35 +72,116 @@ def update_assignee(assignee_id, fname, lname, email, room_id):
             return None
     return None
 
-def get_or_create_assignee_by_name(full_name):
-    if not full_name or not full_name.strip():
-        return None
+# Names or emails looked up per IN query
+NAME_LOOKUP_CHUNK = 1000
+
+PLACEHOLDER_EMAIL_DOMAIN = "placeholder@auto.generated"
+
+# Placeholder suffixes checked up front for each new name
+PLACEHOLDER_PROBE = 10
+
+def _split_full_name(full_name):
     name_parts = full_name.strip().split(maxsplit=1)
-    fname = name_parts[0]
-    lname = name_parts[1] if len(name_parts) > 1 else None
-    existing_assignee = None
-    if lname:
-        existing_assignee = Assignee.query.filter(
-            db.func.lower(Assignee.fname) == fname.lower(),
-            db.func.lower(Assignee.lname) == lname.lower()
-        ).first()
-    else:
-         existing_assignee = Assignee.query.filter(
-            db.func.lower(Assignee.fname) == fname.lower(),
-            Assignee.lname.is_(None)
-        ).first()
-    if existing_assignee:
-        return existing_assignee
-    else:
-        safe_fname = re.sub(r'\W+', '', fname.lower())
-        safe_lname = re.sub(r'\W+', '', lname.lower()) if lname else ''
-        placeholder_email = f"{safe_fname}.{safe_lname}.placeholder@auto.generated" if lname else f"{safe_fname}.placeholder@auto.generated"
-        counter = 1
-        temp_email = placeholder_email
-        while get_assignee_by_email(temp_email):
-             temp_email = f"{safe_fname}.{safe_lname}{counter}.placeholder@auto.generated" if lname else f"{safe_fname}{counter}.placeholder@auto.generated"
-             counter += 1
-        placeholder_email = temp_email
+    return name_parts[0], name_parts[1] if len(name_parts) > 1 else None
+
+def _placeholder_base(fname, lname):
+    safe_fname = re.sub(r'\W+', '', fname.lower())
+    if not lname:
+        return safe_fname
+    safe_lname = re.sub(r'\W+', '', lname.lower())
+    return f"{safe_fname}.{safe_lname}"
+
+def _placeholder_email(base, suffix):
+    # Suffix 0 is the bare base, then <base>1, <base>2 and so on
+    return f"{base}{suffix or ''}.{PLACEHOLDER_EMAIL_DOMAIN}"
+
+def _taken_placeholder_suffixes(bases, start, stop):
+    """Which suffixes in range(start, stop) each placeholder base already uses.
+
+    Every candidate email is looked up exactly on the lower(email) index,
+    in one IN query per chunk.
+    """
+    taken = {base: set() for base in bases}
+    candidates = {}
+    for base in bases:
+        for suffix in range(start, stop):
+            candidates.setdefault(_placeholder_email(base, suffix), []).append((base, suffix))
+    emails = list(candidates)
+    email = db.func.lower(Assignee.email)
+    for chunk_start in range(0, len(emails), NAME_LOOKUP_CHUNK):
+        chunk = emails[chunk_start:chunk_start + NAME_LOOKUP_CHUNK]
+        for (address,) in db.session.query(email).filter(email.in_(chunk)):
+            for base, suffix in candidates[address]:
+                taken[base].add(suffix)
+    return taken
+
+def get_or_create_assignees_by_name(full_names, commit=True):
+    """Resolve many full names ("First Last") to assignees at once, creating the missing ones.
+
+    Names match case-insensitively on the indexed name_key, one query per
+    chunk of names. New assignees get placeholder emails whose free
+    suffixes are found together with one indexed query (see
+    _taken_placeholder_suffixes), so resolving a whole import takes a few
+    queries however many names repeat. With commit=False the new assignees
+    are only flushed, so they join the caller's transaction.
+
+    Returns:
+        Dict of name key (assignee_name_key of the full name) -> Assignee,
+        without blank names, or None if the new assignees could not be
+        committed.
+    """
+    names = {}
+    for full_name in full_names:
+        if full_name and full_name.strip():
+            names.setdefault(assignee_name_key(full_name), full_name)
+    keys = list(names)
+
+    assignees = {}
+    for start in range(0, len(keys), NAME_LOOKUP_CHUNK):
+        for assignee in Assignee.query.filter(Assignee.name_key.in_(keys[start:start + NAME_LOOKUP_CHUNK])) \
+                .order_by(Assignee.id):
+            assignees.setdefault(assignee.name_key, assignee)
+
+    new_names = [_split_full_name(names[key]) for key in keys if key not in assignees]
+    if not new_names:
+        return assignees
+    bases = list(dict.fromkeys(_placeholder_base(*name) for name in new_names))
+    taken = _taken_placeholder_suffixes(bases, 0, PLACEHOLDER_PROBE)
+    probed = dict.fromkeys(bases, PLACEHOLDER_PROBE)
+    new_assignees = []
+    for fname, lname in new_names:
+        base = _placeholder_base(fname, lname)
+        # First free suffix, looking further only when every checked one is taken
+        suffix = 0
+        while True:
+            while suffix in taken[base]:
+                suffix += 1
+            if suffix < probed[base]:
+                break
+            taken[base] |= _taken_placeholder_suffixes([base], probed[base], probed[base] * 10)[base]
+            probed[base] *= 10
+        taken[base].add(suffix)
+        placeholder_email = _placeholder_email(base, suffix)
         print(f"Creating new assignee: {fname} {lname or ''} with email {placeholder_email}")
-        new_assignee = create_assignee(fname=fname, lname=lname, email=placeholder_email, room_id=None)
-        return new_assignee
\ No newline at end of file
+        new_assignees.append(Assignee(fname=fname, lname=lname, email=placeholder_email, room_id=None))
+
+    db.session.add_all(new_assignees)
+    if not commit:
+        # Errors are left to the caller, whose transaction this is
+        db.session.flush()
+    else:
+        try:
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error creating assignees: {e}")
+            return None
+    assignees.update((assignee.name_key, assignee) for assignee in new_assignees)
+    return assignees
+
+def get_or_create_assignee_by_name(full_name, commit=True):
+    # With commit=False a new assignee is only flushed, so it joins the caller's transaction
+    if not full_name or not full_name.strip():
+        return None
+    assignees = get_or_create_assignees_by_name([full_name], commit=commit)
+    return assignees.get(assignee_name_key(full_name)) if assignees else None
@@ -0,0 +1,257 @@
+from datetime import datetime
+from sqlalchemy import select
+from App.database import db
+from App.models import Asset, AuditScan, AuditSession
+from App.controllers.asset import get_asset_views, mark_assets_missing, touch_asset_version
+from App.controllers.location_cache import get_location_snapshot
+from App.controllers.scanevent import add_scan_events_bulk
+from App.controllers.status_counts import adjust_status_counts
+
+AUDIT_SCOPES = ["room", "floor", "building"]
+
+
+def _scope_exists(scope_type, scope_id):
+    snapshot = get_location_snapshot()
+    return scope_id in snapshot.get(scope_type + 's', {})
+
+def get_scope_room_ids(scope_type, scope_id):
+    """Ids of every room covered by an audit scope."""
+    snapshot = get_location_snapshot()
+    if scope_type == "room":
+        return [scope_id] if scope_id in snapshot['rooms'] else []
+    if scope_type == "floor":
+        floor_ids = {scope_id}
+    else:
+        floor_ids = {floor.floor_id for floor in snapshot['floors'].values() if floor.building_id == scope_id}
+    return [room.room_id for room in snapshot['rooms'].values() if room.floor_id in floor_ids]
+
+def get_audit_session(session_id):
+    return db.session.get(AuditSession, session_id)
+
+def get_active_audit_session(scope_type, scope_id, user_id=None):
+    return AuditSession.query.filter_by(
+        scope_type=scope_type, scope_id=scope_id, user_id=user_id, status="Active"
+    ).order_by(AuditSession.started_at.desc()).first()
+
+def start_audit_session(scope_type, scope_id, user_id=None):
+    """Start an audit of a room, floor or building, or resume the user's active one.
+
+    Returns:
+        (session, resumed), or (None, False) if the scope does not exist.
+    """
+    if scope_type not in AUDIT_SCOPES or not _scope_exists(scope_type, scope_id):
+        return None, False
+    session = get_active_audit_session(scope_type, scope_id, user_id)
+    if session:
+        return session, True
+    try:
+        session = AuditSession(scope_type, scope_id, user_id)
+        db.session.add(session)
+        db.session.commit()
+        return session, False
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error starting audit session: {e}")
+        return None, False
+
+def _classify_scans(scans):
+    """Attach the asset view and a result (found, misplaced or unknown) to (asset_id, room_id) scans."""
+    asset_ids = [asset_id for asset_id, _ in scans]
+    views = {view[0]['id']: view for view in get_asset_views(asset_ids=asset_ids)} if asset_ids else {}
+    results = []
+    for asset_id, room_id in scans:
+        view = views.get(asset_id)
+        if view is None:
+            results.append({'asset_id': asset_id, 'room_id': room_id, 'result': "unknown", 'asset': None})
+            continue
+        asset, room_name, last_located_name, assignee_name = view
+        asset['room_name'] = room_name
+        asset['last_located_name'] = last_located_name
+        asset['assignee_name'] = assignee_name
+        results.append({
+            'asset_id': asset_id,
+            'room_id': room_id,
+            'result': "found" if asset['room_id'] == room_id else "misplaced",
+            'asset': asset
+        })
+    return results
+
+def add_audit_scans(session_id, asset_ids, room_id=None):
+    """Record scanned tags for an active session. Tags already scanned are ignored.
+
+    room_id is where the tags were scanned; it defaults to the session's room
+    and must be inside the session's scope.
+
+    Returns:
+        List of per-tag results (see _classify_scans) with 'duplicate' set for
+        tags that were already recorded, or None if the session or room is invalid.
+    """
+    session = get_audit_session(session_id)
+    if not session or session.status != "Active":
+        return None
+    if room_id is None and session.scope_type == "room":
+        room_id = session.scope_id
+    if room_id not in get_scope_room_ids(session.scope_type, session.scope_id):
+        return None
+
+    # Keep the first occurrence of each tag, in scan order
+    asset_ids = list(dict.fromkeys(str(asset_id).strip() for asset_id in asset_ids if str(asset_id).strip()))
+    existing = dict(
+        db.session.query(AuditScan.asset_id, AuditScan.room_id)
+        .filter(AuditScan.session_id == session_id, AuditScan.asset_id.in_(asset_ids))
+        .all()
+    ) if asset_ids else {}
+    new_ids = [asset_id for asset_id in asset_ids if asset_id not in existing]
+
+    try:
+        if new_ids:
+            now = datetime.now()
+            db.session.execute(AuditScan.__table__.insert(), [
+                {'session_id': session_id, 'asset_id': asset_id, 'room_id': room_id, 'scanned_at': now}
+                for asset_id in new_ids
+            ])
+            db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error recording audit scans for session {session_id}: {e}")
+        return None
+
+    results = _classify_scans([(asset_id, existing.get(asset_id, room_id)) for asset_id in asset_ids])
+    for result in results:
+        result['duplicate'] = result['asset_id'] in existing
+    return results
+
+def remove_audit_scan(session_id, asset_id):
+    """Undo a scan in an active session. Returns True if a scan was removed."""
+    session = get_audit_session(session_id)
+    if not session or session.status != "Active":
+        return False
+    deleted = AuditScan.query.filter_by(session_id=session_id, asset_id=asset_id).delete()
+    db.session.commit()
+    return deleted > 0
+
+def get_audit_scan_results(session_id):
+    """All scans of a session in scan order, classified as in add_audit_scans."""
+    scans = db.session.query(AuditScan.asset_id, AuditScan.room_id) \
+        .filter(AuditScan.session_id == session_id) \
+        .order_by(AuditScan.id) \
+        .all()
+    return _classify_scans([(asset_id, room_id) for asset_id, room_id in scans])
+
+def reconcile_audit_session(session):
+    """Compare expected, scanned and foreign assets for a session with two set-based queries.
+
+    Returns:
+        Dict with lists of asset ids: found (scanned in their assigned room),
+        misplaced (scanned in another room, including assets from outside the
+        scope), missing (expected but not scanned) and unknown (tags that
+        match no asset), plus 'scans' with the (asset_id, scanned room_id,
+        assigned room_id, old_status) of every scanned asset.
+    """
+    room_ids = get_scope_room_ids(session.scope_type, session.scope_id)
+    scanned = select(AuditScan.asset_id).where(AuditScan.session_id == session.id)
+
+    # Scanned vs assigned room, one row per scanned tag
+    rows = db.session.query(AuditScan.asset_id, AuditScan.room_id, Asset.id, Asset.room_id, Asset.status) \
+        .outerjoin(Asset, Asset.id == AuditScan.asset_id) \
+        .filter(AuditScan.session_id == session.id) \
+        .order_by(AuditScan.id) \
+        .all()
+
+    summary = {'found': [], 'misplaced': [], 'missing': [], 'unknown': [], 'scans': []}
+    for tag, scan_room_id, asset_id, assigned_room_id, status in rows:
+        if asset_id is None:
+            summary['unknown'].append(tag)
+            continue
+        summary['found' if assigned_room_id == scan_room_id else 'misplaced'].append(asset_id)
+        summary['scans'].append((asset_id, scan_room_id, assigned_room_id, status))
+
+    # Expected minus scanned
+    summary['missing'] = [
+        asset_id for (asset_id,) in db.session.query(Asset.id)
+        .filter(Asset.room_id.in_(room_ids), Asset.id.not_in(scanned))
+        .order_by(Asset.id)
+    ] if room_ids else []
+    return summary
+
+def complete_audit_session(session_id, user_id=None, mark_missing=True):
+    """Apply an audit session's results in one transaction and close it.
+
+    Scanned assets get last_located set to the room they were scanned in and
+    status Good or Misplaced (the update_asset_location rule) in a single
+    UPDATE; with mark_missing, unscanned expected assets go through
+    mark_assets_missing. One scan event is written per change.
+
+    Returns:
+        The result summary (counts and id lists), or None if the session is
+        not active or the update fails.
+    """
+    session = get_audit_session(session_id)
+    if not session or session.status != "Active":
+        return None
+
+    summary = reconcile_audit_session(session)
+    now = datetime.now()
+    try:
+        if summary['scans']:
+            scan_room = select(AuditScan.room_id) \
+                .where(AuditScan.session_id == session_id, AuditScan.asset_id == Asset.id) \
+                .scalar_subquery()
+            db.session.execute(
+                db.update(Asset)
+                .where(Asset.id.in_(select(AuditScan.asset_id).where(AuditScan.session_id == session_id)))
+                .values(
+                    last_located=scan_room,
+                    status=db.case((Asset.room_id == scan_room, "Good"), else_="Misplaced"),
+                    last_update=now
+                )
+                .execution_options(synchronize_session=False)
+            )
+            touch_asset_version()
+            found = set(summary['found'])
+            add_scan_events_bulk([{
+                'asset_id': asset_id,
+                'user_id': user_id,
+                'room_id': room_id,
+                'status': "Good" if asset_id in found else "Misplaced",
+                'notes': f"Scanned during audit {session_id}. Previous status: {old_status}."
+            } for asset_id, room_id, _, old_status in summary['scans']])
+            adjust_status_counts(
+                (assigned_room_id, old_status, assigned_room_id, "Good" if asset_id in found else "Misplaced")
+                for asset_id, _, assigned_room_id, old_status in summary['scans']
+            )
+
+        missing_result = (0, 0, [])
+        if mark_missing and summary['missing']:
+            missing_result = mark_assets_missing(summary['missing'], user_id, commit=False)
+
+        result = {
+            'found': len(summary['found']),
+            'misplaced': len(summary['misplaced']),
+            'missing': len(summary['missing']),
+            'unknown': len(summary['unknown']),
+            'marked_missing': missing_result[0],
+            'missing_skipped': missing_result[1]
+        }
+        session.status = "Completed"
+        session.completed_at = now
+        session.result = result
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error completing audit session {session_id}: {e}")
+        return None
+
+    summary.pop('scans')
+    summary.update(result=result, missing_errors=missing_result[2])
+    return summary
+
+def cancel_audit_session(session_id):
+    """Close an active session without changing any asset."""
+    session = get_audit_session(session_id)
+    if not session or session.status != "Active":
+        return None
+    session.status = "Cancelled"
+    session.completed_at = datetime.now()
+    db.session.commit()
+    return session
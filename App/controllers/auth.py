@@ -1,9 +1,29 @@
-from flask_jwt_extended import create_access_token, jwt_required, JWTManager, get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended import create_access_token, jwt_required, JWTManager, get_jwt_identity, verify_jwt_in_request, get_current_user
 from App.models import User
+from App.database import db
+from App.passwords import needs_rehash, verify_password
+from App.controllers.user_cache import get_cached_user, invalidate_cached_user, touch_user_version
+
+def _upgrade_password_hash(user_id, password):
+    """Re-hash a password stored with an old work factor. Login goes ahead even if this fails."""
+    try:
+        user = db.session.get(User, user_id)
+        user.set_password(password)
+        touch_user_version()
+        db.session.commit()
+        invalidate_cached_user(user_id)
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error upgrading password hash for user {user_id}: {e}")
 
 def login(email, password):
-    user = User.query.filter_by(email=email).first()
-    if user and user.check_password(password):
+    row = db.session.query(User.id, User.password).filter_by(email=email).first()
+    # End the read so the connection goes back to the pool while the hash
+    # runs; a burst of logins would otherwise hold every connection
+    db.session.commit()
+    if row and verify_password(row.password, password):
+        if needs_rehash(row.password):
+            _upgrade_password_hash(row.id, password)
         return create_access_token(identity=email)
     return None
 
@@ -20,7 +40,7 @@ def setup_jwt(app):
     @jwt.user_lookup_loader
     def user_lookup_callback(_jwt_header, jwt_data):
         identity = jwt_data["sub"]
-        return User.query.get(int(identity))  # Convert back to integer for lookup
+        return get_cached_user(int(identity), jwt_data.get("iat"))  # Convert back to integer for lookup
 
     return jwt
 
@@ -29,9 +49,8 @@ def add_auth_context(app):
     def inject_user():
         try:
             verify_jwt_in_request()
-            user_id = get_jwt_identity()
-            user_id = int(user_id)  # Convert string to integer
-            current_user = User.query.get(user_id)
+            # Loaded by user_lookup_callback, which reuses the request's user
+            current_user = get_current_user()
             is_authenticated = True
         except Exception as e:
             print(e)
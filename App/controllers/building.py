@@ -1,15 +1,22 @@
 from App.models import Building
 from App.database import db
 from App.controllers.floor import *
+from App.controllers.location_cache import get_location_snapshot, touch_location_version, clear_location_cache
 
-def create_building(building_id, building_name):
+def create_building(building_id, building_name, invalidate=True):
     new_building = Building(building_id=building_id, building_name=building_name)
     db.session.add(new_building)
+    # invalidate=False leaves the version bump to the caller (see publish_location_changes)
+    if invalidate:
+        touch_location_version()
     db.session.commit()
+    if invalidate:
+        clear_location_cache()
     return new_building
 
 def get_building(building_id):
-    return Building.query.get(building_id)
+    # Served from the cached hierarchy; the returned building is read-only
+    return get_location_snapshot()['buildings'].get(building_id)
 
 def edit_building(building_id, building_name):
     print(f"Starting edit_building with ID: {building_id}, Name: {building_name}")
@@ -21,41 +28,50 @@ def edit_building(building_id, building_name):
             .where(Building.building_id == building_id)
             .values(building_name=building_name)
         )
+        touch_location_version()
         db.session.commit()
+        clear_location_cache()
         # Get the updated building
         updated_building = get_building(building_id)
         print(f"Updated building: {updated_building.building_name}")
         return updated_building
     except Exception as e:
         db.session.rollback()
+        clear_location_cache()
         print(f"Error updating building: {e}")
         return None
 
 def get_all_building_json():
-    buildings = Building.query.filter(Building.building_id != "DEFAULT").all()
+    buildings = [building for building in get_location_snapshot()['buildings'].values()
+                 if building.building_id != "DEFAULT"]
     if not buildings:
         return[]
     buildings = [building.get_json() for building in buildings]
     return buildings
 
 def update_building(building_id, building_name):
-    building = get_building(building_id)
+    building = Building.query.get(building_id)
     if not building: return None
     building.building_name = building_name
-    return db.session.commit()
+    touch_location_version()
+    db.session.commit()
+    clear_location_cache()
 
 def delete_building(building_id):
-    building = get_building(building_id)
+    building = Building.query.get(building_id)
     if not building:
         return False  # Building not found
 
     try:
         db.session.delete(building)
+        touch_location_version()
         db.session.commit()
         return True  # Building deleted successfully
     except Exception as e:
         db.session.rollback()
         # Optionally log the error: log.error(f"Error deleting building: {e}")
         return False
+    finally:
+        clear_location_cache()
 
 
@@ -0,0 +1,34 @@
+import io, os
+from contextlib import contextmanager
+
+
+def _iter_text_lines(lines):
+    for line_num, line in enumerate(lines):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if line_num == 0:
+            line = line.lstrip('﻿')
+        yield line
+
+
+@contextmanager
+def open_csv_source(source):
+    """Open a CSV source as text lines for csv.reader.
+
+    source can be a file path, a binary or text file object (e.g. an upload's
+    FileStorage.stream) or an iterable of str/bytes lines. File objects are
+    decoded incrementally and left open for their owner to close.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'r', encoding='utf-8-sig', newline='') as file:
+            yield file
+    elif isinstance(source, io.TextIOBase):
+        yield source
+    elif hasattr(source, 'read'):
+        text = io.TextIOWrapper(source, encoding='utf-8-sig', newline='')
+        try:
+            yield text
+        finally:
+            text.detach()
+    else:
+        yield _iter_text_lines(source)
@@ -0,0 +1,39 @@
+from App.models import DataVersion
+from App.database import db
+from App.controllers.status_counts import _UPSERT_INSERTS
+
+def get_data_version(name):
+    """Return the current version of a data set, 0 if it was never bumped."""
+    version = db.session.query(DataVersion.version).filter_by(name=name).scalar()
+    return version or 0
+
+def get_data_versions(names):
+    """Return {name: version} for several data sets in one query, 0 for any never bumped."""
+    versions = dict.fromkeys(names, 0)
+    versions.update(db.session.query(DataVersion.name, DataVersion.version).filter(DataVersion.name.in_(names)))
+    return versions
+
+def bump_data_version(name):
+    """Increment a data set's version inside the caller's transaction.
+
+    The caller commits, so the new version becomes visible to other
+    workers together with the change it describes. The first bump of a
+    name inserts its row with an upsert, so two workers bumping a new name
+    at once both count instead of one failing on the primary key.
+    """
+    table = DataVersion.__table__
+    upsert = _UPSERT_INSERTS.get(db.session.get_bind().dialect.name)
+    if upsert:
+        stmt = upsert(table).values(name=name, version=1)
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.name],
+            set_={'version': table.c.version + 1}
+        ))
+        return
+    result = db.session.execute(
+        table.update()
+        .where(table.c.name == name)
+        .values(version=table.c.version + 1)
+    )
+    if result.rowcount == 0:
+        db.session.execute(table.insert().values(name=name, version=1))
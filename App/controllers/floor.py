@@ -1,21 +1,28 @@
 from App.models import Floor
 from App.database import db
 from App.controllers.room import *
+from App.controllers.location_cache import get_location_snapshot, touch_location_version, clear_location_cache
 
-def create_floor(floor_id, building_id, floor_name):
+def create_floor(floor_id, building_id, floor_name, invalidate=True):
     new_floor = Floor(floor_id=floor_id, building_id=building_id, floor_name=floor_name)
     db.session.add(new_floor)
+    # invalidate=False leaves the version bump to the caller (see publish_location_changes)
+    if invalidate:
+        touch_location_version()
     db.session.commit()
+    if invalidate:
+        clear_location_cache()
     return new_floor
 
 def get_floor(floor_id):
-    return Floor.query.get(floor_id)
+    # Served from the cached hierarchy; the returned floor is read-only
+    return get_location_snapshot()['floors'].get(floor_id)
 
 def get_floors_by_building(building_id):
-    return Floor.query.filter_by(building_id=building_id).all()
+    return [floor for floor in get_location_snapshot()['floors'].values() if floor.building_id == building_id]
 
 def get_all_floors():
-    return Floor.query.filter(Floor.floor_id != "DEFAULT").all()
+    return [floor for floor in get_location_snapshot()['floors'].values() if floor.floor_id != "DEFAULT"]
 
 def get_all_floors_json():
     floors=get_all_floors()
@@ -24,29 +31,35 @@ def get_all_floors_json():
     return floors
 
 def update_floor(floor_id, building_id, floor_name):
-    floor = get_floor(floor_id)
+    floor = Floor.query.get(floor_id)
     if not floor: return None
     floor.building_id = building_id
     floor.floor_name = floor_name
     try:
+        touch_location_version()
         db.session.commit()
         return True
     except Exception as e:
         db.session.rollback()
         print(f"Error updating floor: {e}")
         return None
+    finally:
+        clear_location_cache()
 
 def delete_floor(floor_id):
-    floor = get_floor(floor_id)
+    floor = Floor.query.get(floor_id)
     if not floor:
         return False  # Floor not found
 
     try:
         db.session.delete(floor)
+        touch_location_version()
         db.session.commit()
         return True  # Floor deleted successfully
     except Exception as e:
         db.session.rollback()
         log.error(f"Error deleting floor: {e}")
         return False
+    finally:
+        clear_location_cache()
 
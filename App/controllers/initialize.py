@@ -7,6 +7,8 @@ from App.controllers.floor import *
 from App.controllers.provider import *
 from App.controllers.room import *
 from App.controllers.scanevent import *
+from App.controllers.location_cache import clear_location_cache
+from App.controllers.user_cache import clear_user_cache
 from datetime import datetime
 from App.database import db
 from sqlalchemy import inspect
@@ -69,6 +71,8 @@ def initialize():
         print("Attempting db.create_all()...")
         db.create_all()
         db.session.commit() # Commit after create
+        clear_location_cache() # Version counters were dropped with the tables
+        clear_user_cache() # So were the users
         print("db.create_all() completed.")
 
         # Verify asset table is empty
@@ -152,8 +156,9 @@ def ensure_defaults():
     if not (inspector.has_table('building') and 
         inspector.has_table('floor') and 
         inspector.has_table('room') and 
-        inspector.has_table('user')):
-        # Tables don't exist yet, so don't try to add defaults
+        inspector.has_table('user') and
+        inspector.has_table('data_version')):
+        # Tables don't exist yet (or `flask db upgrade` has yet to run), so don't try to add defaults
         return
     
     # Create default building if it doesn't exist
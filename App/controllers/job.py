@@ -0,0 +1,189 @@
+import os, socket, tempfile, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import inspect
+from App.database import db
+from App.models import Job, JobError
+from App.controllers.asset import upload_csv
+from App.controllers.location_import import upload_locations_csv
+
+# Asset rows committed between progress updates
+JOB_CHUNK_SIZE = 1000
+
+# One worker per process, so imports never compete with each other for the
+# SQLite write lock. Under gevent the thread is a greenlet; runners yield
+# between chunks (see run_job) so requests keep being served.
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _import_assets(path, progress):
+    return upload_csv(path, chunk_size=JOB_CHUNK_SIZE, progress=progress)
+
+def _import_locations(path, progress):
+    return upload_locations_csv(path, progress=progress)
+
+# Job kind -> runner(path, progress) returning a results dict with total, skipped and errors
+JOB_RUNNERS = {
+    'assets-csv': _import_assets,
+    'locations-csv': _import_locations,
+}
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='job-worker')
+        return _executor
+
+def count_csv_rows(path):
+    """Estimate the data rows in a CSV file by counting newlines (used for percent done)."""
+    lines = 0
+    last = b'\n'
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            lines += block.count(b'\n')
+            last = block[-1:]
+    if last != b'\n':
+        lines += 1
+    return max(lines - 1, 0)
+
+def _runner_id():
+    """host:pid of this process, which holds the queue its jobs wait in."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def _runner_is_alive(runner):
+    if not runner:
+        return False  # Queued before jobs recorded their process
+    host, _, pid = runner.rpartition(':')
+    if host != socket.gethostname() or os.name != 'posix':
+        return True  # Can't tell from here; left to that host
+    if not pid.isdigit() or int(pid) == os.getpid():
+        return False  # This process has only just started, so the job was queued by an earlier one
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # Exists, under another user
+    return True
+
+def create_job(kind, filename=None, user_id=None, total=None, temp_path=None):
+    job = Job(kind, filename=filename, user_id=user_id, total=total, runner=_runner_id(), temp_path=temp_path)
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+def fail_stale_jobs():
+    """Mark Queued and Running jobs whose process has exited as Failed and delete their files.
+
+    A job waits in, and runs on, the executor of the process that accepted
+    the upload, so once that process is gone the job can never finish.
+    Run at startup; jobs queued on other hosts are left alone.
+
+    Returns:
+        The number of jobs failed.
+    """
+    inspector = inspect(db.engine)
+    if not inspector.has_table('job') or 'runner' not in {column['name'] for column in inspector.get_columns('job')}:
+        return 0  # `flask db upgrade` has yet to run
+    jobs = Job.query.filter(Job.status.in_(["Queued", "Running"])).all()
+    stale = [job for job in jobs if not _runner_is_alive(job.runner)]
+    for job in stale:
+        job.status = "Failed"
+        job.message = "The server restarted before this job finished. Please upload the file again."
+        job.finished_at = datetime.now()
+    try:
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error failing stale jobs: {e}")
+        return 0
+    for job in stale:
+        if job.temp_path:
+            try:
+                os.remove(job.temp_path)
+            except FileNotFoundError:
+                pass  # Already gone, or another worker starting up got there first
+    return len(stale)
+
+def get_job(job_id):
+    return db.session.get(Job, job_id)
+
+def iter_job_errors(job_id, after=0, batch_size=1000):
+    """Yield a job's errors in order, starting after the error id `after`."""
+    query = db.session.query(JobError.id, JobError.message) \
+        .filter(JobError.job_id == job_id, JobError.id > after) \
+        .order_by(JobError.id) \
+        .yield_per(batch_size)
+    for error_id, message in query:
+        yield {'id': error_id, 'message': message}
+
+def enqueue_csv_import(kind, file, user_id=None):
+    """Save an uploaded file to a temp file and queue a job to import it.
+
+    Returns:
+        (job, future) - the future resolves once the worker has finished.
+    """
+    if kind not in JOB_RUNNERS:
+        raise ValueError(f"Unknown job kind '{kind}'")
+
+    handle, path = tempfile.mkstemp(prefix='import-', suffix='.csv')
+    try:
+        with os.fdopen(handle, 'wb') as out:
+            file.save(out)
+        job = create_job(kind, filename=file.filename, user_id=user_id, total=count_csv_rows(path), temp_path=path)
+    except Exception:
+        os.remove(path)
+        raise
+    return job, submit_job(job.id, path)
+
+def submit_job(job_id, path):
+    app = current_app._get_current_object()
+    return _get_executor().submit(_run_in_app_context, app, job_id, path)
+
+def _run_in_app_context(app, job_id, path):
+    with app.app_context():
+        run_job(job_id, path)
+
+def run_job(job_id, path):
+    """Run a queued job on the file at path, saving progress and errors as it goes.
+
+    The file is deleted when the job finishes, whatever the outcome.
+    """
+    job = get_job(job_id)
+    saved_errors = 0
+
+    def progress(results):
+        nonlocal saved_errors
+        errors = results['errors']
+        db.session.add_all(JobError(job_id, message) for message in errors[saved_errors:])
+        saved_errors = len(errors)
+        job.processed = results['total']
+        job.skipped = results['skipped']
+        job.error_count = saved_errors
+        db.session.commit()
+        time.sleep(0)  # Let other greenlets run between chunks
+
+    try:
+        job.status = "Running"
+        job.started_at = datetime.now()
+        db.session.commit()
+
+        results = JOB_RUNNERS[job.kind](path, progress)
+        progress(results)
+        job.result = {key: value for key, value in results.items() if key != 'errors'}
+        job.message = f"Processed {results['total']} rows, {results['skipped']} skipped."
+        job.status = "Completed"
+    except Exception as e:
+        db.session.rollback()
+        print(f"Job {job_id} failed: {e}")
+        job.message = f"Error processing CSV: {str(e)}"
+        job.status = "Failed"
+    finally:
+        job.finished_at = datetime.now()
+        db.session.commit()
+        if os.path.exists(path):
+            os.remove(path)
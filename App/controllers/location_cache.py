@@ -0,0 +1,79 @@
+import threading
+from flask import g, has_request_context
+from App.models import Building, Floor, Room
+from App.controllers.dataversion import get_data_version, bump_data_version
+from App.database import db
+
+# DataVersion row bumped by every building, floor and room write
+LOCATION_VERSION = "location"
+
+# Immutable snapshot of the whole hierarchy; replaced wholesale on reload so
+# readers never see a half-built one.
+_snapshot = None
+_reload_lock = threading.Lock()
+
+
+def _load_snapshot(version):
+    buildings = {
+        building_id: Building(building_id, building_name)
+        for building_id, building_name in db.session.query(Building.building_id, Building.building_name)
+    }
+    floors = {
+        floor_id: Floor(floor_id, building_id, floor_name)
+        for floor_id, building_id, floor_name in db.session.query(Floor.floor_id, Floor.building_id, Floor.floor_name)
+    }
+    rooms = {
+        room_id: Room(room_id, floor_id, room_name)
+        for room_id, floor_id, room_name in db.session.query(Room.room_id, Room.floor_id, Room.room_name)
+    }
+    return {'version': version, 'buildings': buildings, 'floors': floors, 'rooms': rooms}
+
+
+def get_location_snapshot():
+    """Return this worker's cached copy of all buildings, floors and rooms.
+
+    The DataVersion row is checked at most once per request (on every call
+    outside a request) and the hierarchy is reloaded when another worker has
+    bumped it. The cached objects are detached from the session, so treat
+    them as read-only and load rows through the query API to change them.
+    """
+    global _snapshot
+    snapshot = _snapshot
+    in_request = has_request_context()
+    if snapshot is not None and in_request and g.get('_location_version_checked'):
+        return snapshot
+
+    # Read the version before the rows so a concurrent write can only make
+    # the snapshot look older than it is, never newer.
+    version = get_data_version(LOCATION_VERSION)
+    if snapshot is None or snapshot['version'] != version:
+        with _reload_lock:
+            snapshot = _snapshot
+            if snapshot is None or snapshot['version'] != version:
+                snapshot = _load_snapshot(version)
+                _snapshot = snapshot
+    if in_request:
+        g._location_version_checked = True
+    return snapshot
+
+
+def touch_location_version():
+    """Mark the hierarchy as changed in the current transaction."""
+    bump_data_version(LOCATION_VERSION)
+
+
+def clear_location_cache():
+    """Drop this worker's snapshot so the next read reloads it."""
+    global _snapshot
+    _snapshot = None
+
+
+def publish_location_changes():
+    """Bump the version once for locations committed with invalidate=False.
+
+    Bulk writers use this so every worker reloads the hierarchy once at
+    the end instead of after each row.
+    """
+    touch_location_version()
+    db.session.commit()
+    clear_location_cache()
@@ -0,0 +1,220 @@
+import csv
+from datetime import datetime
+from App.database import db
+from App.models import Building, Floor, Room
+from App.controllers.csvsource import open_csv_source
+from App.controllers.location_cache import publish_location_changes
+from App.controllers.building import create_building, get_building, get_all_building_json
+from App.controllers.floor import create_floor, get_floor, get_floors_by_building
+from App.controllers.room import create_room, get_room, get_rooms_by_floor
+
+# Rows between progress callbacks (every row already commits on its own)
+PROGRESS_INTERVAL = 100
+
+def _find_by_name(locations, name_attr, name):
+    return next((location for location in locations if getattr(location, name_attr).lower() == name.lower()), None)
+
+def upload_locations_csv(source, progress=None):
+    """Import buildings, floors and rooms from a CSV path, file object or iterable of lines.
+
+    Existing locations are matched by id, or by name within their parent when
+    no id is given. progress(results) is called every PROGRESS_INTERVAL rows.
+    The location cache is invalidated once, after the last row.
+
+    Returns:
+        Dict with success, total, buildings_created, floors_created,
+        rooms_created, skipped and errors.
+    """
+    with open_csv_source(source) as stream:
+        reader = csv.DictReader(stream)
+        
+        results = {
+            'success': False,
+            'total': 0,
+            'buildings_created': 0,
+            'floors_created': 0,
+            'rooms_created': 0,
+            'skipped': 0,
+            'errors': []
+        }
+        
+        # Track which entities we've already processed to avoid duplicates.
+        # Locations created here are not in the cached hierarchy until the
+        # import publishes them, so they are looked up here first. They are
+        # kept as detached copies, as committed rows would reload on each read.
+        processed_buildings = {}  # Dict of id -> building object
+        processed_floors = {}  # Dict of id -> floor object
+        processed_rooms = {}  # Dict of id -> room object
+
+        try:
+            for row_num, row in enumerate(reader, start=2):  # Start at 2 to account for header row
+                if progress and results['total'] and results['total'] % PROGRESS_INTERVAL == 0:
+                    progress(results)
+                results['total'] += 1
+                try:
+                    # Extract data with defaults for missing values
+                    building_id = row.get('building_id', '').strip()
+                    building_name = row.get('building_name', '').strip()
+                    floor_id = row.get('floor_id', '').strip()
+                    floor_name = row.get('floor_name', '').strip()
+                    room_id = row.get('room_id', '').strip()
+                    room_name = row.get('room_name', '').strip()
+
+                    # Skip empty rows
+                    if not building_name:
+                        results['errors'].append(f"Row {row_num}: Missing building name (required)")
+                        results['skipped'] += 1
+                        continue
+
+                    # BUILDING HANDLING
+                    current_building = None
+
+                    # If building_id provided, check if it exists
+                    if building_id:
+                        existing_building = processed_buildings.get(building_id) or get_building(building_id)
+                        if existing_building:
+                            # Building exists with this ID
+                            current_building = existing_building
+
+                            # Verify the building name matches
+                            if existing_building.building_name != building_name:
+                                results['errors'].append(f"Row {row_num}: Building ID {building_id} exists but with name '{existing_building.building_name}' (not '{building_name}')")
+                                results['skipped'] += 1
+                                continue
+                        else:
+                            # Building ID provided but doesn't exist, create it
+                            create_building(building_id, building_name, invalidate=False)
+                            current_building = Building(building_id, building_name)
+                            results['buildings_created'] += 1
+                    else:
+                        # No building_id provided, check if a building with this name exists
+                        existing_building = _find_by_name(processed_buildings.values(), 'building_name', building_name)
+                        if not existing_building:
+                            buildings = get_all_building_json()
+                            match = next((b for b in buildings if b['building_name'].lower() == building_name.lower()), None)
+                            existing_building = match and get_building(match['building_id'])
+
+                        if existing_building:
+                            # Building exists with this name
+                            current_building = existing_building
+                        else:
+                            # Generate a unique building ID
+                            new_building_id = f"B{datetime.now().strftime('%Y%m%d%H%M%S')}"
+                            create_building(new_building_id, building_name, invalidate=False)
+                            current_building = Building(new_building_id, building_name)
+                            results['buildings_created'] += 1
+
+                    # Store the building for reference
+                    processed_buildings[current_building.building_id] = current_building
+
+                    # If we don't have floor information, we're done with this row
+                    if not floor_name:
+                        continue
+
+                    # FLOOR HANDLING
+                    current_floor = None
+
+                    # If floor_id provided, check if it exists
+                    if floor_id:
+                        existing_floor = processed_floors.get(floor_id) or get_floor(floor_id)
+                        if existing_floor:
+                            # Floor exists with this ID
+                            current_floor = existing_floor
+
+                            # Verify the floor belongs to the right building
+                            if existing_floor.building_id != current_building.building_id:
+                                results['errors'].append(f"Row {row_num}: Floor ID {floor_id} exists but belongs to building {existing_floor.building_id} (not {current_building.building_id})")
+                                results['skipped'] += 1
+                                continue
+
+                            # Verify the floor name matches
+                            if existing_floor.floor_name != floor_name:
+                                results['errors'].append(f"Row {row_num}: Floor ID {floor_id} exists but with name '{existing_floor.floor_name}' (not '{floor_name}')")
+                                results['skipped'] += 1
+                                continue
+                        else:
+                            # Floor ID provided but doesn't exist, create it
+                            create_floor(floor_id, current_building.building_id, floor_name, invalidate=False)
+                            current_floor = Floor(floor_id, current_building.building_id, floor_name)
+                            results['floors_created'] += 1
+                    else:
+                        # No floor_id provided, check if a floor with this name exists in the building
+                        floors = [f for f in processed_floors.values() if f.building_id == current_building.building_id]
+                        floors += get_floors_by_building(current_building.building_id)
+                        existing_floor = _find_by_name(floors, 'floor_name', floor_name)
+
+                        if existing_floor:
+                            # Floor exists with this name in this building
+                            current_floor = existing_floor
+                        else:
+                            # Generate a unique floor ID
+                            new_floor_id = f"F{datetime.now().strftime('%Y%m%d%H%M%S')}"
+                            create_floor(new_floor_id, current_building.building_id, floor_name, invalidate=False)
+                            current_floor = Floor(new_floor_id, current_building.building_id, floor_name)
+                            results['floors_created'] += 1
+
+                    # Store the floor for reference
+                    processed_floors[current_floor.floor_id] = current_floor
+
+                    # If we don't have room information, we're done with this row
+                    if not room_name:
+                        continue
+
+                    # ROOM HANDLING
+                    current_room = None
+
+                    # If room_id provided, check if it exists
+                    if room_id:
+                        existing_room = processed_rooms.get(room_id) or get_room(room_id)
+                        if existing_room:
+                            # Room exists with this ID
+                            current_room = existing_room
+
+                            # Verify the room belongs to the right floor
+                            if existing_room.floor_id != current_floor.floor_id:
+                                results['errors'].append(f"Row {row_num}: Room ID {room_id} exists but belongs to floor {existing_room.floor_id} (not {current_floor.floor_id})")
+                                results['skipped'] += 1
+                                continue
+
+                            # Verify the room name matches
+                            if existing_room.room_name != room_name:
+                                results['errors'].append(f"Row {row_num}: Room ID {room_id} exists but with name '{existing_room.room_name}' (not '{room_name}')")
+                                results['skipped'] += 1
+                                continue
+                        else:
+                            # Room ID provided but doesn't exist, create it
+                            create_room(room_id, current_floor.floor_id, room_name, invalidate=False)
+                            current_room = Room(room_id, current_floor.floor_id, room_name)
+                            results['rooms_created'] += 1
+                    else:
+                        # No room_id provided, check if a room with this name exists in the floor
+                        rooms = [r for r in processed_rooms.values() if r.floor_id == current_floor.floor_id]
+                        rooms += get_rooms_by_floor(current_floor.floor_id)
+                        existing_room = _find_by_name(rooms, 'room_name', room_name)
+
+                        if existing_room:
+                            # Room exists with this name in this floor
+                            current_room = existing_room
+                        else:
+                            # Generate a unique room ID
+                            new_room_id = f"R{datetime.now().strftime('%Y%m%d%H%M%S')}"
+                            create_room(new_room_id, current_floor.floor_id, room_name, invalidate=False)
+                            current_room = Room(new_room_id, current_floor.floor_id, room_name)
+                            results['rooms_created'] += 1
+
+                    # Store the room for reference
+                    processed_rooms[current_room.room_id] = current_room
+
+                except Exception as e:
+                    db.session.rollback()
+                    results['errors'].append(f"Row {row_num}: Error - {str(e)}")
+                    results['skipped'] += 1
+
+        finally:
+            if results['buildings_created'] or results['floors_created'] or results['rooms_created']:
+                publish_location_changes()
+
+        results['success'] = results['buildings_created'] > 0 or results['floors_created'] > 0 or results['rooms_created'] > 0
+        if progress:
+            progress(results)
+        return results
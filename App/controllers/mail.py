@@ -1,8 +1,36 @@
+import smtplib, threading, uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from flask_mail import Mail, Message
 from flask import render_template, current_app
+from sqlalchemy import func
+from App.database import db
+from App.models import OutboxMessage
 
 mail = Mail()
 
+# Messages sent over one SMTP connection before it is closed
+MAIL_BATCH_SIZE = 50
+
+# A message is given up (status Failed) after this many failed sends
+MAIL_MAX_ATTEMPTS = 8
+
+# Wait before the first retry, in seconds; doubled after each failure up to MAIL_MAX_RETRY_DELAY
+MAIL_RETRY_DELAY = 60
+MAIL_MAX_RETRY_DELAY = 3600
+
+# How long a sender keeps the messages it has taken. A sender that dies
+# mid-batch leaves its messages to be sent again after this.
+MAIL_CLAIM_SECONDS = 300
+
+# One sender per process. Under gevent the thread is a greenlet and SMTP
+# I/O yields, so sending never holds up requests.
+_sender = None
+_sender_running = False
+_sender_lock = threading.Lock()
+_wakeup = threading.Event()
+
+
 def init_mail(app):
     """Initialize mail with application config"""
     app.config['MAIL_SERVER'] = app.config.get('MAIL_SERVER', 'smtp.gmail.com')
@@ -11,23 +39,37 @@ def init_mail(app):
     app.config['MAIL_USERNAME'] = app.config.get('MAIL_USERNAME', '')
     app.config['MAIL_PASSWORD'] = app.config.get('MAIL_PASSWORD', '')
     app.config['MAIL_DEFAULT_SENDER'] = app.config.get('MAIL_DEFAULT_SENDER', ('iGOVTT Asset Tracker', 'noreply@igov.tt'))
-    
+    app.config['MAIL_SEND_IN_BACKGROUND'] = app.config.get('MAIL_SEND_IN_BACKGROUND', True)
+
     mail.init_app(app)
     return mail
 
+def queue_email(subject, recipients, html):
+    """Add an email to the outbox and wake the background sender.
+
+    Returns:
+        The OutboxMessage, or None if it could not be saved.
+    """
+    try:
+        message = OutboxMessage(subject, recipients, html)
+        db.session.add(message)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error queueing email: {e}")
+        return None
+    if current_app.config.get('MAIL_SEND_IN_BACKGROUND', True):
+        _wake_sender()
+    return message
+
 def send_email(subject, recipients, template, **kwargs):
-    """Send an email using a template"""
+    """Queue an email using a template. It is sent by the background sender, not in the request."""
     try:
-        msg = Message(
-            subject,
-            recipients=recipients
-        )
-        msg.html = render_template(template, **kwargs)
-        mail.send(msg)
-        return True
+        html = render_template(template, **kwargs)
     except Exception as e:
-        current_app.logger.error(f"Error sending email: {str(e)}")
+        current_app.logger.error(f"Error rendering email: {str(e)}")
         return False
+    return queue_email(subject, recipients, html) is not None
 
 def send_password_reset_email(user_email, reset_url):
     """Send password reset email with reset link"""
@@ -44,3 +86,131 @@ def send_password_reset_email(user_email, reset_url):
         print(f"Error sending password reset email to {user_email}: {str(e)}")
         current_app.logger.error(f"Password reset email failed: {str(e)}")
         return False
+
+def _retry_delay(attempts):
+    return min(MAIL_RETRY_DELAY * 2 ** (attempts - 1), MAIL_MAX_RETRY_DELAY)
+
+def _claim_due_messages(batch_size):
+    """Take up to batch_size due messages for this sender, so other workers' senders skip them."""
+    now = datetime.now()
+    due = (OutboxMessage.status == "Pending", OutboxMessage.next_attempt_at <= now)
+    ids = [message_id for (message_id,) in db.session.query(OutboxMessage.id)
+           .filter(*due)
+           .order_by(OutboxMessage.next_attempt_at, OutboxMessage.id)
+           .limit(batch_size)]
+    if not ids:
+        return []
+
+    token = uuid.uuid4().hex
+    # Only rows still due are taken; another sender may have got there first
+    db.session.query(OutboxMessage) \
+        .filter(OutboxMessage.id.in_(ids), *due) \
+        .update({'claimed_by': token, 'next_attempt_at': now + timedelta(seconds=MAIL_CLAIM_SECONDS)},
+                synchronize_session=False)
+    db.session.commit()
+    return OutboxMessage.query.filter_by(claimed_by=token).order_by(OutboxMessage.id).all()
+
+def _record_failure(message, error, now):
+    message.attempts += 1
+    message.claimed_by = None
+    message.last_error = str(error)[:1000]
+    if message.attempts >= MAIL_MAX_ATTEMPTS:
+        message.status = "Failed"
+    else:
+        message.next_attempt_at = now + timedelta(seconds=_retry_delay(message.attempts))
+
+def send_outbox_batch(batch_size=MAIL_BATCH_SIZE):
+    """Send up to batch_size due outbox messages over one SMTP connection.
+
+    A message the server rejects is retried later with backoff. If the
+    connection cannot be opened or drops, every message not yet sent is.
+    Delivery is at least once: a sender that dies before saving the
+    results leaves its messages to be sent again.
+
+    Returns:
+        (sent, failed) counts; (0, 0) when nothing is due.
+    """
+    messages = _claim_due_messages(batch_size)
+    if not messages:
+        return 0, 0
+    sent = failed = 0
+    pending = list(messages)
+    try:
+        with mail.connect() as connection:
+            while pending:
+                message = pending[0]
+                try:
+                    connection.send(Message(message.subject, recipients=message.recipients, html=message.html))
+                except smtplib.SMTPServerDisconnected:
+                    raise
+                except Exception as e:
+                    _record_failure(message, e, datetime.now())
+                    failed += 1
+                else:
+                    message.attempts += 1
+                    message.status = "Sent"
+                    message.sent_at = datetime.now()
+                    message.claimed_by = None
+                    sent += 1
+                pending.pop(0)
+    except Exception as e:
+        # Nothing more can go out on this connection
+        current_app.logger.error(f"Error sending email batch: {e}")
+        for message in pending:
+            _record_failure(message, e, datetime.now())
+            failed += 1
+    db.session.commit()
+    return sent, failed
+
+def send_outbox(batch_size=MAIL_BATCH_SIZE):
+    """Send every due outbox message, one connection per batch. Returns (sent, failed) counts."""
+    sent = failed = 0
+    while True:
+        batch_sent, batch_failed = send_outbox_batch(batch_size)
+        if not batch_sent and not batch_failed:
+            return sent, failed
+        sent += batch_sent
+        failed += batch_failed
+
+def get_next_mail_retry_delay():
+    """Seconds until the next pending outbox message is due, or None if there are none."""
+    next_attempt_at = db.session.query(func.min(OutboxMessage.next_attempt_at)) \
+        .filter(OutboxMessage.status == "Pending") \
+        .scalar()
+    if next_attempt_at is None:
+        return None
+    return max((next_attempt_at - datetime.now()).total_seconds(), 0)
+
+def _wake_sender():
+    global _sender, _sender_running
+    app = current_app._get_current_object()
+    _wakeup.set()
+    with _sender_lock:
+        if _sender_running:
+            return
+        _sender_running = True
+        if _sender is None:
+            _sender = ThreadPoolExecutor(max_workers=1, thread_name_prefix='mail-sender')
+    _sender.submit(_run_sender, app)
+
+def _run_sender(app):
+    """Send due messages until the outbox has no pending ones, sleeping until each retry is due."""
+    global _sender_running
+    with app.app_context():
+        while True:
+            _wakeup.clear()
+            try:
+                send_outbox()
+                delay = get_next_mail_retry_delay()
+            except Exception as e:
+                db.session.rollback()
+                app.logger.exception(f"Error in mail sender: {e}")
+                delay = MAIL_RETRY_DELAY
+            if delay is None:
+                with _sender_lock:
+                    # A message queued since the last pass set the event
+                    if not _wakeup.is_set():
+                        _sender_running = False
+                        return
+                continue
+            _wakeup.wait(delay)
@@ -2,24 +2,31 @@ from logging import log
 from App.models import Room, Floor, Building
 from App.controllers.building import *
 from App.controllers.floor import *
+from App.controllers.location_cache import get_location_snapshot, touch_location_version, clear_location_cache
 from App.database import db
 import os, csv
 
 
-def create_room(room_id, floor_id, room_name):
+def create_room(room_id, floor_id, room_name, invalidate=True):
     new_room = Room(room_id=room_id, floor_id=floor_id, room_name=room_name)
     db.session.add(new_room)
+    # invalidate=False leaves the version bump to the caller (see publish_location_changes)
+    if invalidate:
+        touch_location_version()
     db.session.commit()
+    if invalidate:
+        clear_location_cache()
     return new_room
 
 def get_room(room_id):
-    return Room.query.get(room_id)
+    # Served from the cached hierarchy; the returned room is read-only
+    return get_location_snapshot()['rooms'].get(room_id)
 
 def get_rooms_by_floor(floor_id):
-    return Room.query.filter_by(floor_id=floor_id).all()
+    return [room for room in get_location_snapshot()['rooms'].values() if room.floor_id == floor_id]
 
 def get_all_rooms():
-    return Room.query.filter(Room.room_id != "UNKNOWN").all()
+    return [room for room in get_location_snapshot()['rooms'].values() if room.room_id != "UNKNOWN"]
 
 def get_all_rooms_json():
     rooms=get_all_rooms()
@@ -28,7 +35,7 @@ def get_all_rooms_json():
     return rooms
 
 def update_room(room_id, floor_id, room_name):
-    room = get_room(room_id)
+    room = Room.query.get(room_id)
     if not room: 
         return None
     
@@ -36,26 +43,32 @@ def update_room(room_id, floor_id, room_name):
     room.room_name = room_name
     
     try:
+        touch_location_version()
         db.session.commit()  # ADD THIS
         return room  # Return the room to indicate success
     except Exception as e:
         db.session.rollback()
         print(f"Error updating room: {e}")
         return None
+    finally:
+        clear_location_cache()
 
 def delete_room(room_id):
-    room = get_room(room_id)
+    room = Room.query.get(room_id)
     if not room:
         return False  # Room not found
 
     try:
         db.session.delete(room)
+        touch_location_version()
         db.session.commit()
         return True
     except Exception as e:
         db.session.rollback()
         log.error(f"Error deleting room: {e}")
         return False
+    finally:
+        clear_location_cache()
 
 
 # def upload_csv(file_path):
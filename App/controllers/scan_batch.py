@@ -0,0 +1,196 @@
+from datetime import datetime
+from sqlalchemy import bindparam
+from sqlalchemy.exc import IntegrityError
+from App.database import db
+from App.models import Asset, ScanReceipt
+from App.controllers.asset import SET_UPDATE_CHUNK, _chunks, touch_asset_version
+from App.controllers.location_cache import get_location_snapshot
+from App.controllers.scanevent import add_scan_events_bulk
+from App.controllers.status_counts import adjust_status_counts
+
+# Largest batch accepted in one request
+MAX_SCAN_BATCH = 1000
+
+
+def _parse_scan_record(record):
+    """Validate one scan record from a scanner.
+
+    Returns:
+        (scan, error) where scan is a dict with key, asset_id, room_id and
+        scanned_at, or None with an error message.
+    """
+    if not isinstance(record, dict):
+        return None, "Scan record must be an object"
+    key = str(record.get('key') or '').strip()
+    asset_id = str(record.get('assetId') or '').strip()
+    room_id = str(record.get('roomId') or '').strip()
+    if not key or not asset_id or not room_id:
+        return None, "key, assetId and roomId are required"
+    if len(key) > ScanReceipt.idempotency_key.type.length:
+        return None, f"key is longer than {ScanReceipt.idempotency_key.type.length} characters"
+
+    scanned_at = None
+    if record.get('scannedAt'):
+        try:
+            scanned_at = datetime.fromisoformat(str(record['scannedAt']).replace('Z', '+00:00'))
+        except ValueError:
+            return None, f"Invalid scannedAt '{record['scannedAt']}'"
+        if scanned_at.tzinfo:
+            # Scan times are stored as naive local times
+            scanned_at = scanned_at.astimezone().replace(tzinfo=None)
+        # A scanner with its clock ahead cannot record scans in the future
+        scanned_at = min(scanned_at, datetime.now())
+    return {'key': key, 'asset_id': asset_id, 'room_id': room_id, 'scanned_at': scanned_at}, None
+
+def _get_receipts(user_id, keys):
+    receipts = {}
+    for chunk in _chunks(keys, SET_UPDATE_CHUNK):
+        receipts.update(
+            (key, (asset_id, room_id, result))
+            for key, asset_id, room_id, result in db.session.query(
+                ScanReceipt.idempotency_key, ScanReceipt.asset_id, ScanReceipt.room_id, ScanReceipt.result
+            ).filter(ScanReceipt.user_id == user_id, ScanReceipt.idempotency_key.in_(chunk))
+        )
+    return receipts
+
+def _apply_scans(scans, user_id, rooms):
+    """Apply new scans in batch order and stage the writes in the session.
+
+    Each scan follows the update_asset_location rule: last_located becomes
+    the scanned room and status is Good in the assigned room, Misplaced
+    anywhere else. An asset scanned several times ends up in its last room.
+
+    Returns:
+        Dict of idempotency key -> result (Good, Misplaced or unknown).
+    """
+    asset_ids = list(dict.fromkeys(scan['asset_id'] for scan in scans))
+    assets = {}
+    for chunk in _chunks(asset_ids, SET_UPDATE_CHUNK):
+        for asset_id, room_id, last_located, status in db.session.query(
+            Asset.id, Asset.room_id, Asset.last_located, Asset.status
+        ).filter(Asset.id.in_(chunk)).with_for_update():
+            assets[asset_id] = {'room_id': room_id, 'last_located': last_located, 'status': status}
+
+    def room_name(room_id):
+        room = rooms.get(room_id)
+        return room.room_name if room else f"Room {room_id}"
+
+    now = datetime.now()
+    results, events, updates, receipts, status_changes = {}, [], {}, [], []
+    for scan in scans:
+        asset_id, room_id = scan['asset_id'], scan['room_id']
+        asset = assets.get(asset_id)
+        if asset is None:
+            result = "unknown"
+        else:
+            result = "Good" if asset['room_id'] == room_id else "Misplaced"
+            notes = f"Asset found in {room_name(room_id)}."
+            if asset['last_located'] != room_id:
+                notes += f" Moved from {room_name(asset['last_located'])}."
+            if asset['status'] != result:
+                notes += f" Status changed from {asset['status']} to {result}."
+            events.append({
+                'asset_id': asset_id,
+                'user_id': user_id,
+                'room_id': room_id,
+                'status': result,
+                'notes': notes,
+                'scan_time': scan['scanned_at']
+            })
+            status_changes.append((asset['room_id'], asset['status'], asset['room_id'], result))
+            asset['last_located'], asset['status'] = room_id, result
+            updates[asset_id] = {'asset_id': asset_id, 'last_located': room_id, 'status': result, 'last_update': now}
+        results[scan['key']] = result
+        receipts.append({
+            'user_id': user_id,
+            'idempotency_key': scan['key'],
+            'asset_id': asset_id,
+            'room_id': room_id,
+            'result': result,
+            'scanned_at': scan['scanned_at'],
+            'received_at': now
+        })
+
+    # The receipts go first: a concurrent retry of the same batch fails here
+    # on the unique key before anything else is written.
+    db.session.execute(ScanReceipt.__table__.insert(), receipts)
+    if updates:
+        assets = Asset.__table__
+        db.session.execute(
+            assets.update().where(assets.c.id == bindparam('asset_id')),
+            list(updates.values())
+        )
+        touch_asset_version()
+        adjust_status_counts(status_changes)
+    add_scan_events_bulk(events)
+    return results
+
+def ingest_scan_batch(records, user_id):
+    """Apply a batch of buffered scanner reads in one transaction.
+
+    Every record carries a client-generated idempotency key. Keys this user
+    has sent before, in an earlier request or earlier in the same batch, are
+    answered from the stored receipt and change nothing, so a batch can be
+    retried safely after a dropped connection.
+
+    Returns:
+        List of per-record results, in batch order, with key, asset_id,
+        room_id, result (Good, Misplaced, unknown or invalid) and duplicate,
+        plus message for invalid records; or None if the batch could not be
+        written.
+    """
+    rooms = get_location_snapshot()['rooms']
+    parsed = []
+    for record in records:
+        scan, error = _parse_scan_record(record)
+        if scan and scan['room_id'] not in rooms:
+            scan, error = None, f"Room {scan['room_id']} not found"
+        parsed.append((record, scan, error))
+
+    keys = list(dict.fromkeys(scan['key'] for _, scan, _ in parsed if scan))
+    # A concurrent request may commit the same keys between our read and our
+    # write; the unique key then fails our insert and the retry sees them.
+    for attempt in range(2):
+        receipts = _get_receipts(user_id, keys)
+        new_scans, seen = [], set(receipts)
+        for _, scan, _ in parsed:
+            if scan and scan['key'] not in seen:
+                seen.add(scan['key'])
+                new_scans.append(scan)
+        try:
+            applied = _apply_scans(new_scans, user_id, rooms) if new_scans else {}
+            db.session.commit()
+            break
+        except IntegrityError as e:
+            db.session.rollback()
+            if attempt:
+                print(f"Error ingesting scan batch: {e}")
+                return None
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error ingesting scan batch: {e}")
+            return None
+
+    answers = dict(receipts)
+    answers.update((scan['key'], (scan['asset_id'], scan['room_id'], applied[scan['key']])) for scan in new_scans)
+    results, answered = [], set()
+    for record, scan, error in parsed:
+        if not scan:
+            results.append({
+                'key': record.get('key') if isinstance(record, dict) else None,
+                'result': "invalid",
+                'duplicate': False,
+                'message': error
+            })
+            continue
+        key = scan['key']
+        asset_id, room_id, result = answers[key]
+        results.append({
+            'key': key,
+            'asset_id': asset_id,
+            'room_id': room_id,
+            'result': result,
+            'duplicate': key in receipts or key in answered
+        })
+        answered.add(key)
+    return results
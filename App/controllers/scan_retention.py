@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import literal, select
+from App.database import db
+from App.models import ScanEvent, ScanEventArchive
+
+# Events moved per transaction; also keeps the IN lists under SQLite's variable limit
+SCAN_ARCHIVE_BATCH = 1000
+
+_ARCHIVED_COLUMNS = ['scan_id', 'asset_id', 'user_id', 'room_id', 'scan_time', 'status', 'notes', 'last_update', 'changeLog']
+
+
+def get_scan_retention_cutoff(days=None, now=None):
+    """Scan events older than this are archived. days defaults to SCAN_EVENT_RETENTION_DAYS."""
+    if days is None:
+        days = current_app.config['SCAN_EVENT_RETENTION_DAYS']
+    return (now or datetime.now()) - timedelta(days=days)
+
+def archive_scan_events(before=None, batch_size=SCAN_ARCHIVE_BATCH, max_batches=None):
+    """Move scan events older than before (default: the retention cutoff) to scan_event_archive.
+
+    Events are moved oldest first, batch_size at a time: each batch is
+    copied with one INSERT ... SELECT and deleted by primary key in its own
+    short transaction, so the job never holds locks for long and can be
+    stopped and rerun at any point. max_batches limits one run.
+
+    Returns:
+        The number of events archived.
+    """
+    if before is None:
+        before = get_scan_retention_cutoff()
+    columns = [getattr(ScanEvent, name) for name in _ARCHIVED_COLUMNS]
+    moved, batches = 0, 0
+    while max_batches is None or batches < max_batches:
+        scan_ids = db.session.scalars(
+            select(ScanEvent.scan_id)
+            .where(ScanEvent.scan_time < before)
+            .order_by(ScanEvent.scan_time)
+            .limit(batch_size)
+        ).all()
+        if not scan_ids:
+            break
+        try:
+            db.session.execute(
+                ScanEventArchive.__table__.insert().from_select(
+                    _ARCHIVED_COLUMNS + ['archived_at'],
+                    select(*columns, literal(datetime.now())).where(ScanEvent.scan_id.in_(scan_ids))
+                )
+            )
+            db.session.execute(ScanEvent.__table__.delete().where(ScanEvent.scan_id.in_(scan_ids)))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error archiving scan events: {e}")
+            break
+        moved += len(scan_ids)
+        batches += 1
+    return moved
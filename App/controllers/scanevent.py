@@ -1,23 +1,88 @@
-from App.models import ScanEvent
+from App.models import ScanEvent, ScanEventArchive, Room
 from App.database import db
+from App.controllers.ulid import new_ulid
+from sqlalchemy import tuple_
 from datetime import datetime
+import base64, heapq, json
 
-def add_scan_event(asset_id, user_id, room_id, status, notes=None):
-    scan_id = f"SCAN-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+def new_scan_id():
+    """Unique scan id sorted by insertion time, e.g. SCAN-01J9ZQ4M7X3T8C6V2B5N0K1R4D.
+
+    The time part is always the server clock, not the scan time, which for
+    batched scans comes from the scanner.
+    """
+    return f"SCAN-{new_ulid()}"
+
+def _fit_column(column, value):
+    # Truncate to the column's declared length (enforced by Postgres, not SQLite)
+    length = getattr(column.type, 'length', None)
+    if value is not None and length and len(value) > length:
+        return value[:length]
+    return value
+
+def _scan_event_text(asset_id, room_id, status, notes):
+    """Return the notes and changeLog of a scan event, cut to fit their columns."""
+    changeLog = f"Asset {asset_id} scanned in room {room_id} with status {status}"
+    return _fit_column(ScanEvent.notes, notes), _fit_column(ScanEvent.changeLog, changeLog)
+
+def add_scan_event(asset_id, user_id, room_id, status, notes=None, commit=True):
+    """Record a scan of an asset and commit it.
+
+    With commit=False the event is only added to the session, so it joins
+    the caller's transaction and the caller's commit reports any error.
+    """
     scan_time = datetime.now()
+    scan_id = new_scan_id()
     last_update = scan_time
-    changeLog = f"Asset {asset_id} scanned in room {room_id} with status {status}"
+    notes, changeLog = _scan_event_text(asset_id, room_id, status, notes)
     
     newScan = ScanEvent(scan_id, asset_id, user_id, room_id, scan_time, status, notes, last_update, changeLog)
     
+    if not commit:
+        db.session.add(newScan)
+        return newScan
     try:
         db.session.add(newScan)
         db.session.commit()
         return newScan
-    except:
+    except Exception as e:
         db.session.rollback()
+        print(f"Error adding scan event for asset {asset_id}: {e}")
         return None
 
+def add_scan_events_bulk(events):
+    """Insert many scan events with one executemany INSERT, without committing.
+
+    events is a list of dicts with asset_id, user_id, room_id, status and
+    optionally notes (the add_scan_event arguments) and scan_time, which
+    defaults to now. The rows join the caller's transaction, so the
+    caller's commit or rollback covers them.
+
+    Returns:
+        The number of events inserted.
+    """
+    if not events:
+        return 0
+    now = datetime.now()
+    rows = []
+    for event in events:
+        asset_id, room_id, status = event['asset_id'], event['room_id'], event['status']
+        scan_time = event.get('scan_time') or now
+        notes, changeLog = _scan_event_text(asset_id, room_id, status, event.get('notes'))
+        rows.append({
+            'scan_id': new_scan_id(),
+            'asset_id': asset_id,
+            'user_id': event['user_id'],
+            'room_id': room_id,
+            'scan_time': scan_time,
+            'status': status,
+            'notes': notes,
+            'last_update': now,
+            'changeLog': changeLog
+        })
+    db.session.execute(ScanEvent.__table__.insert(), rows)
+    return len(rows)
+
 def get_all_scans():
     events = ScanEvent.query.all()
     return events
@@ -30,6 +95,74 @@ def get_scans_by_asset(asset_id):
     events = ScanEvent.query.filter_by(asset_id=asset_id).order_by(ScanEvent.scan_time.desc()).all()
     return events
 
+def _encode_scan_cursor(scan_time, scan_id):
+    payload = json.dumps([scan_time.isoformat(), scan_id])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+def _decode_scan_cursor(cursor):
+    try:
+        payload = base64.urlsafe_b64decode(cursor.encode('ascii'))
+        scan_time, scan_id = json.loads(payload)
+        return datetime.fromisoformat(scan_time), scan_id
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+def _scan_history_rows(model, asset_id, limit, cursor):
+    """Up to limit rows of an asset's events in model's table, newest first, older than cursor."""
+    query = db.session.query(
+        model.scan_id, model.scan_time, model.room_id, Room.room_name,
+        model.status, model.notes, model.user_id
+    ) \
+        .outerjoin(Room, Room.room_id == model.room_id) \
+        .filter(model.asset_id == asset_id)
+    if cursor:
+        query = query.filter(tuple_(model.scan_time, model.scan_id) < tuple_(*cursor))
+    return query.order_by(model.scan_time.desc(), model.scan_id.desc()).limit(limit).all()
+
+def get_scan_history_page(asset_id, limit=50, cursor=None, include_archived=True):
+    """Get one page of an asset's scan events, newest first, with room names.
+
+    Events are read with one query joined to the room table and ordered by
+    (scan_time, scan_id), which the (asset_id, scan_time, scan_id) index
+    returns pre-sorted. The cursor holds the last (scan_time, scan_id) of
+    the previous page, so older pages cost the same as the first.
+
+    With include_archived, the same page is also read from
+    scan_event_archive (an index probe that finds nothing for assets with
+    no archived events) and the two are merged, so history continues
+    seamlessly past the retention cutoff.
+
+    Returns:
+        (events, next_cursor) where events are dicts with scan_id, scan_time,
+        room_id, room_name, status, notes, user_id and archived, and
+        next_cursor is None on the last page. Raises ValueError for an
+        invalid cursor.
+    """
+    position = _decode_scan_cursor(cursor) if cursor else None
+    # Fetch one extra row to find out whether there is a next page
+    sources = [[(row, False) for row in _scan_history_rows(ScanEvent, asset_id, limit + 1, position)]]
+    if include_archived:
+        sources.append([(row, True) for row in _scan_history_rows(ScanEventArchive, asset_id, limit + 1, position)])
+    rows = list(heapq.merge(*sources, key=lambda item: (item[0].scan_time, item[0].scan_id), reverse=True))[:limit + 1]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][0]
+        next_cursor = _encode_scan_cursor(last.scan_time, last.scan_id)
+
+    events = [{
+        'scan_id': row.scan_id,
+        'scan_time': row.scan_time,
+        'room_id': row.room_id,
+        'room_name': row.room_name if row.room_name is not None else f"Room {row.room_id}",
+        'status': row.status,
+        'notes': row.notes,
+        'user_id': row.user_id,
+        'archived': archived
+    } for row, archived in rows]
+    return events, next_cursor
+
 def get_scans_by_room(room_id):
     events = ScanEvent.query.filter_by(room_id=room_id).order_by(ScanEvent.scan_time.desc()).all()
     return events
@@ -54,4 +187,10 @@ def get_recent_scans_json(limit=50):
     events = get_recent_scans(limit)
     if not events:
         return []
-    return [event.get_json() for event in events]
\ No newline at end of file
+    return [event.get_json() for event in events]
+
+def iter_recent_scans_json(limit=50, batch_size=1000):
+    """Yield the most recent scans as JSON, reading batch_size rows at a time from a server-side cursor."""
+    query = ScanEvent.query.order_by(ScanEvent.scan_time.desc()).limit(limit)
+    for event in query.yield_per(batch_size):
+        yield event.get_json()
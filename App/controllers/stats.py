@@ -0,0 +1,92 @@
+from App.controllers.asset import SET_UPDATE_CHUNK, _chunks
+from App.controllers.location_cache import get_location_snapshot
+from App.controllers.status_counts import get_status_counts
+
+STATS_SCOPES = ["room", "floor", "building"]
+
+
+def _node(id_key, name_key, location):
+    return {id_key: getattr(location, id_key), name_key: getattr(location, name_key), 'counts': {}, 'total': 0}
+
+def _add_counts(node, status, count):
+    node['counts'][status] = node['counts'].get(status, 0) + count
+    node['total'] += count
+
+def _status_count_rows(room_ids=None):
+    """(room_id, status, count) for the given rooms (all if None), read from location_status_counts."""
+    if room_ids is None:
+        return get_status_counts()
+    rows = []
+    for chunk in _chunks(sorted(room_ids), SET_UPDATE_CHUNK):
+        rows.extend(get_status_counts(chunk))
+    return rows
+
+def get_location_status_counts(scope_type=None, scope_id=None):
+    """Asset status counts per room, rolled up to floors, buildings and a grand total.
+
+    Room counts are read from location_status_counts, which writers keep up
+    to date, so no assets are aggregated. The floor and building subtotals
+    (what GROUP BY ROLLUP would add, which SQLite lacks) are summed here over
+    the cached hierarchy, which also supplies the names and the rooms that
+    have no assets. Assets are counted in their assigned room. Without a
+    scope, assets whose room is not in the hierarchy are counted under
+    'unplaced'.
+
+    Returns:
+        Dict with counts, total and the nested buildings -> floors -> rooms,
+        or None if the scope does not exist.
+    """
+    snapshot = get_location_snapshot()
+    if scope_type is not None:
+        if scope_type not in STATS_SCOPES or scope_id not in snapshot[scope_type + 's']:
+            return None
+
+    rooms, floors, buildings = snapshot['rooms'], snapshot['floors'], snapshot['buildings']
+    if scope_type == "room":
+        room_ids = {scope_id}
+        floor_ids = {rooms[scope_id].floor_id}
+        building_ids = {floors[floor_id].building_id for floor_id in floor_ids if floor_id in floors}
+    elif scope_type == "floor":
+        floor_ids = {scope_id}
+        room_ids = {room_id for room_id, room in rooms.items() if room.floor_id == scope_id}
+        building_ids = {floors[scope_id].building_id}
+    elif scope_type == "building":
+        building_ids = {scope_id}
+        floor_ids = {floor_id for floor_id, floor in floors.items() if floor.building_id == scope_id}
+        room_ids = {room_id for room_id, room in rooms.items() if room.floor_id in floor_ids}
+    else:
+        room_ids, floor_ids, building_ids = set(rooms), set(floors), set(buildings)
+
+    # Every location in scope gets a node, so empty rooms show up with zero counts
+    building_nodes = {}
+    for building_id in sorted(building_ids & set(buildings)):
+        building_nodes[building_id] = _node('building_id', 'building_name', buildings[building_id])
+        building_nodes[building_id]['floors'] = []
+    floor_nodes = {}
+    for floor_id in sorted(floor_ids & set(floors)):
+        floor_nodes[floor_id] = _node('floor_id', 'floor_name', floors[floor_id])
+        floor_nodes[floor_id]['rooms'] = []
+        if floors[floor_id].building_id in building_nodes:
+            building_nodes[floors[floor_id].building_id]['floors'].append(floor_nodes[floor_id])
+    room_nodes = {}
+    for room_id in sorted(room_ids):
+        room_nodes[room_id] = _node('room_id', 'room_name', rooms[room_id])
+        if rooms[room_id].floor_id in floor_nodes:
+            floor_nodes[rooms[room_id].floor_id]['rooms'].append(room_nodes[room_id])
+
+    summary = {'counts': {}, 'total': 0, 'buildings': list(building_nodes.values())}
+    if scope_type is None:
+        summary['unplaced'] = {'counts': {}, 'total': 0}
+    for room_id, status, count in _status_count_rows(None if scope_type is None else room_ids):
+        status = status or "Unknown"
+        _add_counts(summary, status, count)
+        if room_id not in room_nodes:
+            _add_counts(summary['unplaced'], status, count)
+            continue
+        _add_counts(room_nodes[room_id], status, count)
+        floor = floors.get(rooms[room_id].floor_id)
+        if floor and floor.floor_id in floor_nodes:
+            _add_counts(floor_nodes[floor.floor_id], status, count)
+            if floor.building_id in building_nodes:
+                _add_counts(building_nodes[floor.building_id], status, count)
+    return summary
@@ -0,0 +1,101 @@
+from collections import Counter
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from App.database import db
+from App.models import Asset, LocationStatusCount
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE
+_UPSERT_INSERTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+
+def adjust_status_counts(changes):
+    """Apply asset status and room changes to location_status_counts.
+
+    changes is an iterable of (old_room_id, old_status, new_room_id,
+    new_status) tuples, one per asset; use None for the old pair of a new
+    asset and the new pair of a deleted one. The counts are updated inside
+    the caller's transaction, so its commit or rollback covers them: call
+    this before anything else in the transaction commits.
+    """
+    deltas = Counter()
+    for old_room_id, old_status, new_room_id, new_status in changes:
+        if (old_room_id, old_status) == (new_room_id, new_status):
+            continue
+        if old_status is not None:
+            deltas[(old_room_id, old_status)] -= 1
+        if new_status is not None:
+            deltas[(new_room_id, new_status)] += 1
+
+    # Sorted, so concurrent writers lock the rows in the same order
+    rows = [{'room_id': room_id, 'status': status, 'count': delta}
+            for (room_id, status), delta in sorted(deltas.items()) if delta]
+    if not rows:
+        return
+
+    table = LocationStatusCount.__table__
+    upsert = _UPSERT_INSERTS.get(db.session.get_bind().dialect.name)
+    if upsert:
+        stmt = upsert(table)
+        db.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[table.c.room_id, table.c.status],
+                set_={'count': table.c.count + stmt.excluded['count']}
+            ),
+            rows
+        )
+        return
+    for row in rows:
+        result = db.session.execute(
+            table.update()
+            .where(table.c.room_id == row['room_id'], table.c.status == row['status'])
+            .values(count=table.c.count + row['count'])
+        )
+        if result.rowcount == 0:
+            db.session.execute(table.insert(), row)
+
+def aggregate_status_counts(room_ids=None):
+    """(room_id, status, count) counted from the asset table itself."""
+    query = db.session.query(Asset.room_id, Asset.status, func.count()).group_by(Asset.room_id, Asset.status)
+    if room_ids is not None:
+        query = query.filter(Asset.room_id.in_(room_ids))
+    return query.all()
+
+def get_status_counts(room_ids=None):
+    """(room_id, status, count) from location_status_counts for the given rooms (all if None)."""
+    query = db.session.query(LocationStatusCount.room_id, LocationStatusCount.status, LocationStatusCount.count) \
+        .filter(LocationStatusCount.count != 0)
+    if room_ids is not None:
+        query = query.filter(LocationStatusCount.room_id.in_(room_ids))
+    return query.all()
+
+def rebuild_status_counts():
+    """Recompute location_status_counts from the asset table.
+
+    Returns:
+        List of (room_id, status, stored, actual) for every count that had
+        drifted from the assets.
+    """
+    table = LocationStatusCount.__table__
+    try:
+        if db.session.get_bind().dialect.name == 'postgresql':
+            # Writers wait until the new counts are in, then apply their deltas on top
+            db.session.execute(db.text(f"LOCK TABLE {table.name} IN EXCLUSIVE MODE"))
+        stored = {(room_id, status): count for room_id, status, count in get_status_counts()}
+        actual = {(room_id, status): count for room_id, status, count in aggregate_status_counts()}
+
+        db.session.execute(table.delete())
+        if actual:
+            db.session.execute(table.insert(), [
+                {'room_id': room_id, 'status': status, 'count': count}
+                for (room_id, status), count in sorted(actual.items())
+            ])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return [
+        (room_id, status, stored.get((room_id, status), 0), actual.get((room_id, status), 0))
+        for room_id, status in sorted(set(stored) | set(actual))
+        if stored.get((room_id, status), 0) != actual.get((room_id, status), 0)
+    ]
@@ -0,0 +1,48 @@
+import os, threading, time
+
+# Crockford base32, as used by ULID
+_ENCODING = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_RANDOM_BITS = 80
+_RANDOM_MAX = (1 << _RANDOM_BITS) - 1
+
+_lock = threading.Lock()
+_last_ms = -1
+_last_random = 0
+
+
+def _encode(value, length):
+    chars = []
+    for _ in range(length):
+        chars.append(_ENCODING[value & 31])
+        value >>= 5
+    return ''.join(reversed(chars))
+
+def new_ulid(timestamp=None):
+    """Return a 26 character ULID: 48 bits of milliseconds then 80 random bits.
+
+    IDs sort in creation order, so inserts land at the end of the primary key
+    index. Within one process they are strictly increasing: when the clock has
+    not moved on (or went backwards) the previous random part is incremented
+    instead of drawing a new one. Across processes uniqueness comes from the
+    80 random bits.
+
+    timestamp is an optional datetime to take the time part from. Such IDs
+    keep the given time and only rely on the random bits, so a caller's
+    timestamp never moves the clock used for later IDs.
+    """
+    global _last_ms, _last_random
+    if timestamp:
+        return _encode(int(timestamp.timestamp() * 1000), 10) + _encode(int.from_bytes(os.urandom(10), 'big'), 16)
+    ms = int(time.time() * 1000)
+    with _lock:
+        if ms <= _last_ms:
+            ms = _last_ms
+            random_part = _last_random + 1
+            if random_part > _RANDOM_MAX:
+                ms += 1
+                random_part = int.from_bytes(os.urandom(10), 'big')
+        else:
+            random_part = int.from_bytes(os.urandom(10), 'big')
+        _last_ms = ms
+        _last_random = random_part
+    return _encode(ms, 10) + _encode(random_part, 16)
@@ -2,6 +2,7 @@ import os
 from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
 from App.models import User
 from App.database import db
+from App.controllers.user_cache import invalidate_cached_user, touch_user_version
 from werkzeug.security import generate_password_hash
 
 def create_user(email, username, password):
@@ -67,7 +68,9 @@ def update_user(id, email, username, new_password=None):
             
         # Add the user and commit the changes
         db.session.add(user)
+        touch_user_version()
         db.session.commit()
+        invalidate_cached_user(user.id)
         return True
     except Exception as e:
         # Rollback the session
@@ -80,7 +83,9 @@ def delete_user(id):
         user = get_user(id)
         if user:
             db.session.delete(user)
+            touch_user_version()
             db.session.commit()
+            invalidate_cached_user(user.id)
             return True
         return False
     except Exception as e:
@@ -115,7 +120,9 @@ def reset_password(email, new_password):
     if user:
         user.set_password(new_password)
         try:
+            touch_user_version()
             db.session.commit()
+            invalidate_cached_user(user.id)
             return True
         except Exception as e:
             db.session.rollback()
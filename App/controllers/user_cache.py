@@ -0,0 +1,100 @@
+import threading
+from collections import OrderedDict
+from flask import g, has_app_context, has_request_context
+from sqlalchemy.orm import make_transient_to_detached
+from App.models import User
+from App.database import db
+from App.controllers.dataversion import get_data_version, bump_data_version
+
+# DataVersion row bumped by every user write; cached users loaded under an
+# older version are read again, on every worker
+USER_VERSION = "user"
+
+# Most (user id, token iat) entries kept per worker, least recently used dropped first
+USER_CACHE_SIZE = 1024
+
+# (user_id, iat) -> (user version it was loaded at, detached copy of the user's row)
+_users = OrderedDict()
+_lock = threading.Lock()
+
+
+def _detached_copy(user):
+    # Built without __init__ (which would hash the password again) and
+    # detached, so it can be shared by requests and merged into any session
+    copy = User.__mapper__.class_manager.new_instance()
+    for column in User.__table__.columns:
+        setattr(copy, column.key, getattr(user, column.key))
+    make_transient_to_detached(copy)
+    return copy
+
+def _user_version():
+    # Checked at most once per request (on every call outside a request)
+    if not has_request_context():
+        return get_data_version(USER_VERSION)
+    if '_user_version' not in g:
+        g._user_version = get_data_version(USER_VERSION)
+    return g._user_version
+
+def get_cached_user(user_id, iat=None):
+    """Return the user a token names, loading it at most once per request.
+
+    Across requests the user's row is reused per (user id, token iat), so a
+    new login always reads a fresh row, until the user DataVersion moves:
+    any user write on any worker makes every worker read its users again.
+    A cached row is merged into the request's session without a query,
+    which keeps the returned user attached and safe to change and commit.
+
+    Returns:
+        The User, or None if it does not exist.
+    """
+    key = (user_id, iat)
+    users = g.setdefault('_cached_users', {}) if has_request_context() else {}
+    if key in users:
+        return users[key]
+
+    # Read before the row, so a concurrent write can only make the copy
+    # look older than it is, never newer
+    version = _user_version()
+    with _lock:
+        entry = _users.get(key)
+        if entry and entry[0] == version:
+            _users.move_to_end(key)
+        else:
+            entry = None
+
+    if entry:
+        user = db.session.merge(entry[1], load=False)
+    else:
+        user = db.session.get(User, user_id)
+        if user is not None:
+            with _lock:
+                _users[key] = (version, _detached_copy(user))
+                _users.move_to_end(key)
+                while len(_users) > USER_CACHE_SIZE:
+                    _users.popitem(last=False)
+    users[key] = user
+    return user
+
+def touch_user_version():
+    """Mark users as changed in the current transaction (call before committing)."""
+    bump_data_version(USER_VERSION)
+
+def invalidate_cached_user(user_id):
+    """Drop this worker's entries for a user after it is changed or deleted.
+
+    Other workers notice through the version bumped by touch_user_version.
+    """
+    with _lock:
+        for key in [key for key in _users if key[0] == user_id]:
+            del _users[key]
+    if has_app_context():
+        g.pop('_user_version', None)
+        cached = g.get('_cached_users')
+        if cached:
+            for key in [key for key in cached if key[0] == user_id]:
+                del cached[key]
+
+def clear_user_cache():
+    """Drop this worker's cached users."""
+    with _lock:
+        _users.clear()
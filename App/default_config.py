@@ -1,9 +1,17 @@
 SQLALCHEMY_DATABASE_URI="sqlite:///temp-database.db"
 SECRET_KEY="secret key"
 
+# Scan events older than this many days are moved to scan_event_archive by `flask scans archive`
+SCAN_EVENT_RETENTION_DAYS = 548
+
+# PBKDF2 work factor for password hashes; older hashes are upgraded when their user logs in
+PASSWORD_HASH_ITERATIONS = 260000
+
 MAIL_SERVER = 'smtp.gmail.com'
 MAIL_PORT = 587
 MAIL_USE_TLS = True
 MAIL_USERNAME = 'assettracker.igov@gmail.com'
 MAIL_PASSWORD = 'osyy yevw chfs ydvs ' 
+# Send queued emails from a background sender in each worker; when False they wait for `flask mail send`
+MAIL_SEND_IN_BACKGROUND = True
 MAIL_DEFAULT_SENDER = ('iGOVTT Asset Tracker', 'your-actual-gmail@gmail.com')
\ No newline at end of file
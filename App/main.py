@@ -18,6 +18,7 @@ from App.controllers import (
 )
 
 from App.views import views, setup_admin
+from App.views.compression import setup_compression
 
 def add_views(app):
     for view in views:
@@ -31,6 +32,7 @@ def create_app(overrides={}):
     photos = UploadSet('photos', TEXT + DOCUMENTS + IMAGES)
     configure_uploads(app, photos)
     add_views(app)
+    setup_compression(app)
     init_db(app)
     jwt = setup_jwt(app)
     setup_admin(app)
@@ -49,6 +51,9 @@ def create_app(overrides={}):
     with app.app_context():
         from App.controllers.initialize import ensure_defaults
         ensure_defaults()
+        # Imports queued by a process that has since exited can never finish
+        from App.controllers.job import fail_stale_jobs
+        fail_stale_jobs()
     
     init_mail(app)
     return app
\ No newline at end of file
@@ -7,3 +7,13 @@ from .assignee import *
 from .floor import *
 from .provider import *
 from .scanevent import *
+from .dataversion import *
+from .job import *
+from .joberror import *
+from .auditsession import *
+from .auditscan import *
+from .scanreceipt import *
+from .locationstatuscount import *
+from .scaneventarchive import *
+from .assetsearch import *
+from .outboxmessage import *
@@ -1,8 +1,19 @@
 from App.database import db
 from sqlalchemy import *
 
+# Sorts in place of a NULL last_update, so keyset pages always have a value
+# to compare (written in SQLite's DateTime format, which Postgres also reads)
+NO_LAST_UPDATE = '1970-01-01 00:00:00.000000'
+
 
 class Asset(db.Model):
+    # Room lookups and per-room status counts are both served by this index;
+    # the asset list sorted by last update by the second
+    __table_args__ = (
+        db.Index('ix_asset_room_id_status', 'room_id', 'status'),
+        db.Index('ix_asset_last_update_key', db.func.coalesce(db.text('last_update'), db.text(f"'{NO_LAST_UPDATE}'")), 'id'),
+    )
+
     id = db.Column(db.String, primary_key = True, nullable = False, unique = True)
     description = db.Column(db.String(200), nullable = True, unique=False)
     model = db.Column(db.String(120), nullable = True, unique = False)
@@ -19,7 +30,7 @@ class Asset(db.Model):
     
    # change_log = db.Column(db.String(300), Nullable = True)
     notes = db.Column(db.String(300), nullable = True)
-    status = db.Column(db.String(120), nullable = False)
+    status = db.Column(db.String(120), nullable = False, index = True)
     
     scanevent = db.relationship('ScanEvent', back_populates='asset')
     
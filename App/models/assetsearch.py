@@ -0,0 +1,47 @@
+from sqlalchemy import DDL, event
+from App.models.asset import Asset
+
+# Columns covered by the asset search index, in FTS5 column order
+ASSET_SEARCH_COLUMNS = ['id', 'description', 'model', 'brand', 'serial_number', 'notes']
+
+# bm25 weight per column above: tag and serial hits rank first, notes last
+ASSET_SEARCH_WEIGHTS = [10.0, 4.0, 4.0, 4.0, 10.0, 1.0]
+
+_columns = ', '.join(ASSET_SEARCH_COLUMNS)
+_new_values = ', '.join(f"new.{column}" for column in ASSET_SEARCH_COLUMNS)
+_old_values = ', '.join(f"old.{column}" for column in ASSET_SEARCH_COLUMNS)
+
+# SQLite: an FTS5 index over the asset rows (external content, so the text
+# is not stored twice), kept in step by triggers. The update trigger only
+# fires when an indexed column changes, not on status or location updates.
+SQLITE_ASSET_SEARCH_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS asset_fts USING fts5({_columns}, "
+    f"content='asset', content_rowid='rowid', prefix='2 3')",
+    f"CREATE TRIGGER IF NOT EXISTS asset_fts_insert AFTER INSERT ON asset BEGIN "
+    f"INSERT INTO asset_fts (rowid, {_columns}) VALUES (new.rowid, {_new_values}); END",
+    f"CREATE TRIGGER IF NOT EXISTS asset_fts_delete AFTER DELETE ON asset BEGIN "
+    f"INSERT INTO asset_fts (asset_fts, rowid, {_columns}) VALUES ('delete', old.rowid, {_old_values}); END",
+    f"CREATE TRIGGER IF NOT EXISTS asset_fts_update AFTER UPDATE OF {_columns} ON asset BEGIN "
+    f"INSERT INTO asset_fts (asset_fts, rowid, {_columns}) VALUES ('delete', old.rowid, {_old_values}); "
+    f"INSERT INTO asset_fts (rowid, {_columns}) VALUES (new.rowid, {_new_values}); END",
+]
+
+# Postgres: a generated tsvector column with a GIN index, which the database
+# keeps up to date itself. The 'simple' configuration does no stemming, so
+# model numbers and serials are matched as typed.
+POSTGRES_ASSET_SEARCH_DDL = [
+    "ALTER TABLE asset ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(id, '') || ' ' || coalesce(serial_number, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '') || ' ' || coalesce(model, '') || ' ' "
+    "|| coalesce(brand, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(notes, '')), 'C')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_asset_search_vector ON asset USING GIN (search_vector)",
+]
+
+# Created with the asset table by db.create_all; existing databases get them
+# from the migration.
+for _statement in SQLITE_ASSET_SEARCH_DDL:
+    event.listen(Asset.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+for _statement in POSTGRES_ASSET_SEARCH_DDL:
+    event.listen(Asset.__table__, 'after_create', DDL(_statement).execute_if(dialect='postgresql'))
+event.listen(Asset.__table__, 'before_drop', DDL("DROP TABLE IF EXISTS asset_fts").execute_if(dialect='sqlite'))
@@ -1,11 +1,22 @@
 from App.database import db
 
+def assignee_name_key(fname, lname=None):
+    """Normalized full name that assignees are matched on: lower case, single spaces."""
+    return ' '.join(f"{fname or ''} {lname or ''}".split()).lower()
+
 class Assignee(db.Model):
+    # Email lookups are case-insensitive; names are looked up by name_key
+    # (see controllers/assignee.py)
+    __table_args__ = (
+        db.Index('ix_assignee_lower_email', db.func.lower(db.text('email'))),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     fname = db.Column(db.String(50), nullable=False)
     lname = db.Column(db.String(50), nullable=True) # Made nullable
     email = db.Column(db.String(100), nullable=True, unique=True) # Made nullable
     room_id = db.Column(db.String(100), db.ForeignKey('room.room_id'), nullable=True) # Made nullable
+    name_key = db.Column(db.String(101), nullable=True, index=True) # assignee_name_key(fname, lname)
 
     room = db.relationship('Room', backref=db.backref('assignees', lazy=True))
 
@@ -14,6 +25,7 @@ class Assignee(db.Model):
         self.lname = lname
         self.email = email
         self.room_id = room_id
+        self.name_key = assignee_name_key(fname, lname)
 
     def get_json(self):
         return {
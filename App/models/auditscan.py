@@ -0,0 +1,29 @@
+from App.database import db
+from datetime import datetime
+
+class AuditScan(db.Model):
+    """A tag scanned during an audit session, with the room it was scanned in."""
+    __table_args__ = (
+        db.UniqueConstraint('session_id', 'asset_id', name='uq_audit_scan_session_asset'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    session_id = db.Column(db.Integer, db.ForeignKey('audit_session.id'), nullable=False)
+    asset_id = db.Column(db.String, nullable=False)  # Raw tag, may not match any asset
+    room_id = db.Column(db.String, db.ForeignKey('room.room_id'), nullable=False)
+    scanned_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+    def __init__(self, session_id, asset_id, room_id, scanned_at=None):
+        self.session_id = session_id
+        self.asset_id = asset_id
+        self.room_id = room_id
+        self.scanned_at = scanned_at or datetime.now()
+
+    def get_json(self):
+        return {
+            'id': self.id,
+            'session_id': self.session_id,
+            'asset_id': self.asset_id,
+            'room_id': self.room_id,
+            'scanned_at': self.scanned_at
+        }
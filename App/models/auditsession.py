@@ -0,0 +1,32 @@
+from App.database import db
+from datetime import datetime
+
+class AuditSession(db.Model):
+    """An audit of a room, floor or building; scanned tags are kept server-side until it is completed."""
+    id = db.Column(db.Integer, primary_key=True)
+    scope_type = db.Column(db.String(20), nullable=False)  # room, floor or building
+    scope_id = db.Column(db.String, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    status = db.Column(db.String(20), nullable=False, default="Active")
+    started_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    completed_at = db.Column(db.DateTime, nullable=True)
+    result = db.Column(db.JSON, nullable=True)
+
+    def __init__(self, scope_type, scope_id, user_id=None):
+        self.scope_type = scope_type
+        self.scope_id = scope_id
+        self.user_id = user_id
+        self.status = "Active"
+        self.started_at = datetime.now()
+
+    def get_json(self):
+        return {
+            'id': self.id,
+            'scope_type': self.scope_type,
+            'scope_id': self.scope_id,
+            'user_id': self.user_id,
+            'status': self.status,
+            'started_at': self.started_at,
+            'completed_at': self.completed_at,
+            'result': self.result
+        }
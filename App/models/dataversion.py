@@ -0,0 +1,20 @@
+from App.database import db
+
+class DataVersion(db.Model):
+    """A counter that writers bump whenever the data it names changes.
+
+    Workers compare it against the version they cached to know when their
+    in-memory copy is stale.
+    """
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __init__(self, name, version=0):
+        self.name = name
+        self.version = version
+
+    def get_json(self):
+        return {
+            'name': self.name,
+            'version': self.version
+        }
@@ -0,0 +1,60 @@
+from App.database import db
+from datetime import datetime
+
+class Job(db.Model):
+    """A background task such as a CSV import, with its progress counters."""
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="Queued")
+    filename = db.Column(db.String(255), nullable=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    total = db.Column(db.Integer, nullable=True)
+    processed = db.Column(db.Integer, nullable=False, default=0)
+    skipped = db.Column(db.Integer, nullable=False, default=0)
+    error_count = db.Column(db.Integer, nullable=False, default=0)
+    message = db.Column(db.Text, nullable=True)
+    result = db.Column(db.JSON, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    runner = db.Column(db.String(100), nullable=True)  # host:pid of the process that queued it
+    temp_path = db.Column(db.String(255), nullable=True)  # Uploaded file, deleted when the job ends
+
+    def __init__(self, kind, filename=None, user_id=None, total=None, runner=None, temp_path=None):
+        self.kind = kind
+        self.filename = filename
+        self.user_id = user_id
+        self.total = total
+        self.runner = runner
+        self.temp_path = temp_path
+        self.status = "Queued"
+        self.processed = 0
+        self.skipped = 0
+        self.error_count = 0
+        self.created_at = datetime.now()
+
+    def get_percent(self):
+        if self.status in ("Completed", "Failed"):
+            return 100
+        if not self.total:
+            return 0
+        return min(99, int(self.processed * 100 / self.total))
+
+    def get_json(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'filename': self.filename,
+            'user_id': self.user_id,
+            'total': self.total,
+            'processed': self.processed,
+            'skipped': self.skipped,
+            'error_count': self.error_count,
+            'percent': self.get_percent(),
+            'message': self.message,
+            'result': self.result,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
@@ -0,0 +1,18 @@
+from App.database import db
+
+class JobError(db.Model):
+    """One error message reported by a job, kept in order of insertion."""
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('job.id'), nullable=False, index=True)
+    message = db.Column(db.Text, nullable=False)
+
+    def __init__(self, job_id, message):
+        self.job_id = job_id
+        self.message = message
+
+    def get_json(self):
+        return {
+            'id': self.id,
+            'job_id': self.job_id,
+            'message': self.message
+        }
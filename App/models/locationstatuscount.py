@@ -0,0 +1,26 @@
+from App.database import db
+
+class LocationStatusCount(db.Model):
+    """Number of assets assigned to a room with a given status.
+
+    Kept in step with the asset table by every write that changes an
+    asset's status or room, in the same transaction, so dashboards read the
+    counts instead of aggregating assets.
+    """
+    __tablename__ = 'location_status_counts'
+
+    room_id = db.Column(db.String, primary_key=True)
+    status = db.Column(db.String(120), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __init__(self, room_id, status, count=0):
+        self.room_id = room_id
+        self.status = status
+        self.count = count
+
+    def get_json(self):
+        return {
+            'room_id': self.room_id,
+            'status': self.status,
+            'count': self.count
+        }
@@ -0,0 +1,45 @@
+from App.database import db
+from datetime import datetime
+
+class OutboxMessage(db.Model):
+    """An email waiting to be sent, or already sent, by the background mail sender."""
+    __tablename__ = 'outbox_message'
+    __table_args__ = (
+        # The sender's scan for due messages
+        db.Index('ix_outbox_message_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    subject = db.Column(db.String(255), nullable=False)
+    recipients = db.Column(db.JSON, nullable=False)
+    html = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="Pending")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    # Set by the sender that has taken the message, until next_attempt_at
+    claimed_by = db.Column(db.String(32), nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    def __init__(self, subject, recipients, html):
+        self.subject = subject
+        self.recipients = list(recipients)
+        self.html = html
+        self.status = "Pending"
+        self.attempts = 0
+        self.created_at = datetime.now()
+        self.next_attempt_at = self.created_at
+
+    def get_json(self):
+        return {
+            'id': self.id,
+            'subject': self.subject,
+            'recipients': self.recipients,
+            'status': self.status,
+            'attempts': self.attempts,
+            'next_attempt_at': self.next_attempt_at,
+            'last_error': self.last_error,
+            'created_at': self.created_at,
+            'sent_at': self.sent_at
+        }
@@ -5,6 +5,15 @@ from App.models import Asset
 from datetime import datetime
 
 class ScanEvent(db.Model):
+    # History lookups filter on asset or room and sort newest first; scan_id
+    # breaks ties between events with the same time for asset history pages.
+    # scan_time alone serves the recent scans feed and the retention job.
+    __table_args__ = (
+        db.Index('ix_scan_event_asset_id_scan_time', 'asset_id', 'scan_time', 'scan_id'),
+        db.Index('ix_scan_event_room_id_scan_time', 'room_id', 'scan_time'),
+        db.Index('ix_scan_event_scan_time', 'scan_time'),
+    )
+
     scan_id = db.Column(db.String, primary_key = True, nullable = False, unique = True)
     asset_id = db.Column(db.String, db.ForeignKey('asset.id'), nullable = False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable = False)
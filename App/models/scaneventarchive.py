@@ -0,0 +1,50 @@
+from App.database import db
+from datetime import datetime
+
+class ScanEventArchive(db.Model):
+    """A scan event moved out of scan_event by the retention job.
+
+    Same columns as scan_event plus archived_at. There are no foreign keys,
+    so archiving never has to check or lock the asset, user and room rows.
+    """
+    __tablename__ = 'scan_event_archive'
+    __table_args__ = (
+        db.Index('ix_scan_event_archive_asset_id_scan_time', 'asset_id', 'scan_time', 'scan_id'),
+    )
+
+    scan_id = db.Column(db.String, primary_key=True)
+    asset_id = db.Column(db.String, nullable=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    room_id = db.Column(db.String, nullable=False)
+    scan_time = db.Column(db.DateTime)
+    status = db.Column(db.String, nullable=False)
+    notes = db.Column(db.String(120), nullable=True)
+    last_update = db.Column(db.DateTime)
+    changeLog = db.Column(db.String(200), nullable=True)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+    def __init__(self, scan_id, asset_id, user_id, room_id, scan_time, status, notes, last_update, changeLog):
+        self.scan_id = scan_id
+        self.asset_id = asset_id
+        self.user_id = user_id
+        self.room_id = room_id
+        self.scan_time = scan_time
+        self.status = status
+        self.notes = notes
+        self.last_update = last_update
+        self.changeLog = changeLog
+        self.archived_at = datetime.now()
+
+    def get_json(self):
+        return {
+            'scan_id': self.scan_id,
+            'asset_id': self.asset_id,
+            'user_id': self.user_id,
+            'room_id': self.room_id,
+            'scan_time': self.scan_time,
+            'status': self.status,
+            'notes': self.notes,
+            'last_update': self.last_update,
+            'changeLog': self.changeLog,
+            'archived_at': self.archived_at
+        }
@@ -0,0 +1,42 @@
+from App.database import db
+from datetime import datetime
+
+class ScanReceipt(db.Model):
+    """A scan record accepted from a scanner, keyed by the client's idempotency key.
+
+    A retried batch finds its receipts here and is answered from them
+    instead of being applied again.
+    """
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'idempotency_key', name='uq_scan_receipt_user_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    idempotency_key = db.Column(db.String(64), nullable=False)
+    asset_id = db.Column(db.String, nullable=False)  # Raw tag, may not match any asset
+    room_id = db.Column(db.String, nullable=False)
+    result = db.Column(db.String(20), nullable=False)  # Good, Misplaced or unknown
+    scanned_at = db.Column(db.DateTime, nullable=True)
+    received_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+    def __init__(self, user_id, idempotency_key, asset_id, room_id, result, scanned_at=None):
+        self.user_id = user_id
+        self.idempotency_key = idempotency_key
+        self.asset_id = asset_id
+        self.room_id = room_id
+        self.result = result
+        self.scanned_at = scanned_at
+        self.received_at = datetime.now()
+
+    def get_json(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'idempotency_key': self.idempotency_key,
+            'asset_id': self.asset_id,
+            'room_id': self.room_id,
+            'result': self.result,
+            'scanned_at': self.scanned_at,
+            'received_at': self.received_at
+        }
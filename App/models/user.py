@@ -1,4 +1,4 @@
-from werkzeug.security import check_password_hash, generate_password_hash
+from App.passwords import hash_password, verify_password
 from App.database import db
 
 class User(db.Model):
@@ -21,9 +21,9 @@ class User(db.Model):
 
     def set_password(self, password):
         """Create hashed password."""
-        self.password = generate_password_hash(password)
+        self.password = hash_password(password)
     
     def check_password(self, password):
         """Check hashed password."""
-        return check_password_hash(self.password, password)
+        return verify_password(self.password, password)
 
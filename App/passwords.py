@@ -0,0 +1,64 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app, has_app_context
+from werkzeug.security import check_password_hash, generate_password_hash
+
+try:
+    from gevent import monkey
+except ImportError:  # gevent is only needed by the gunicorn worker
+    monkey = None
+
+# PBKDF2-SHA256 iterations for new hashes unless PASSWORD_HASH_ITERATIONS is
+# configured. Stored hashes with another count are re-hashed at next login.
+PASSWORD_HASH_ITERATIONS = 260000
+
+# Hashes computed at once per process; 0 hashes inline in the request.
+# Each hash holds a core for its whole run, so more threads than cores
+# only make every login slower.
+PASSWORD_HASH_THREADS = 2
+
+# The pool is made on first use, after gunicorn has forked the worker
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            if monkey is not None and monkey.is_module_patched('threading'):
+                # Patched threads are greenlets and would still block the
+                # worker; gevent's pool runs real threads and wakes only the
+                # waiting greenlet. PBKDF2 releases the GIL while it runs.
+                from gevent.threadpool import ThreadPool
+                _pool = ThreadPool(PASSWORD_HASH_THREADS)
+            else:
+                _pool = ThreadPoolExecutor(max_workers=PASSWORD_HASH_THREADS, thread_name_prefix='password-hash')
+        return _pool
+
+def _run(fn, *args):
+    if PASSWORD_HASH_THREADS <= 0:
+        return fn(*args)
+    pool = _get_pool()
+    if isinstance(pool, ThreadPoolExecutor):
+        return pool.submit(fn, *args).result()
+    return pool.apply(fn, args)
+
+def get_password_hash_method():
+    """The werkzeug method string for new hashes, e.g. pbkdf2:sha256:260000."""
+    iterations = PASSWORD_HASH_ITERATIONS
+    if has_app_context():
+        iterations = current_app.config.get('PASSWORD_HASH_ITERATIONS', iterations)
+    return f"pbkdf2:sha256:{int(iterations)}"
+
+def hash_password(password):
+    """Hash a password with the configured work factor, off the request's thread."""
+    return _run(generate_password_hash, password, get_password_hash_method())
+
+def verify_password(pwhash, password):
+    """Check a password against a stored hash, off the request's thread."""
+    return _run(check_password_hash, pwhash, password)
+
+def needs_rehash(pwhash):
+    """True if a stored hash was made with another method or work factor than the configured one."""
+    return pwhash.split('$', 1)[0] != get_password_hash_method()
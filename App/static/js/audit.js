@@ -464,7 +464,8 @@ const AuditApp = (function() {
         currentRoom: null,
         expectedAssets: [],
         scannedAssets: [],
-        isRoomAuditActive: false
+        isRoomAuditActive: false,
+        sessionId: null
     };
     
     // Barcode scanning state
@@ -839,7 +840,7 @@ const AuditApp = (function() {
     /**
      * Start the room audit process
      */
-    function startRoomAudit() {
+    async function startRoomAudit() {
         if (!state.currentRoom || state.currentRoom === 'Select Room') {
             UI.showMessage('Please select a room first', 'warning');
             return;
@@ -848,6 +849,31 @@ const AuditApp = (function() {
         // If already active, do nothing
         if (state.isRoomAuditActive) return;
         
+        // Open (or resume) the audit session on the server
+        let sessionData;
+        try {
+            const response = await fetch('/api/audit-sessions', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({
+                    scopeType: 'room',
+                    scopeId: state.currentRoom
+                })
+            });
+            sessionData = await response.json();
+            if (!response.ok) {
+                UI.showMessage(sessionData.message || 'Could not start the audit', 'danger');
+                return;
+            }
+        } catch (error) {
+            console.error('Error starting audit session:', error);
+            UI.showMessage('Network error starting the audit', 'danger');
+            return;
+        }
+        
+        state.sessionId = sessionData.session.id;
         state.isRoomAuditActive = true;
         
         // Update Toggle button
@@ -879,7 +905,13 @@ const AuditApp = (function() {
         
         UI.updateScanCounter(state.expectedAssets);
         
-        UI.showMessage(`Audit started for room ${state.currentRoom}`, 'success');
+        if (sessionData.resumed) {
+            // Replay the scans saved before the page was reloaded
+            sessionData.scans.forEach(scan => showScanResult(scan, 'resumed'));
+            UI.showMessage(`Resumed audit for room ${state.currentRoom} with ${sessionData.scans.length} scanned assets`, 'success');
+        } else {
+            UI.showMessage(`Audit started for room ${state.currentRoom}`, 'success');
+        }
     }
     
     /**
@@ -919,11 +951,8 @@ const AuditApp = (function() {
         
         UI.updateScanningInterface(state.currentAuditMethod, false);
         
-        // Mark unscanned assets as missing if requested
-        if (markMissing) {
-            markUnscannedAssetsMissing();
-            UI.showMessage('Audit completed. Unscanned assets marked as missing.', 'info');
-        }
+        // Apply the scans on the server, marking unscanned assets missing if requested
+        completeAuditSession(markMissing);
     }
     
     /**
@@ -1138,70 +1167,69 @@ const AuditApp = (function() {
         
         // Check if the asset is in the expected assets list for this room
         const assetInRoom = state.expectedAssets.find(a => a.id === assetId);
+        if (assetInRoom && assetInRoom.found) {
+            // Asset already scanned
+            UI.showMessage(`Asset already scanned: ${assetInRoom.description} (${assetInRoom.id})`, 'info');
+            return;
+        }
         
-        if (assetInRoom) {
-            // Asset is expected in this room
-            if (!assetInRoom.found) {
-                // First time scanning this asset
-                await updateAssetLocation(assetInRoom.id, state.currentRoom);
-                markAssetAsFound(assetInRoom, scanMethod); // Pass scan method
-            } else {
-                // Asset already scanned
-                UI.showMessage(`Asset already scanned: ${assetInRoom.description} (${assetInRoom.id})`, 'info');
-            }
-        } else {
-            // Asset not in expected list, check if it exists elsewhere
-            try {
-                const response = await fetch(`/api/asset/${assetId}`);
-                
-                if (response.ok) {
-                    // Asset exists in database but not in this room
-                    const asset = await response.json();
-                    
-                    // Update asset location to current room and mark as misplaced
-                    await updateAssetLocation(assetId, state.currentRoom);
-                    
-                    // Make sure we preserve the assignee_name from the API
-                    if (!asset.assignee_name && asset.assignee_id) {
-                        asset.assignee_name = `Assignee ID: ${asset.assignee_id}`;
-                    }
-                    
-                    addMisplacedAsset(asset, scanMethod); // Pass scan method
-                } else {
-                    // Asset not found in database - automatically add as unexpected
-                    addUnexpectedAsset(assetId, scanMethod); // Pass scan method
-                    UI.showMessage(`Unknown asset: ${assetId} - Added as unexpected asset`, 'warning');
-                }
-            } catch (error) {
-                console.error('Error checking asset in database:', error);
-                UI.showMessage(`Error checking asset: ${assetId}`, 'danger');
+        try {
+            const scan = await recordScan(assetId);
+            if (scan) {
+                showScanResult(scan, scanMethod);
             }
+        } catch (error) {
+            console.error('Error recording scan:', error);
+            UI.showMessage(`Error checking asset: ${assetId}`, 'danger');
         }
     }
     
     /**
-     * Update asset location in the database
-     * @param {string} assetId - The ID of the asset
-     * @param {string} roomId - The ID of the room
+     * Record a scanned tag in the audit session
+     * @param {string} assetId - The scanned tag
+     * @returns {Object} The server's result for the tag (found, misplaced or unknown)
      */
-    async function updateAssetLocation(assetId, roomId) {
-        try {
-            const response = await fetch('/api/update-asset-location', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({
-                    assetId: assetId,
-                    roomId: roomId
-                })
-            });
-            
-            if (!response.ok) {
-                console.error('Failed to update asset location:', await response.text());
+    async function recordScan(assetId) {
+        const response = await fetch(`/api/audit-sessions/${state.sessionId}/scans`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                assetIds: [assetId],
+                roomId: state.currentRoom
+            })
+        });
+        
+        if (!response.ok) {
+            throw new Error(await response.text());
+        }
+        const data = await response.json();
+        return data.results[0];
+    }
+    
+    /**
+     * Show a scan result from the server in the audit tables
+     * @param {Object} scan - A scan result from the audit session API
+     */
+    function showScanResult(scan, scanMethod) {
+        const assetInRoom = state.expectedAssets.find(a => a.id === scan.asset_id);
+        
+        if (assetInRoom) {
+            if (!assetInRoom.found) {
+                markAssetAsFound(assetInRoom, scanMethod);
             }
-        } catch (error) {
-            console.error('Error updating asset location:', error);
+        } else if (scan.result === 'unknown') {
+            // Asset not found in database - automatically add as unexpected
+            addUnexpectedAsset(scan.asset_id, scanMethod);
+            UI.showMessage(`Unknown asset: ${scan.asset_id} - Added as unexpected asset`, 'warning');
+        } else {
+            // Asset exists in database but not in this room
+            const asset = scan.asset;
+            if (!asset.assignee_name && asset.assignee_id) {
+                asset.assignee_name = `Assignee ID: ${asset.assignee_id}`;
+            }
+            addMisplacedAsset(asset, scanMethod);
         }
     }
     
@@ -1314,76 +1342,49 @@ const AuditApp = (function() {
     }
     
     /**
-     * Mark unscanned assets as missing
-     */
-    function markUnscannedAssetsMissing() {
-        let missingCount = 0;
-        const missingAssets = [];
-        
-        state.expectedAssets.forEach(asset => {
-            if (!asset.found) {
-                asset.status = 'Missing';
-                missingCount++;
-                missingAssets.push(asset.id);
-                
-                // Update status in the UI
-                UI.updateAssetStatus(asset.id, 'Missing');
-            }
-        });
-        
-        console.log(`Marking ${missingCount} assets as missing:`, missingAssets);
-        
-        if (missingCount > 0) {
-            // Update the assets in the database
-            updateMissingAssets(missingAssets);
-            UI.showMessage(`${missingCount} assets marked as missing`, 'warning');
-        }
-    }
-    
-    /**
-     * Update missing assets in the database
-     * @param {Array} missingAssetIds - Array of missing asset IDs
+     * Complete the audit session: the server applies every scan and, if
+     * requested, marks the unscanned assets missing in one transaction
+     * @param {boolean} markMissing - Whether to mark unscanned assets as missing
      */
-    async function updateMissingAssets(missingAssetIds) {
-        if (!missingAssetIds || missingAssetIds.length === 0) {
-            console.log("No assets to mark as missing");
-            return;
-        }
-        
-        console.log(`Sending ${missingAssetIds.length} asset IDs to server for marking as missing:`, missingAssetIds);
+    async function completeAuditSession(markMissing) {
+        const sessionId = state.sessionId;
+        state.sessionId = null;
+        if (!sessionId) return;
         
         try {
-            const response = await fetch('/api/mark-assets-missing', {
+            const response = await fetch(`/api/audit-sessions/${sessionId}/complete`, {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
                 },
                 body: JSON.stringify({
-                    assetIds: missingAssetIds
+                    markMissing: markMissing
                 })
             });
             
+            const responseData = await response.json();
             if (!response.ok) {
-                const responseData = await response.json();
-                console.error('Failed to mark assets as missing:', responseData);
-                UI.showMessage(`Error marking assets as missing: ${responseData.message || 'Unknown error'}`, 'danger');
-            } else {
-                const responseData = await response.json();
-                console.log(`Successfully marked ${responseData.processed_count || missingAssetIds.length} assets as missing`);
-                
-                // Confirm UI updates for all missing assets
+                console.error('Failed to complete audit:', responseData);
+                UI.showMessage(`Error completing audit: ${responseData.message || 'Unknown error'}`, 'danger');
+                return;
+            }
+            
+            if (markMissing) {
+                const missingAssetIds = responseData.summary.missing;
                 state.expectedAssets.forEach(asset => {
                     if (missingAssetIds.includes(asset.id)) {
                         asset.status = 'Missing';
                         UI.updateAssetStatus(asset.id, 'Missing');
                     }
                 });
+                UI.showMessage(`Audit completed. ${responseData.summary.result.marked_missing} unscanned assets marked as missing.`, 'info');
             }
         } catch (error) {
-            console.error('Error marking assets as missing:', error);
-            UI.showMessage(`Network error marking assets as missing: ${error.message}`, 'danger');
+            console.error('Error completing audit:', error);
+            UI.showMessage(`Network error completing audit: ${error.message}`, 'danger');
         }
     }
+    
     function undoScan(assetId) {
         if (!state.isRoomAuditActive) {
             UI.showMessage('Audit must be active to undo scans', 'warning');
@@ -1397,11 +1398,17 @@ const AuditApp = (function() {
             return false;
         }
         
-        const scannedAsset = state.scannedAssets[scannedIndex];
-        
         // Remove from scanned assets
         state.scannedAssets.splice(scannedIndex, 1);
         
+        // Remove the scan from the server-side session
+        fetch(`/api/audit-sessions/${state.sessionId}/scans/${encodeURIComponent(assetId)}`, {
+            method: 'DELETE'
+        }).catch(error => {
+            console.error('Error undoing scan on the server:', error);
+            UI.showMessage(`Could not undo the scan for ${assetId} on the server`, 'danger');
+        });
+        
         // If this is an expected asset, mark it as not found
         const expectedAsset = state.expectedAssets.find(a => a.id === assetId);
         if (expectedAsset) {
@@ -10,20 +10,20 @@ const filterState = {
     columnFilter: null,
     columnNames: ['description', 'id', 'brandModel', 'location', 'status', 'assignee', 'lastUpdate'],
     
-    // Apply filters to the table
+    // Apply the column filter to the loaded rows
     applyFilters: function() {
-        handleSearch();
+        filterRows();
     },
     
-    // Add a status filter
+    // Add a status filter (applied on the server, so reload the list)
     addStatusFilter: function(status) {
         if (this.statusFilters.has(status)) {
             this.statusFilters.delete(status);
         } else {
             this.statusFilters.add(status);
         }
-        this.applyFilters();
         this.updateFilterUI();
+        loadAssets();
     },
     
     // Set column to filter on
@@ -35,12 +35,16 @@ const filterState = {
     
     // Reset all filters
     resetFilters: function() {
+        const hadServerFilters = this.statusFilters.size > 0 || this.searchTerm !== '';
         this.searchTerm = '';
         this.statusFilters.clear();
         this.columnFilter = null;
         document.getElementById('searchInput').value = '';
         this.applyFilters();
         this.updateFilterUI();
+        if (hadServerFilters) {
+            loadAssets();
+        }
     },
     
     // Update UI to show active filters
@@ -125,6 +129,25 @@ const filterState = {
     }
 };
 
+// Pagination state for the server-side asset list
+const pageState = {
+    pageSize: 100,
+    cursor: null,
+    hasMore: true,
+    loading: false,
+    sort: 'id',
+    order: 'asc',
+    // Bumped on every reload so responses for an outdated list are dropped
+    generation: 0
+};
+
+// Table columns that can be sorted on the server, mapped to their sort keys
+const serverSortColumns = {
+    1: 'id',
+    4: 'status',
+    6: 'last_update'
+};
+
 /**
  * Utility Functions
  */
@@ -182,17 +205,53 @@ function showMessage(message, type = 'info') {
 /**
  * API Functions
  */
-async function loadAssets() {
+function buildAssetsUrl() {
+    const params = new URLSearchParams();
+    params.set('limit', pageState.pageSize);
+    // Searches are ranked by relevance on the server, so no sort is sent
+    if (filterState.searchTerm) {
+        params.set('q', filterState.searchTerm);
+    } else {
+        params.set('sort', pageState.sort);
+        params.set('order', pageState.order);
+    }
+    if (pageState.cursor) {
+        params.set('cursor', pageState.cursor);
+    }
+    // Status values are stored capitalised on the server
+    filterState.statusFilters.forEach(status => {
+        params.append('status', status.charAt(0).toUpperCase() + status.slice(1));
+    });
+    const path = filterState.searchTerm ? '/api/assets/search' : '/api/assets';
+    return `${path}?${params.toString()}`;
+}
+
+async function loadAssets(reset = true) {
+    if (reset) {
+        pageState.generation++;
+        pageState.cursor = null;
+        pageState.hasMore = true;
+        pageState.loading = false;
+    }
+    if (pageState.loading || !pageState.hasMore) return;
+
+    const generation = pageState.generation;
+    pageState.loading = true;
     try {
         showLoading(true);
-        const response = await fetch('/api/assets');
+        const response = await fetch(buildAssetsUrl());
         if (!response.ok) {
             throw new Error(`Failed to fetch assets: ${response.status} ${response.statusText}`);
         }
-        const assets = await response.json();
-        displayAssets(assets);
+        const page = await response.json();
+        if (generation !== pageState.generation) return;
+
+        pageState.cursor = page.next_cursor;
+        pageState.hasMore = Boolean(page.next_cursor);
+        displayAssets(page.assets, !reset);
     } catch (error) {
         console.error('Error loading assets:', error);
+        pageState.hasMore = false;
         document.getElementById('assetTableBody').innerHTML = `
             <tr><td colspan="8" class="text-center">
                 <div class="alert alert-danger mb-0">
@@ -202,10 +261,26 @@ async function loadAssets() {
             </td></tr>
         `;
     } finally {
-        showLoading(false);
+        if (generation === pageState.generation) {
+            pageState.loading = false;
+            showLoading(false);
+        }
     }
 }
 
+// Load the next page when the bottom of the table scrolls into view
+function setupInfiniteScroll() {
+    const sentinel = document.getElementById('assetListEnd');
+    if (!sentinel || !('IntersectionObserver' in window)) return;
+
+    const observer = new IntersectionObserver(entries => {
+        if (entries.some(entry => entry.isIntersecting)) {
+            loadAssets(false);
+        }
+    }, { rootMargin: '400px' });
+    observer.observe(sentinel);
+}
+
 async function loadRoomsForModal() {
     const selectElement = document.getElementById('addAssetRoomSelect');
     if (!selectElement) return;
@@ -329,11 +404,11 @@ async function saveNewAsset() {
 /**
  * UI Functions
  */
-function displayAssets(assets) {
+function displayAssets(assets, append = false) {
     const tableBody = document.getElementById('assetTableBody');
     if (!tableBody) return;
     
-    if (!assets || assets.length === 0) {
+    if (!append && (!assets || assets.length === 0)) {
         tableBody.innerHTML = `
             <tr><td colspan="8" class="text-center">
                 <div class="py-4">
@@ -345,8 +420,10 @@ function displayAssets(assets) {
         return;
     }
     
-    // Clear table
-    tableBody.innerHTML = '';
+    // Clear table unless we are adding the next page
+    if (!append) {
+        tableBody.innerHTML = '';
+    }
     
     // Create rows
     assets.forEach(asset => {
@@ -402,11 +479,17 @@ function displayAssets(assets) {
     }
 }
 
+// Search the whole inventory on the server
 function handleSearch() {
     const searchInput = document.getElementById('searchInput');
-    const searchTerm = searchInput ? searchInput.value.toLowerCase() : '';
-    filterState.searchTerm = searchTerm;
-    
+    filterState.searchTerm = searchInput ? searchInput.value.trim().toLowerCase() : '';
+    filterState.updateFilterUI();
+    loadAssets();
+}
+
+// Narrow the loaded rows to those whose filtered column contains the search term
+function filterRows() {
+    const searchTerm = filterState.searchTerm;
     const rows = document.querySelectorAll('#assetTableBody tr');
     let visibleCount = 0;
     
@@ -424,23 +507,15 @@ function handleSearch() {
             }
         }
         
-        // Apply text search if still visible
-        if (shouldDisplay && searchTerm) {
-            if (filterState.columnFilter !== null) {
-                // Search in specific column
-                const columnName = filterState.columnNames[filterState.columnFilter];
-                const attributeName = `data-${columnName.replace(/([A-Z])/g, '-$1').toLowerCase()}`;
-                const cellValue = row.getAttribute(attributeName) || '';
-                
-                if (!cellValue.includes(searchTerm)) {
-                    shouldDisplay = false;
-                }
-            } else {
-                // Search across all text content
-                const rowText = row.textContent.toLowerCase();
-                if (!rowText.includes(searchTerm)) {
-                    shouldDisplay = false;
-                }
+        // The server already matched the search across all columns; a
+        // column filter narrows the results to that column
+        if (shouldDisplay && searchTerm && filterState.columnFilter !== null) {
+            const columnName = filterState.columnNames[filterState.columnFilter];
+            const attributeName = `data-${columnName.replace(/([A-Z])/g, '-$1').toLowerCase()}`;
+            const cellValue = row.getAttribute(attributeName) || '';
+            
+            if (!cellValue.includes(searchTerm)) {
+                shouldDisplay = false;
             }
         }
         
@@ -492,6 +567,22 @@ function handleSearch() {
 function sortTable(columnIndex) {
     const table = document.querySelector('.inventory-table table');
     if (!table) return;
+
+    // Columns with a server sort key are re-queried so the order covers every page
+    if (columnIndex in serverSortColumns) {
+        const sortKey = serverSortColumns[columnIndex];
+        const isAscending = pageState.sort === sortKey ? pageState.order !== 'asc' : true;
+        pageState.sort = sortKey;
+        pageState.order = isAscending ? 'asc' : 'desc';
+
+        table.querySelectorAll('th i.bi').forEach((icon, index) => {
+            const up = index === columnIndex && isAscending;
+            icon.classList.toggle('bi-sort-up', up);
+            icon.classList.toggle('bi-sort-down', !up);
+        });
+        loadAssets();
+        return;
+    }
     
     const tbody = table.querySelector('tbody');
     if (!tbody) return;
@@ -572,10 +663,6 @@ function setupEventListeners() {
     // Search input
     const searchInput = document.getElementById('searchInput');
     if (searchInput) {
-        searchInput.addEventListener('input', () => {
-            filterState.searchTerm = searchInput.value.toLowerCase();
-        });
-        
         searchInput.addEventListener('keyup', event => {
             if (event.key === 'Enter') {
                 handleSearch();
@@ -630,8 +717,8 @@ function setupEventListeners() {
                     filterState.searchTerm = '';
                     const searchInput = document.getElementById('searchInput');
                     if (searchInput) searchInput.value = '';
-                    filterState.applyFilters();
                     filterState.updateFilterUI();
+                    loadAssets();
                 }
             }
         });
@@ -654,5 +741,6 @@ function setupEventListeners() {
 // Initialize everything when the DOM is loaded
 document.addEventListener('DOMContentLoaded', () => {
     setupEventListeners();
+    setupInfiniteScroll();
     loadAssets();
 });
\ No newline at end of file
@@ -18,7 +18,7 @@ document.addEventListener('DOMContentLoaded', function() {
 const UIHelper = {
     // Show status message in modal
     showStatusMessage: function(title, message, type) {
-        const statusModal = new bootstrap.Modal(document.getElementById('statusModal'));
+        const statusModal = bootstrap.Modal.getOrCreateInstance(document.getElementById('statusModal'));
         const statusTitle = document.getElementById('statusTitle');
         const statusMessage = document.getElementById('statusMessage');
         
@@ -223,10 +223,10 @@ const CsvUploader = {
             
             const result = await response.json();
             
-            if (response.ok) {
-                UIHelper.showStatusMessage('Success', `${type === 'asset' ? 'Assets' : 'Locations'} imported successfully.`, 'success');
+            if (response.ok && result.job) {
                 // Clear the file input
                 document.getElementById(`${type}ClearFileBtn`).click();
+                this.pollJob(type, result.job.id);
             } else {
                 UIHelper.showStatusMessage('Error', result.message || `Failed to import ${type} data.`, 'danger');
             }
@@ -235,6 +235,78 @@ const CsvUploader = {
             UIHelper.showStatusMessage('Error', `An error occurred while uploading the ${type} CSV file.`, 'danger');
             UIHelper.cleanupModals();
         }
+    },
+    
+    // Poll a background import job until it finishes, showing its progress
+    pollJob: async function(type, jobId) {
+        const label = type === 'asset' ? 'Assets' : 'Locations';
+        UIHelper.showStatusMessage('Importing', `Importing ${label.toLowerCase()}... <span id="importJobProgress">0%</span>`, '');
+        
+        try {
+            while (true) {
+                const response = await fetch(`/api/jobs/${jobId}`);
+                if (!response.ok) {
+                    throw new Error('Failed to fetch job status');
+                }
+                const job = await response.json();
+                
+                if (job.status === 'Completed' || job.status === 'Failed') {
+                    this.showJobResult(label, job);
+                    return;
+                }
+                
+                const progress = document.getElementById('importJobProgress');
+                if (progress) {
+                    progress.textContent = `${job.percent}% (${job.processed} rows)`;
+                }
+                await new Promise(resolve => setTimeout(resolve, 1000));
+            }
+        } catch (error) {
+            console.error(`Error checking ${type} import:`, error);
+            UIHelper.showStatusMessage('Error', `Lost track of the ${type} import. It may still be running.`, 'danger');
+        }
+    },
+    
+    showJobResult: async function(label, job) {
+        const result = job.result || {};
+        
+        if (job.status === 'Failed' || !result.success) {
+            let message = job.message || `Failed to import ${label.toLowerCase()}.`;
+            if (job.error_count > 0) {
+                message += await this.formatJobErrors(job);
+            }
+            UIHelper.showStatusMessage('Error', message, 'danger');
+            return;
+        }
+        
+        let message = `${label} imported successfully. `;
+        if (result.imported !== undefined) {
+            message += `${result.imported} assets imported, ${result.skipped} skipped.`;
+        } else {
+            message += `${result.buildings_created} buildings, ${result.floors_created} floors and ${result.rooms_created} rooms created, ${result.skipped} rows skipped.`;
+        }
+        if (job.error_count > 0) {
+            message += await this.formatJobErrors(job);
+        }
+        UIHelper.showStatusMessage('Success', message, job.error_count > 0 ? 'warning' : 'success');
+    },
+    
+    // List the first few errors of a job
+    formatJobErrors: async function(job) {
+        try {
+            const response = await fetch(`/api/jobs/${job.id}/errors`);
+            const errors = await response.json();
+            const items = errors.slice(0, 10).map(error => {
+                const li = document.createElement('li');
+                li.textContent = error.message;
+                return li.outerHTML;
+            }).join('');
+            const more = job.error_count > 10 ? `<p>Showing first 10 of ${job.error_count} errors.</p>` : '';
+            return `<ul class="mt-2 text-start">${items}</ul>${more}`;
+        } catch (error) {
+            console.error('Error loading job errors:', error);
+            return '';
+        }
     }
 };
 
@@ -1,7 +1,8 @@
-import os, tempfile, pytest, logging, unittest
+import os, io, re, gzip, socket, subprocess, sys, tempfile, time, pytest, logging, unittest, json
+from flask import current_app
 from werkzeug.security import check_password_hash, generate_password_hash
 from datetime import datetime
-from App.models import Assignee, AssetAssignment, Building, Floor, Room, Asset, ScanEvent
+from App.models import Assignee, AssetAssignment, Building, Floor, Room, Asset, ScanEvent, ScanEventArchive
 from App.controllers import (
     create_building, get_building, 
     create_floor, get_floor,
@@ -10,14 +11,20 @@ from App.controllers import (
 from App.controllers.asset import(
     get_asset, get_all_assets,
     get_all_assets_json, get_all_assets_by_room_id,
-    add_asset, set_last_located,set_status, upload_csv
+    add_asset, set_last_located,set_status, upload_csv,
+    mark_assets_missing, bulk_mark_assets_found, bulk_relocate_assets, update_asset_location,
+    get_asset_views, get_asset_views_page, iter_asset_views,
+    delete_asset, mark_asset_lost, mark_asset_found, iter_asset_report_rows, update_asset_details
 )
 from App.controllers.scanevent import(
-    add_scan_event, get_all_scans,
+    add_scan_event, add_scan_events_bulk, get_all_scans, new_scan_id, get_scans_by_asset, get_scan_history_page,
     get_scan_event, get_scans_by_status,
     get_scans_by_last_update, get_scans_by_changelog
 )
+from App.controllers.asset_search import search_assets
+from App.controllers.scan_retention import archive_scan_events, get_scan_retention_cutoff
 from App.main import create_app
+from App.views.streaming import stream_json_array, stream_csv
 from App.database import db, create_db
 from App.models import User
 from App.controllers import (
@@ -28,7 +35,33 @@ from App.controllers import (
     get_user_by_username,
     update_user
 )
-from App.controllers.assignee import create_assignee, get_assignee_by_id, update_assignee
+from App.controllers.assignee import (
+    create_assignee, get_assignee_by_id, update_assignee,
+    get_or_create_assignee_by_name, get_or_create_assignees_by_name
+)
+from App.controllers.dataversion import get_data_version, bump_data_version
+from App.controllers.location_cache import LOCATION_VERSION
+from App.controllers.location_import import upload_locations_csv
+from App.controllers.user_cache import USER_VERSION, get_cached_user, clear_user_cache
+from App.passwords import get_password_hash_method, needs_rehash
+from App.controllers.mail import MAIL_MAX_ATTEMPTS, mail, queue_email, send_outbox, send_password_reset_email
+from App.models import OutboxMessage
+try:
+    from aiosmtpd.controller import Controller as SMTPController
+except ImportError:
+    SMTPController = None
+from App.views.compression import COMPRESSION_MIN_SIZE, brotli, get_compression_stats, reset_compression_stats
+from flask_jwt_extended import create_access_token
+from App.controllers.job import enqueue_csv_import, create_job, get_job, iter_job_errors, run_job, count_csv_rows, fail_stale_jobs
+from werkzeug.datastructures import FileStorage
+from App.controllers.audit_session import (
+    start_audit_session, add_audit_scans, remove_audit_scan, get_audit_session,
+    reconcile_audit_session, complete_audit_session, cancel_audit_session
+)
+from App.controllers.scan_batch import ingest_scan_batch
+from App.controllers.ulid import new_ulid
+from App.controllers.stats import get_location_status_counts
+from App.controllers.status_counts import aggregate_status_counts, get_status_counts, rebuild_status_counts
 from App.controllers.assetassignment import (
     create_asset_assignment, get_asset_assignment_by_id,
     update_asset_assignment, delete_asset_assignment
@@ -67,6 +100,12 @@ class UserUnitTests(unittest.TestCase):
         user = User("bob@gmail.com", "bob", password)
         assert user.check_password(password)
 
+    def test_password_work_factor(self):
+        user = User("bob@gmail.com", "bob", "mypass")
+        assert user.password.startswith(get_password_hash_method() + "$")
+        assert not needs_rehash(user.password)
+        assert needs_rehash(generate_password_hash("mypass", method="pbkdf2:sha256:1000"))
+
 class BuildingUnitTests(unittest.TestCase):
 
     def test_new_building(self):
@@ -224,6 +263,20 @@ class ScanEventUnitTest(unittest.TestCase):
             'change log: ': "Original owner"
         }
         self.assertDictEqual(scanevent.get_json(), expected_json)
+
+    def test_new_scan_id_is_unique_and_sorted(self):
+        scan_ids = [new_scan_id() for _ in range(1000)]
+        self.assertEqual(len(set(scan_ids)), 1000)
+        self.assertEqual(scan_ids, sorted(scan_ids))
+        self.assertEqual(len(scan_ids[0]), len("SCAN-") + 26)
+
+    def test_new_ulid_timestamp_leaves_clock_alone(self):
+        future = new_ulid(datetime(2099, 1, 1))
+        past = new_ulid(datetime(2020, 1, 1))
+        now = new_ulid()
+        self.assertLess(past, now)
+        self.assertLess(now, future)
+        self.assertEqual(past[:10], new_ulid(datetime(2020, 1, 1))[:10])
         
         
         
@@ -235,7 +288,7 @@ class ScanEventUnitTest(unittest.TestCase):
 # scope="class" would execute the fixture once and resued for all methods in the class
 @pytest.fixture(autouse=True, scope="module")
 def empty_db():
-    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db'})
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db', 'MAIL_SEND_IN_BACKGROUND': False})
     create_db()
     yield app.test_client()
     db.drop_all()
@@ -260,7 +313,156 @@ class UsersIntegrationTests(unittest.TestCase):
         update_user(1, "ronnie@gmail.com", "ronnie")
         user = get_user(1)
         assert user.username == "ronnie"
+
+    def test_login_rehashes_old_password_hash(self):
+        user = create_user("rehash@example.com", "rehash", "oldpass")
+        user.password = generate_password_hash("oldpass", method="pbkdf2:sha256:1000")
+        db.session.commit()
+
+        self.assertIsNone(login("rehash@example.com", "wrongpass"))
+        self.assertTrue(user.password.startswith("pbkdf2:sha256:1000$"))
+        self.assertIsNotNone(login("rehash@example.com", "oldpass"))
+        self.assertFalse(needs_rehash(user.password))
+        self.assertTrue(user.check_password("oldpass"))
         
+class UserCacheIntegrationTests(unittest.TestCase):
+
+    def _count_user_selects(self, action):
+        statements = []
+        def record(conn, cursor, statement, *args):
+            if statement.lstrip().upper().startswith("SELECT") and re.search(r'FROM "?user\b', statement):
+                statements.append(statement)
+        # Start from an empty identity map, as a new request does
+        db.session.expunge_all()
+        db.event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            action()
+        finally:
+            db.event.remove(db.engine, 'before_cursor_execute', record)
+        return len(statements)
+
+    def test_user_is_loaded_once_and_reused(self):
+        user_id = create_user("cache@example.com", "cache", "cachepass").id
+        headers = {'Authorization': f"Bearer {create_access_token(identity='cache@example.com')}"}
+        client = current_app.test_client()
+        clear_user_cache()
+
+        # The JWT loader and the template context share one load
+        response = None
+        def render():
+            nonlocal response
+            response = client.get('/inventory', headers=headers)
+        self.assertEqual(self._count_user_selects(render), 1)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._count_user_selects(render), 0)
+
+        self.assertEqual(self._count_user_selects(lambda: get_cached_user(user_id, 1)), 1)
+        self.assertEqual(self._count_user_selects(lambda: get_cached_user(user_id, 1)), 0)
+        update_user(user_id, "cache@example.com", "renamed")
+        db.session.expunge_all()
+        self.assertEqual(get_cached_user(user_id, 1).username, "renamed")
+
+        # Another worker renames the user and bumps the version
+        db.session.execute(db.update(User).where(User.id == user_id).values(username="elsewhere"))
+        bump_data_version(USER_VERSION)
+        db.session.commit()
+        db.session.expunge_all()
+        self.assertEqual(get_cached_user(user_id, 1).username, "elsewhere")
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+class _RecordingSMTPHandler:
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append((session.peer, envelope.rcpt_tos))
+        return '250 OK'
+
+@unittest.skipIf(SMTPController is None, "aiosmtpd is not installed")
+class MailOutboxIntegrationTests(unittest.TestCase):
+
+    def setUp(self):
+        OutboxMessage.query.delete()
+        db.session.commit()
+        self.handler = _RecordingSMTPHandler()
+        self.port = _free_port()
+        self.smtp = SMTPController(self.handler, hostname='127.0.0.1', port=self.port)
+        self.smtp.start()
+        self.saved_state = current_app.extensions['mail']
+        self.use_server(self.port)
+
+    def tearDown(self):
+        current_app.extensions['mail'] = self.saved_state
+        current_app.config['MAIL_SEND_IN_BACKGROUND'] = False
+        self.smtp.stop()
+
+    def use_server(self, port):
+        current_app.extensions['mail'] = mail.init_mail({
+            'MAIL_SERVER': '127.0.0.1', 'MAIL_PORT': port, 'MAIL_DEFAULT_SENDER': 'tracker@example.com'
+        })
+
+    def test_request_path_only_queues(self):
+        self.assertTrue(send_password_reset_email("reset@example.com", "https://example.com/reset/abc"))
+        self.assertEqual(self.handler.messages, [])
+        message = OutboxMessage.query.one()
+        self.assertEqual((message.status, message.recipients), ("Pending", ["reset@example.com"]))
+        self.assertIn("https://example.com/reset/abc", message.html)
+
+    def test_batch_is_sent_over_one_connection(self):
+        for i in range(3):
+            queue_email(f"Hello {i}", [f"user{i}@example.com"], "<p>hi</p>")
+        self.assertEqual(send_outbox(), (3, 0))
+        self.assertEqual([rcpt for _, rcpt in self.handler.messages], [[f"user{i}@example.com"] for i in range(3)])
+        self.assertEqual(len({peer for peer, _ in self.handler.messages}), 1)
+        self.assertEqual({message.status for message in OutboxMessage.query}, {"Sent"})
+        self.assertEqual(send_outbox(), (0, 0))
+
+    def test_empty_outbox_opens_no_connection(self):
+        connections = []
+        connect = mail.connect
+        mail.connect = lambda: connections.append(1) or connect()
+        try:
+            self.assertEqual(send_outbox(), (0, 0))
+            queue_email("Hello", ["user@example.com"], "<p>hi</p>")
+            self.assertEqual(send_outbox(), (1, 0))
+        finally:
+            del mail.connect
+        self.assertEqual(len(connections), 1)
+        self.assertEqual(len(self.handler.messages), 1)
+
+    def test_failed_send_is_retried_with_backoff(self):
+        self.use_server(_free_port())  # Nothing listening
+        message = queue_email("Retry", ["retry@example.com"], "<p>hi</p>")
+        self.assertEqual(send_outbox(), (0, 1))
+        self.assertEqual((message.status, message.attempts), ("Pending", 1))
+        self.assertGreater(message.next_attempt_at, datetime.now())
+        self.assertEqual(send_outbox(), (0, 0))  # Not due yet
+
+        self.use_server(self.port)
+        message.next_attempt_at = datetime.now()
+        db.session.commit()
+        self.assertEqual(send_outbox(), (1, 0))
+        self.assertEqual((message.status, message.attempts), ("Sent", 2))
+
+        self.use_server(_free_port())
+        message = queue_email("Give up", ["giveup@example.com"], "<p>hi</p>")
+        message.attempts = MAIL_MAX_ATTEMPTS - 1
+        db.session.commit()
+        self.assertEqual(send_outbox(), (0, 1))
+        self.assertEqual(message.status, "Failed")
+
+    def test_background_sender_delivers_queued_mail(self):
+        current_app.config['MAIL_SEND_IN_BACKGROUND'] = True
+        queue_email("Background", ["background@example.com"], "<p>hi</p>")
+        deadline = time.monotonic() + 10
+        while not self.handler.messages and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertEqual([rcpt for _, rcpt in self.handler.messages], [["background@example.com"]])
+
 class BuildingIntegrationTests (unittest.TestCase):
 
     def test_create_building(self):
@@ -308,6 +510,31 @@ class AssigneeIntegrationTests(unittest.TestCase):
         updated = update_assignee(assignee.id, "Robert", "Jones", "bob@example.com", "R3")
         self.assertEqual(updated.fname, "Robert")
         self.assertEqual(updated.room_id, "R3")
+        self.assertEqual(updated.name_key, "robert jones")
+
+    def test_get_or_create_assignee_by_name(self):
+        create_assignee("Quill", "Marrow", "quill.marrow.placeholder@auto.generated")
+        create_assignee("Quill", "Marrow-Smith", "quill.marrow1.placeholder@auto.generated")
+        create_assignee("Quill", "Marrowby", "quill.marrow3.placeholder@auto.generated")
+
+        existing = get_or_create_assignee_by_name("  QUILL   marrow ")
+        self.assertEqual(existing.email, "quill.marrow.placeholder@auto.generated")
+        # A new name with the same placeholder base gets the first free suffix
+        created = get_or_create_assignee_by_name("Quill Marrow!")
+        self.assertEqual(created.email, "quill.marrow2.placeholder@auto.generated")
+        self.assertIsNone(get_or_create_assignee_by_name("   "))
+
+    def test_get_or_create_assignees_by_name(self):
+        create_assignee("Wren", "Ashdown", "wren@example.com")
+        assignees = get_or_create_assignees_by_name(["Wren Ashdown", "wren ashdown", "Ivo Pell", "Ivo  Pell", "Ivo-Pell", ""])
+        self.assertEqual(sorted(assignees), ["ivo pell", "ivo-pell", "wren ashdown"])
+        self.assertEqual(assignees["wren ashdown"].email, "wren@example.com")
+        self.assertEqual(assignees["ivo pell"].email, "ivo.pell.placeholder@auto.generated")
+        self.assertEqual(assignees["ivo-pell"].email, "ivopell.placeholder@auto.generated")
+        # Resolving again finds them instead of creating more
+        again = get_or_create_assignees_by_name(["Ivo Pell", "Ivo-Pell"])
+        self.assertEqual({key: a.id for key, a in again.items()},
+                         {key: assignees[key].id for key in ("ivo pell", "ivo-pell")})
 
 class AssetAssignmentIntegrationTests(unittest.TestCase):
     def test_create_asset_assignment(self):
@@ -646,6 +873,738 @@ class AssetIntegrationTests(unittest.TestCase):
         
         
     # def test_status_updated_with_location(self):
-        
-        
 
+
+class AssetViewIntegrationTests(unittest.TestCase):
+
+    def test_get_asset_views(self):
+        create_room("RV1", "F3", "View Room")
+        create_room("RV2", "F3", "Other Room")
+        assignee = create_assignee("View", "Tester", "view.tester@example.com", "RV1")
+        add_asset("V001", "Laptop", "XPS", "Dell", "SNV1", "RV1", "RV1", assignee.id, datetime.now(), None)
+        add_asset("V002", "Monitor", "P24", "Dell", "SNV2", "RV1", "RV2", 9999, datetime.now(), None)
+
+        views = {asset['id']: (asset, room_name, last_located_name, assignee_name)
+                 for asset, room_name, last_located_name, assignee_name in get_asset_views(room_id="RV1")}
+
+        self.assertEqual(set(views), {"V001", "V002"})
+        self.assertEqual(views["V001"][1:], ("View Room", "View Room", "View Tester"))
+        self.assertEqual(views["V002"][1:], ("View Room", "Other Room", None))
+        self.assertEqual(views["V002"][0], get_asset("V002").get_json())
+
+    def test_get_asset_views_status_filter(self):
+        ids = [asset['id'] for asset, _, _, _ in get_asset_views(room_id="RV1", statuses=["Misplaced"])]
+        self.assertEqual(ids, ["V002"])
+
+    def test_get_asset_views_page(self):
+        seen = []
+        cursor = None
+        while True:
+            views, cursor = get_asset_views_page(limit=1, cursor=cursor, room_id="RV1")
+            seen.extend(asset['id'] for asset, _, _, _ in views)
+            if cursor is None:
+                break
+        self.assertEqual(seen, ["V001", "V002"])
+
+    def test_get_asset_views_page_sorted_desc(self):
+        first, cursor = get_asset_views_page(limit=1, sort='last_update', descending=True, room_id="RV1")
+        second, end = get_asset_views_page(limit=1, cursor=cursor, sort='last_update', descending=True, room_id="RV1")
+        self.assertEqual([first[0][0]['id'], second[0][0]['id']], ["V002", "V001"])
+        self.assertIsNone(end)
+
+    def test_get_asset_views_page_invalid_cursor(self):
+        with self.assertRaises(ValueError):
+            get_asset_views_page(cursor="not-a-cursor")
+        _, cursor = get_asset_views_page(limit=1, room_id="RV1")
+        with self.assertRaises(ValueError):
+            get_asset_views_page(cursor=cursor, sort='status')
+
+    def test_get_asset_views_page_null_last_update(self):
+        create_room("RV3", "F3", "Undated Room")
+        add_asset("V003", "Dock", "WD19", "Dell", "SNV3", "RV3", "RV3", 9999, datetime(2026, 1, 1), None)
+        for asset_id in ("V004", "V005"):
+            add_asset(asset_id, "Dock", "WD19", "Dell", f"SN{asset_id}", "RV3", "RV3", 9999, None, None)
+        db.session.execute(db.update(Asset).where(Asset.id.in_(["V004", "V005"])).values(last_update=None))
+        db.session.commit()
+
+        for descending, expected in ((False, ["V004", "V005", "V003"]), (True, ["V003", "V005", "V004"])):
+            seen = []
+            cursor = None
+            while True:
+                views, cursor = get_asset_views_page(limit=1, cursor=cursor, sort='last_update', descending=descending, room_id="RV3")
+                seen.extend(asset['id'] for asset, _, _, _ in views)
+                if cursor is None:
+                    break
+            self.assertEqual(seen, expected)
+
+    def test_iter_asset_views(self):
+        self.assertEqual(list(iter_asset_views(room_id="RV1", batch_size=1)), get_asset_views(room_id="RV1"))
+
+    def test_iter_asset_report_rows(self):
+        rows = {row[0]: row for row in iter_asset_report_rows(statuses=["Misplaced"], batch_size=1)}
+        self.assertEqual(rows["V002"][2:5], ["Misplaced", "View Room", "Other Room"])
+        self.assertNotIn("V001", rows)
+
+    def test_stream_csv(self):
+        with current_app.test_request_context():
+            response = stream_csv(iter([[1, "a,b"], [2, None]]), "report.csv", preamble=[["Report"], ["id", "name"]], chunk_size=1)
+            chunks = list(response.response)
+        self.assertEqual(chunks[0], "Report\r\nid,name\r\n")
+        self.assertEqual("".join(chunks), 'Report\r\nid,name\r\n1,"a,b"\r\n2,\r\n')
+        self.assertIn('filename="report.csv"', response.headers['Content-Disposition'])
+
+    def test_stream_json_array(self):
+        items = [{'id': i, 'when': datetime(2025, 1, 1)} for i in range(5)]
+        with current_app.test_request_context():
+            response = stream_json_array(iter(items), chunk_size=2)
+            body = response.get_data()
+        self.assertEqual(json.loads(body), json.loads(current_app.json.dumps(items)))
+        with current_app.test_request_context():
+            self.assertEqual(stream_json_array(iter([])).get_data(), b'[]')
+
+
+class LocationCacheIntegrationTests(unittest.TestCase):
+
+    def _rename_room_in_db(self, room_id, room_name):
+        db.session.execute(db.update(Room).where(Room.room_id == room_id).values(room_name=room_name))
+
+    def test_writes_bump_location_version(self):
+        version = get_data_version(LOCATION_VERSION)
+        create_room("RC1", "F3", "Cached Room")
+        self.assertEqual(get_data_version(LOCATION_VERSION), version + 1)
+        self.assertEqual(get_room("RC1").room_name, "Cached Room")
+
+    def test_stale_cache_without_version_bump(self):
+        create_room("RC2", "F3", "Cached Room")
+        self.assertEqual(get_room("RC2").room_name, "Cached Room")
+        self._rename_room_in_db("RC2", "Silently Renamed")
+        db.session.commit()
+        self.assertEqual(get_room("RC2").room_name, "Cached Room")
+
+    def test_cache_reloads_after_version_bump(self):
+        create_room("RC3", "F3", "Cached Room")
+        self.assertEqual(get_room("RC3").room_name, "Cached Room")
+        # Another worker renames the room and bumps the version
+        self._rename_room_in_db("RC3", "Renamed Room")
+        bump_data_version(LOCATION_VERSION)
+        db.session.commit()
+        self.assertEqual(get_room("RC3").room_name, "Renamed Room")
+
+    def test_location_import_bumps_version_once(self):
+        version = get_data_version(LOCATION_VERSION)
+        results = upload_locations_csv(iter([
+            "building_id,building_name,floor_id,floor_name,room_id,room_name\n",
+            "BC1,Cache Building,,Cache Floor,RC4,Room 4\n",
+            "BC1,Cache Building,,Cache Floor,RC5,Room 5\n",
+        ]))
+        self.assertEqual((results['buildings_created'], results['floors_created'], results['rooms_created']), (1, 1, 2))
+        self.assertEqual(get_data_version(LOCATION_VERSION), version + 1)
+        self.assertEqual(get_room("RC5").floor_id, get_room("RC4").floor_id)
+
+
+class CsvImportIntegrationTests(unittest.TestCase):
+
+    def _write_csv(self, rows):
+        header = "Item,Asset Tag,Model,Brand,Serial Number,Location,Condition,Assignee\n"
+        handle, path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(handle, 'w') as file:
+            file.write(header + "\n".join(rows) + "\n")
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_upload_csv(self):
+        create_room("RI1", "F3", "Import Room")
+        path = self._write_csv([
+            "Laptop,I001,X1,Lenovo,SN1,RI1,Good,Import Person",
+            "Monitor,I002,P24,Dell,SN2,NOPE,Good,Import Person",
+            "Phone,I003,P7,Google,SN3,RI1,Missing,Import Person",
+            "Duplicate,I001,X1,Lenovo,SN1,RI1,Good,Import Person",
+            ",I004,X1,Lenovo,SN4,RI1,Good,Import Person",
+            "Tablet,I005,T1,Apple,SN5,RI1,Good,999999",
+        ])
+        results = upload_csv(path, batch_size=2)
+        self.assertTrue(results['success'])
+        self.assertEqual((results['total'], results['imported'], results['skipped']), (6, 3, 3))
+        self.assertEqual(get_asset("I001").status, "Good")
+        self.assertEqual(get_asset("I002").room_id, "UNKNOWN")
+        self.assertEqual(get_asset("I002").status, "Unassigned")
+        self.assertEqual(get_asset("I003").status, "Missing")
+        self.assertIsNone(get_asset("I005"))
+        # The new assignee is created once and shared by every row
+        self.assertEqual(len({get_asset(asset_id).assignee_id for asset_id in ("I001", "I002", "I003")}), 1)
+
+    def test_upload_csv_requires_a_known_assignee(self):
+        create_room("RI3", "F3", "Import Room")
+        assignee = create_assignee("Known", "Person", "known.person@example.com", "RI3")
+        path = self._write_csv([
+            f"Laptop,I301,X1,Lenovo,SN1,RI3,Good,{assignee.id}",
+            "Monitor,I302,P24,Dell,SN2,RI3,Good,",
+            "Phone,I303,P7,Google,SN3,RI3,Good,999999",
+        ])
+        results = upload_csv(path)
+        self.assertEqual((results['imported'], results['skipped']), (1, 2))
+        self.assertEqual(get_asset("I301").assignee_id, assignee.id)
+        self.assertEqual(results['errors'], [
+            "Row 3: Missing Assignee (required)",
+            "Row 4: Assignee '999999' not found, skipped."
+        ])
+
+    def test_upload_csv_missing_columns(self):
+        handle, path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(handle, 'w') as file:
+            file.write("Item,Asset Tag\nLaptop,I100\n")
+        self.addCleanup(os.remove, path)
+        results = upload_csv(path)
+        self.assertFalse(results['success'])
+        self.assertIn("Missing required columns", results['errors'][0])
+
+    def test_upload_csv_from_stream(self):
+        create_room("RI2", "F3", "Import Room")
+        data = "﻿Item,Asset Tag,Model,Brand,Serial Number,Location,Condition,Assignee\r\nLaptop,I200,X1,Lenovo,SN1,RI2,Good,Import Person\r\n"
+        stream = io.BytesIO(data.encode('utf-8'))
+        results = upload_csv(stream)
+        self.assertEqual(results['imported'], 1)
+        self.assertFalse(stream.closed)
+        results = upload_csv(["Item,Asset Tag,Model,Brand,Serial Number,Location,Condition,Assignee",
+                              b"Phone,I201,P7,Google,SN2,RI2,Good,Import Person"])
+        self.assertEqual(results['imported'], 1)
+        self.assertEqual(get_asset("I201").room_id, "RI2")
+
+
+class JobIntegrationTests(unittest.TestCase):
+
+    def test_asset_import_job(self):
+        create_room("RJ1", "F3", "Job Room")
+        data = ("Item,Asset Tag,Model,Brand,Serial Number,Location,Condition,Assignee\n"
+                "Laptop,J001,X1,Lenovo,SN1,RJ1,Good,Job Person\n"
+                ",J002,X1,Lenovo,SN2,RJ1,Good,Job Person\n")
+        upload = FileStorage(stream=io.BytesIO(data.encode('utf-8')), filename="assets.csv")
+        job, future = enqueue_csv_import('assets-csv', upload)
+        self.assertEqual(job.total, 2)
+        future.result(timeout=30)
+        db.session.expire_all()
+        job = get_job(job.id)
+        self.assertEqual(job.status, "Completed")
+        self.assertEqual(job.get_percent(), 100)
+        self.assertEqual((job.processed, job.skipped, job.error_count), (2, 1, 1))
+        self.assertEqual(job.result['imported'], 1)
+        errors = list(iter_job_errors(job.id))
+        self.assertIn("Missing Item description", errors[0]['message'])
+        self.assertEqual(list(iter_job_errors(job.id, after=errors[0]['id'])), [])
+        self.assertEqual(get_asset("J001").room_id, "RJ1")
+
+    def test_location_import_job(self):
+        handle, path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(handle, 'w') as file:
+            file.write("building_id,building_name,floor_id,floor_name,room_id,room_name\n"
+                       "BJ1,Job Building,FJ1,Job Floor,RJ2,Job Room 2\n"
+                       ",,,,,\n")
+        job = create_job('locations-csv', total=count_csv_rows(path))
+        run_job(job.id, path)
+        self.assertFalse(os.path.exists(path))
+        job = get_job(job.id)
+        self.assertEqual(job.status, "Completed")
+        self.assertEqual(job.result['rooms_created'], 1)
+        self.assertEqual(job.skipped, 1)
+        self.assertEqual(get_room("RJ2").floor_id, "FJ1")
+
+    def test_stale_jobs_are_failed(self):
+        # A process that has exited, on this host
+        exited = subprocess.Popen([sys.executable, "-c", ""])
+        exited.wait()
+        handle, path = tempfile.mkstemp(suffix=".csv")
+        os.close(handle)
+        stale = create_job('assets-csv', temp_path=path)
+        stale.runner = f"{socket.gethostname()}:{exited.pid}"
+        elsewhere = create_job('assets-csv')
+        elsewhere.runner = "another-host:1"
+        db.session.commit()
+
+        self.assertEqual(fail_stale_jobs(), 1)
+        self.assertEqual(get_job(stale.id).status, "Failed")
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(get_job(elsewhere.id).status, "Queued")
+        elsewhere.status = "Completed"
+        db.session.commit()
+
+    def test_jobs_are_only_shown_to_their_owner(self):
+        owner = create_user("jobowner@example.com", "jobowner", "jobpass")
+        create_user("jobother@example.com", "jobother", "jobpass")
+        job = create_job('assets-csv', user_id=owner.id)
+        job.status = "Completed"
+        db.session.commit()
+        client = current_app.test_client()
+        for email, expected in (("jobowner@example.com", 200), ("jobother@example.com", 404)):
+            headers = {'Authorization': f"Bearer {create_access_token(identity=email)}"}
+            self.assertEqual(client.get(f'/api/jobs/{job.id}', headers=headers).status_code, expected)
+            self.assertEqual(client.get(f'/api/jobs/{job.id}/errors', headers=headers).status_code, expected)
+
+
+class ScanEventIntegrationTests(unittest.TestCase):
+
+    def test_scans_in_the_same_second_are_all_kept(self):
+        create_room("RS1", "F3", "Scan Room")
+        add_asset("S001", "Scanner", "M1", "Brand", "SN1", "RS1", "RS1", 1, datetime.now(), None)
+        scans = [add_scan_event("S001", 1, "RS1", "Good") for _ in range(5)]
+        self.assertTrue(all(scans))
+        self.assertEqual(len({scan.scan_id for scan in scans}), 5)
+
+    def test_scan_history_pages(self):
+        create_room("RH1", "F3", "History Room")
+        add_asset("S003", "Scanner", "M1", "Brand", "SN3", "RH1", "RH1", 1, datetime.now(), None)
+        # Same scan time for every event, so only scan_id orders them
+        add_scan_events_bulk([{'asset_id': "S003", 'user_id': 1, 'room_id': "RH1", 'status': "Good",
+                               'notes': str(i), 'scan_time': datetime(2025, 1, 1)} for i in range(5)])
+        db.session.commit()
+
+        pages, cursor = [], None
+        while True:
+            events, cursor = get_scan_history_page("S003", limit=2, cursor=cursor)
+            pages.append([event['notes'] for event in events])
+            if not cursor:
+                break
+        self.assertEqual(pages, [["4", "3"], ["2", "1"], ["0"]])
+        self.assertEqual(events[0]['room_name'], "History Room")
+        with self.assertRaises(ValueError):
+            get_scan_history_page("S003", cursor="not-a-cursor")
+
+    def test_add_scan_events_bulk_joins_the_callers_transaction(self):
+        create_room("RS2", "F3", "Scan Room")
+        add_asset("S002", "Scanner", "M1", "Brand", "SN2", "RS2", "RS2", 1, datetime.now(), None)
+        events = [{'asset_id': "S002", 'user_id': 1, 'room_id': "RS2", 'status': "Good"} for _ in range(3)]
+        self.assertEqual(add_scan_events_bulk(events), 3)
+        db.session.rollback()
+        self.assertEqual(get_scans_by_asset("S002"), [])
+        add_scan_events_bulk(events)
+        db.session.commit()
+        self.assertEqual(len(get_scans_by_asset("S002")), 3)
+
+    def test_scan_event_text_fits_its_columns(self):
+        create_room("RS5", "F3", "Scan Room")
+        add_asset("S004", "Scanner", "M1", "Brand", "SN4", "RS5", "RS5", 1, datetime.now(), None)
+        single = add_scan_event("S004", 1, "RS5", "Good", notes="n" * 500)
+        add_scan_events_bulk([{'asset_id': "S004", 'user_id': 1, 'room_id': "RS5", 'status': "Good", 'notes': "n" * 500}])
+        db.session.commit()
+        bulk = next(scan for scan in get_scans_by_asset("S004") if scan.scan_id != single.scan_id)
+        self.assertEqual(len(single.notes), ScanEvent.notes.type.length)
+        self.assertEqual((bulk.notes, bulk.changeLog), (single.notes, single.changeLog))
+
+    def test_bulk_actions_record_one_scan_per_asset(self):
+        create_room("RS3", "F3", "Scan Room")
+        create_room("RS4", "F3", "Other Scan Room")
+        asset_ids = [f"S1{i:02d}" for i in range(20)]
+        for asset_id in asset_ids:
+            add_asset(asset_id, "Scanner", "M1", "Brand", "SN", "RS3", "RS3", 1, datetime.now(), None)
+
+        processed, errors, _ = mark_assets_missing(asset_ids, user_id=1)
+        self.assertEqual((processed, errors), (20, 0))
+        processed, errors, _ = bulk_mark_assets_found(asset_ids, 1)
+        self.assertEqual((processed, errors), (20, 0))
+        processed, errors, _ = bulk_relocate_assets(asset_ids, "RS4", 1, notes="moved")
+        self.assertEqual((processed, errors), (20, 0))
+
+        scans = get_scans_by_asset(asset_ids[0])
+        self.assertEqual(len(scans), 3)
+        self.assertEqual(get_asset(asset_ids[0]).room_id, "RS4")
+        self.assertTrue(all(len(scan.notes) <= 120 for scan in scans))
+
+    def test_archived_scans_stay_in_history(self):
+        create_room("RR1", "F3", "Retention Room")
+        add_asset("S004", "Scanner", "M1", "Brand", "SN4", "RR1", "RR1", 1, datetime.now(), None)
+        add_scan_events_bulk([{'asset_id': "S004", 'user_id': 1, 'room_id': "RR1", 'status': "Good",
+                               'notes': f"old{i}", 'scan_time': datetime(2019, 1, 1, 0, i)} for i in range(3)])
+        add_scan_events_bulk([{'asset_id': "S004", 'user_id': 1, 'room_id': "RR1", 'status': "Good",
+                               'notes': f"new{i}", 'scan_time': datetime(2030, 1, 1, 0, i)} for i in range(2)])
+        db.session.commit()
+
+        self.assertEqual(archive_scan_events(before=datetime(2020, 1, 1), batch_size=2), 3)
+        self.assertEqual(archive_scan_events(before=datetime(2020, 1, 1)), 0)
+        self.assertEqual(len(get_scans_by_asset("S004")), 2)
+
+        pages, cursor = [], None
+        while True:
+            events, cursor = get_scan_history_page("S004", limit=2, cursor=cursor)
+            pages.append([(event['notes'], event['archived']) for event in events])
+            if not cursor:
+                break
+        self.assertEqual(pages, [[("new1", False), ("new0", False)],
+                                 [("old2", True), ("old1", True)],
+                                 [("old0", True)]])
+        events, cursor = get_scan_history_page("S004", include_archived=False)
+        self.assertEqual((len(events), cursor), (2, None))
+
+        delete_asset("S004")
+        self.assertEqual(ScanEventArchive.query.filter_by(asset_id="S004").count(), 0)
+
+    def test_scan_retention_cutoff(self):
+        now = datetime(2026, 1, 1)
+        days = current_app.config['SCAN_EVENT_RETENTION_DAYS']
+        self.assertEqual((now - get_scan_retention_cutoff(now=now)).days, days)
+        self.assertEqual(get_scan_retention_cutoff(30, now=now), datetime(2025, 12, 2))
+
+
+
+class AssetSearchIntegrationTests(unittest.TestCase):
+
+    def test_search_ranks_and_pages(self):
+        create_room("RQ1", "F3", "Search Room")
+        add_asset("Q001", "Zephyrx Latitude laptop", "Latitude 7420", "Zephyrx", "5CG1234XYZ", "RQ1", "RQ1", 1, datetime.now(), None)
+        add_asset("Q002", "Zephyrx OptiPlex desktop", "OptiPlex 7090", "Zephyrx", "7QX9876", "RQ1", "RQ1", 1, datetime.now(), None)
+        add_asset("Q003", "Quasarline monitor", "P2419", "Zephyrx", "CN0001", "RQ1", "RQ1", 1, datetime.now(), "spare for zephyrx latitude")
+
+        def ids(query, **kwargs):
+            return [view[0]['id'] for view in search_assets(query, **kwargs)[0]]
+
+        self.assertEqual(ids("zephyrx latitude 7420"), ["Q001"])
+        self.assertEqual(ids("5CG12"), ["Q001"])
+        self.assertEqual(ids("q002"), ["Q002"])
+        # A model match outranks one in the notes
+        self.assertEqual(ids("zephyrx latitude"), ["Q001", "Q003"])
+        self.assertEqual(ids("!!"), [])
+
+        pages, cursor = [], None
+        while True:
+            views, cursor = search_assets("zephyrx", limit=2, cursor=cursor)
+            pages.append([view[0]['id'] for view in views])
+            if not cursor:
+                break
+        self.assertEqual(sorted(sum(pages, [])), ["Q001", "Q002", "Q003"])
+        self.assertEqual([len(page) for page in pages], [2, 1])
+        with self.assertRaises(ValueError):
+            search_assets("zephyrx", cursor="not-a-cursor")
+
+        # The index follows inserts, updates and deletes
+        update_asset_details("Q002", "Zephyrx Precision desktop", "Precision 3660", "Zephyrx", "7QX9876", 1, None)
+        self.assertEqual(ids("precision"), ["Q002"])
+        self.assertEqual(ids("optiplex 7090"), [])
+        mark_asset_lost("Q001", 1)
+        self.assertEqual(ids("zephyrx", statuses=["Lost"]), ["Q001"])
+        delete_asset("Q003")
+        self.assertEqual(ids("quasarline"), [])
+
+
+
+class QueryPlanIntegrationTests(unittest.TestCase):
+
+    def _plan(self, query):
+        sql = str(query.statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+        if db.engine.dialect.name == 'postgresql':
+            # Tiny test tables would otherwise always be sequentially scanned
+            db.session.execute(db.text("SET LOCAL enable_seqscan = off"))
+            plan = [row[0] for row in db.session.execute(db.text("EXPLAIN " + sql))]
+        else:
+            plan = [row[3] for row in db.session.execute(db.text("EXPLAIN QUERY PLAN " + sql))]
+        db.session.rollback()
+        return "\n".join(plan)
+
+    def assertUsesIndex(self, query, index_name):
+        plan = self._plan(query)
+        self.assertIn(index_name, plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_asset_lookups_use_indexes(self):
+        self.assertUsesIndex(Asset.query.filter_by(status="Missing"), "ix_asset_status")
+        self.assertUsesIndex(Asset.query.filter(Asset.status.in_(["Missing", "Misplaced"])), "ix_asset_status")
+        self.assertUsesIndex(Asset.query.filter_by(room_id="R1"), "ix_asset_room_id")
+
+    def test_scan_history_uses_indexes(self):
+        self.assertUsesIndex(ScanEvent.query.filter_by(asset_id="A1").order_by(ScanEvent.scan_time.desc()),
+                             "ix_scan_event_asset_id_scan_time")
+        self.assertUsesIndex(ScanEvent.query.filter_by(asset_id="A1")
+                             .order_by(ScanEvent.scan_time.desc(), ScanEvent.scan_id.desc()),
+                             "ix_scan_event_asset_id_scan_time")
+        self.assertUsesIndex(ScanEvent.query.filter_by(room_id="R1").order_by(ScanEvent.scan_time.desc()),
+                             "ix_scan_event_room_id_scan_time")
+        self.assertUsesIndex(ScanEvent.query.order_by(ScanEvent.scan_time.desc()).limit(50), "ix_scan_event_scan_time")
+        self.assertUsesIndex(ScanEventArchive.query.filter_by(asset_id="A1")
+                             .order_by(ScanEventArchive.scan_time.desc(), ScanEventArchive.scan_id.desc()),
+                             "ix_scan_event_archive_asset_id_scan_time")
+
+    def test_assignee_lookups_use_indexes(self):
+        self.assertUsesIndex(Assignee.query.filter(db.func.lower(Assignee.email) == "a@b.com"), "ix_assignee_lower_email")
+        self.assertUsesIndex(Assignee.query.filter(Assignee.name_key.in_(["jane doe", "john doe"])), "ix_assignee_name_key")
+
+
+class MarkAssetsMissingIntegrationTests(unittest.TestCase):
+
+    def test_mark_assets_missing_rules(self):
+        create_room("RM1", "F3", "Audit Room")
+        now = datetime.now()
+        old = datetime(2020, 1, 1)
+        for asset_id, status, last_update in [("M001", "Good", now), ("M002", "Lost", old),
+                                              ("M003", "Misplaced", now), ("M004", "Misplaced", old)]:
+            add_asset(asset_id, "Audited", "M1", "Brand", "SN", "RM1", "RM1", 1, last_update, None)
+            db.session.execute(db.update(Asset).where(Asset.id == asset_id).values(status=status, last_update=last_update))
+        db.session.commit()
+
+        processed, error_count, errors = mark_assets_missing(["M001", "M002", "M003", "M004", "M999"], user_id=1)
+        self.assertEqual((processed, error_count), (2, 3))
+        self.assertEqual(errors, ["Asset M002 already Lost.", "Asset M003 recently misplaced.", "Asset M999 not found."])
+        self.assertEqual([get_asset(asset_id).status for asset_id in ("M001", "M002", "M003", "M004")],
+                         ["Missing", "Lost", "Misplaced", "Missing"])
+        self.assertIn("Previously misplaced for over 30 days", get_scans_by_asset("M004")[0].notes)
+        self.assertEqual(get_scans_by_asset("M002"), [])
+
+
+class AuditSessionIntegrationTests(unittest.TestCase):
+
+    def setUp(self):
+        if not get_room("RA1"):
+            create_floor("FA1", "B1", "Audit Floor")
+            create_floor("FA2", "B1", "Other Audit Floor")
+            create_room("RA1", "FA1", "Audit Room A")
+            create_room("RA2", "FA1", "Audit Room B")
+            create_room("RA3", "FA2", "Elsewhere")
+
+    def _add_assets(self, room_id, asset_ids):
+        for asset_id in asset_ids:
+            add_asset(asset_id, "Audited", "M1", "Brand", "SN", room_id, room_id, 1, datetime.now(), None)
+
+    def test_room_audit_reconciles_and_completes(self):
+        self._add_assets("RA1", ["AS1", "AS2", "AS3"])
+        self._add_assets("RA3", ["AS4"])
+        session, resumed = start_audit_session("room", "RA1", user_id=1)
+        self.assertFalse(resumed)
+
+        results = add_audit_scans(session.id, ["AS1", "AS4", "NOPE", "AS1"])
+        self.assertEqual([r['result'] for r in results], ["found", "misplaced", "unknown"])
+        self.assertEqual(add_audit_scans(session.id, ["AS1"])[0]['duplicate'], True)
+        add_audit_scans(session.id, ["AS2"])
+        self.assertTrue(remove_audit_scan(session.id, "AS2"))
+
+        # A refresh resumes the same session
+        self.assertEqual(start_audit_session("room", "RA1", user_id=1), (session, True))
+
+        summary = reconcile_audit_session(session)
+        self.assertEqual((summary['found'], summary['misplaced'], summary['unknown']), (["AS1"], ["AS4"], ["NOPE"]))
+        self.assertEqual(summary['missing'], ["AS2", "AS3"])
+
+        summary = complete_audit_session(session.id, user_id=1)
+        self.assertEqual(summary['result']['marked_missing'], 2)
+        self.assertEqual([get_asset(asset_id).status for asset_id in ("AS1", "AS2", "AS3", "AS4")],
+                         ["Good", "Missing", "Missing", "Misplaced"])
+        self.assertEqual(get_asset("AS4").last_located, "RA1")
+        self.assertEqual(len(get_scans_by_asset("AS4")), 1)
+        self.assertEqual(get_audit_session(session.id).status, "Completed")
+        self.assertIsNone(add_audit_scans(session.id, ["AS3"]))
+
+    def test_floor_audit_and_cancel(self):
+        self._add_assets("RA2", ["AS5", "AS6"])
+        session, _ = start_audit_session("floor", "FA1", user_id=1)
+        self.assertIsNone(add_audit_scans(session.id, ["AS5"]))  # Floor audits need a room
+        self.assertIsNone(add_audit_scans(session.id, ["AS5"], room_id="RA3"))  # Outside the scope
+        self.assertEqual(add_audit_scans(session.id, ["AS5"], room_id="RA1")[0]['result'], "misplaced")
+        self.assertIn("AS6", reconcile_audit_session(session)['missing'])
+        cancel_audit_session(session.id)
+        self.assertIsNone(complete_audit_session(session.id))
+        self.assertEqual(get_asset("AS6").status, "Good")
+        self.assertEqual(start_audit_session("building", "NOPE"), (None, False))
+
+    def test_sessions_are_only_open_to_their_owner(self):
+        owner = create_user("auditowner@example.com", "auditowner", "auditpass")
+        create_user("auditother@example.com", "auditother", "auditpass")
+        session, _ = start_audit_session("room", "RA2", user_id=owner.id)
+        client = current_app.test_client()
+        other = {'Authorization': f"Bearer {create_access_token(identity='auditother@example.com')}"}
+        self.assertEqual(client.get(f'/api/audit-sessions/{session.id}', headers=other).status_code, 404)
+        self.assertEqual(client.post(f'/api/audit-sessions/{session.id}/cancel', headers=other).status_code, 404)
+        owned = {'Authorization': f"Bearer {create_access_token(identity='auditowner@example.com')}"}
+        self.assertEqual(client.get(f'/api/audit-sessions/{session.id}', headers=owned).status_code, 200)
+        self.assertEqual(client.post(f'/api/audit-sessions/{session.id}/cancel', headers=owned).status_code, 200)
+
+
+class ScanBatchIntegrationTests(unittest.TestCase):
+
+    def test_ingest_scan_batch_is_idempotent(self):
+        create_room("RB1", "F1", "Batch Room")
+        add_asset("SB1", "Batched", "M1", "Brand", "SN", "RB1", "RB1", 1, datetime.now(), None)
+        add_asset("SB2", "Batched", "M1", "Brand", "SN", "R1", "R1", 1, datetime.now(), None)
+        batch = [
+            {'key': "k1", 'assetId': "SB1", 'roomId': "RB1", 'scannedAt': "2026-01-05T10:00:00"},
+            {'key': "k2", 'assetId': "SB2", 'roomId': "RB1"},
+            {'key': "k3", 'assetId': "NOPE", 'roomId': "RB1"},
+            {'key': "k1", 'assetId': "SB1", 'roomId': "RB1"},
+            {'assetId': "SB1", 'roomId': "RB1"},
+        ]
+        results = ingest_scan_batch(batch, 1)
+        self.assertEqual([(r['result'], r['duplicate']) for r in results], [
+            ("Good", False), ("Misplaced", False), ("unknown", False), ("Good", True), ("invalid", False)
+        ])
+        self.assertEqual((get_asset("SB2").status, get_asset("SB2").last_located), ("Misplaced", "RB1"))
+        self.assertEqual(get_scans_by_asset("SB1")[0].scan_time, datetime(2026, 1, 5, 10, 0))
+
+        # Resending the batch changes nothing
+        results = ingest_scan_batch(batch[:4], 1)
+        self.assertTrue(all(r['duplicate'] for r in results))
+        self.assertEqual([r['result'] for r in results], ["Good", "Misplaced", "unknown", "Good"])
+        self.assertEqual(len(get_scans_by_asset("SB1")), 1)
+        self.assertEqual(len(get_scans_by_asset("SB2")), 1)
+
+    def test_ingest_scan_batch_clamps_future_scan_time(self):
+        create_room("RB2", "F1", "Future Room")
+        add_asset("SB3", "Batched", "M1", "Brand", "SN", "RB2", "RB2", 1, datetime.now(), None)
+        ingest_scan_batch([{'key': "future-1", 'assetId': "SB3", 'roomId': "RB2", 'scannedAt': "2099-01-01T00:00:00"}], 1)
+        self.assertLessEqual(get_scans_by_asset("SB3")[0].scan_time, datetime.now())
+
+
+class LocationStatsIntegrationTests(unittest.TestCase):
+
+    def test_location_status_counts_roll_up(self):
+        create_building("BS", "Stats Building")
+        create_floor("FS1", "BS", "Stats Floor 1")
+        create_floor("FS2", "BS", "Stats Floor 2")
+        create_room("RT1", "FS1", "Stats Room 1")
+        create_room("RT2", "FS1", "Stats Room 2")
+        create_room("RT3", "FS2", "Empty Room")
+        for asset_id, room_id in [("ST1", "RT1"), ("ST2", "RT1"), ("ST3", "RT2")]:
+            add_asset(asset_id, "Counted", "M1", "Brand", "SN", room_id, room_id, 1, datetime.now(), None)
+        update_asset_location("ST2", "RT2", 1)
+
+        summary = get_location_status_counts("building", "BS")
+        self.assertEqual((summary['total'], summary['counts']), (3, {'Good': 2, 'Misplaced': 1}))
+        building = summary['buildings'][0]
+        self.assertEqual([floor['total'] for floor in building['floors']], [3, 0])
+        self.assertEqual([(room['room_id'], room['counts']) for room in building['floors'][0]['rooms']],
+                         [("RT1", {'Good': 1, 'Misplaced': 1}), ("RT2", {'Good': 1})])
+        self.assertEqual(building['floors'][1]['rooms'][0]['total'], 0)
+
+        self.assertEqual(get_location_status_counts("room", "RT2")['total'], 1)
+        self.assertIsNone(get_location_status_counts("floor", "NOPE"))
+        self.assertGreaterEqual(get_location_status_counts()['total'], 3)
+
+
+class StatusCountIntegrationTests(unittest.TestCase):
+
+    def setUp(self):
+        # Other tests change assets with raw statements that skip the counts
+        rebuild_status_counts()
+
+    def assertCountsMatchAssets(self):
+        self.assertEqual(sorted(get_status_counts()), sorted(aggregate_status_counts()))
+
+    def test_writes_keep_status_counts_in_step(self):
+        create_room("RN1", "F1", "Count Room 1")
+        create_room("RN2", "F1", "Count Room 2")
+        for asset_id in ("SC1", "SC2", "SC3", "SC4"):
+            add_asset(asset_id, "Counted", "M1", "Brand", "SN", "RN1", "RN1", 1, datetime.now(), None)
+        add_asset("SC5", "Counted", "M1", "Brand", "SN", "NO-ROOM", "NO-ROOM", 1, datetime.now(), None)
+        self.assertCountsMatchAssets()
+
+        update_asset_location("SC1", "RN2", 1)
+        mark_asset_lost("SC2", 1)
+        mark_assets_missing(["SC3", "SC4"], 1)
+        mark_asset_found("SC3", 1)
+        bulk_relocate_assets(["SC4"], "RN2", 1)
+        bulk_mark_assets_found(["SC1"], 1)
+        ingest_scan_batch([{'key': "count-1", 'assetId': "SC4", 'roomId': "RN1"}], 1)
+        delete_asset("SC5")
+        self.assertCountsMatchAssets()
+        self.assertIn(("RN2", "Misplaced", 1), get_status_counts(["RN2"]))
+
+    def test_rebuild_reports_drift(self):
+        create_room("RN3", "F1", "Count Room 3")
+        add_asset("SC6", "Counted", "M1", "Brand", "SN", "RN3", "RN3", 1, datetime.now(), None)
+        db.session.execute(db.update(Asset).where(Asset.id == "SC6").values(status="Lost"))
+        db.session.commit()
+        drift = rebuild_status_counts()
+        self.assertIn(("RN3", "Good", 1, 0), drift)
+        self.assertIn(("RN3", "Lost", 0, 1), drift)
+        self.assertCountsMatchAssets()
+        self.assertEqual(rebuild_status_counts(), [])
+
+class VersionedEtagIntegrationTests(unittest.TestCase):
+
+    def test_unchanged_resources_return_304(self):
+        create_user("etag@example.com", "etag", "etagpass")
+        headers = {'Authorization': f"Bearer {create_access_token(identity='etag@example.com')}"}
+        client = current_app.test_client()
+
+        def get(url, etag=None):
+            return client.get(url, headers=dict(headers, **({'If-None-Match': etag} if etag else {})))
+
+        first = get('/api/buildings')
+        etag = first.headers['ETag']
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.headers['Cache-Control'], 'private, no-cache')
+        unchanged = get('/api/buildings', etag)
+        self.assertEqual((unchanged.status_code, unchanged.data), (304, b''))
+        self.assertEqual(get('/api/rooms/all', get('/api/rooms/all').headers['ETag']).status_code, 304)
+
+        create_room("RE1", "F3", "Etag Room")
+        changed = get('/api/buildings', etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers['ETag'], etag)
+
+        # The asset list follows asset, assignee and location writes
+        assignee = create_assignee("Etag", "Person", "etag.person@example.com", "RE1")
+        add_asset("E001", "Etag laptop", "Model", "Brand", "SNE001", "RE1", "RE1", assignee.id, datetime.now(), None)
+        etag = get('/api/assets?room_id=RE1&limit=10').headers['ETag']
+        statements = []
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+        db.event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            self.assertEqual(get('/api/assets?room_id=RE1&limit=10', etag).status_code, 304)
+        finally:
+            db.event.remove(db.engine, 'before_cursor_execute', record)
+        self.assertFalse([statement for statement in statements if re.search(r'FROM asset\b', statement)])
+
+        for write in (
+            lambda: update_asset_details("E001", "Etag laptop 2", "Model", "Brand", "SNE001", assignee.id, None),
+            lambda: update_assignee(assignee.id, "Etag", "Renamed", "etag.person@example.com", "RE1"),
+            lambda: ingest_scan_batch([{'key': 'etag-1', 'assetId': "E001", 'roomId': "RE1"}], 1),
+        ):
+            write()
+            response = get('/api/assets?room_id=RE1&limit=10', etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response.headers['ETag'], etag)
+            etag = response.headers['ETag']
+        self.assertEqual(response.json['assets'][0]['assignee_name'], "Etag Renamed")
+
+class CompressionIntegrationTests(unittest.TestCase):
+
+    def setUp(self):
+        create_user("gzip@example.com", "gzip", "gzippass")
+        self.headers = {'Authorization': f"Bearer {create_access_token(identity='gzip@example.com')}"}
+        self.client = current_app.test_client()
+        reset_compression_stats()
+
+    def get(self, url, encoding=None):
+        return self.client.get(url, headers=dict(self.headers, **({'Accept-Encoding': encoding} if encoding else {})))
+
+    def test_json_and_csv_are_gzipped(self):
+        for i in range(20):
+            add_asset(f"Z{i:03}", "Gzip test laptop", "Model", "Brand", f"SNZ{i}", "RE1", "RE1", 1, datetime.now(), None)
+
+        # Streamed JSON array and CSV download
+        for url in ('/api/assets', '/api/assets/download'):
+            plain = self.get(url)
+            zipped = self.get(url, 'gzip, deflate')
+            self.assertNotIn('Content-Encoding', plain.headers)
+            self.assertEqual(zipped.headers['Content-Encoding'], 'gzip')
+            self.assertIn('Accept-Encoding', zipped.headers['Vary'])
+            self.assertLess(len(zipped.data), len(plain.data))
+            # The CSV preamble carries the time, so compare from the header row on
+            body = gzip.decompress(zipped.data)
+            self.assertEqual(body.split(b'Asset ID', 1)[-1], plain.data.split(b'Asset ID', 1)[-1])
+
+        # A buffered page above the threshold, and a small response below it
+        page = self.get('/api/assets?limit=50', 'gzip')
+        self.assertEqual(page.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(page.data)), self.get('/api/assets?limit=50').json)
+        small = self.get('/api/identify', 'gzip')
+        self.assertLess(len(small.data), COMPRESSION_MIN_SIZE)
+        self.assertNotIn('Content-Encoding', small.headers)
+        self.assertNotIn('Content-Encoding', self.get('/api/assets', 'gzip;q=0').headers)
+
+        stats = get_compression_stats()
+        self.assertEqual(stats['inventory_views.get_assets']['responses'], 2)
+        self.assertLess(stats['inventory_views.get_assets']['ratio'], 0.5)
+        self.assertIn('inventory_views.download_inventory', stats)
+
+    @unittest.skipIf(brotli is None, "brotli is not installed")
+    def test_brotli_is_preferred_when_accepted(self):
+        response = self.get('/api/assets', 'gzip, br')
+        self.assertEqual(response.headers['Content-Encoding'], 'br')
+        self.assertEqual(json.loads(brotli.decompress(response.data)), self.get('/api/assets').json)
+        self.assertEqual(self.get('/api/assets', 'gzip;q=1, br;q=0.5').headers['Content-Encoding'], 'gzip')
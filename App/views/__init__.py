@@ -8,7 +8,9 @@ from .admin import setup_admin
 from .inventory import inventory_views
 from .discrepancy import discrepancy_views
 from .settings import settings_views
+from .job import job_views
+from .stats import stats_views
 
 
-views = [user_views, index_views, auth_views, inventory_views, audit_views, discrepancy_views, settings_views] 
+views = [user_views, index_views, auth_views, inventory_views, audit_views, discrepancy_views, settings_views, job_views, stats_views] 
 # blueprints must be added to this list
\ No newline at end of file
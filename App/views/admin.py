@@ -2,6 +2,7 @@ from flask_admin.contrib.sqla import ModelView
 from flask_jwt_extended import jwt_required, current_user, unset_jwt_cookies, set_access_cookies
 from flask_admin import Admin
 from App.models import db, User
+from App.controllers.user_cache import touch_user_version
 
 class AdminView(ModelView):
 
@@ -9,6 +10,15 @@ class AdminView(ModelView):
     def is_accessible(self):
         return current_user is not None
 
+    # Both run before Flask-Admin commits, so other workers drop cached users with the change
+    def on_model_change(self, form, model, is_created):
+        if isinstance(model, User):
+            touch_user_version()
+
+    def on_model_delete(self, model):
+        if isinstance(model, User):
+            touch_user_version()
+
     def inaccessible_callback(self, name, **kwargs):
         # redirect to login page if user doesn't have access
         flash("Login to access admin")
@@ -6,11 +6,26 @@ from App.controllers.room import get_rooms_by_floor, get_room
 from App.controllers.asset import (
     get_all_assets, 
     get_all_assets_by_room_json, 
+    get_asset_views,
     get_asset, 
     update_asset_location,
     mark_assets_missing
 )
 from App.controllers.assignee import get_assignee_by_id
+from App.controllers.scan_batch import MAX_SCAN_BATCH, ingest_scan_batch
+from App.controllers.location_cache import LOCATION_VERSION
+from App.views.caching import versioned
+from App.controllers.audit_session import (
+    AUDIT_SCOPES,
+    start_audit_session,
+    get_audit_session,
+    get_audit_scan_results,
+    add_audit_scans,
+    remove_audit_scan,
+    reconcile_audit_session,
+    complete_audit_session,
+    cancel_audit_session
+)
 
 audit_views = Blueprint('audit_views', __name__, template_folder='../templates')
 
@@ -23,6 +38,7 @@ def audit_page():
 
 @audit_views.route('/api/floors/<building_id>')
 @jwt_required()
+@versioned(LOCATION_VERSION)
 def get_floors(building_id):
     """Get all floors for a given building"""
     floors = get_floors_by_building(building_id)
@@ -36,6 +52,7 @@ def get_floors(building_id):
 
 @audit_views.route('/api/rooms/<floor_id>')
 @jwt_required()
+@versioned(LOCATION_VERSION)
 def get_rooms(floor_id):
     """Get all rooms for a given floor"""
     rooms = get_rooms_by_floor(floor_id)
@@ -52,32 +69,20 @@ def get_rooms(floor_id):
 def get_room_assets(room_id):
     """Get all assets for a given room"""
     try:
-        # Get assets for the room
-        room_assets = get_all_assets_by_room_json(room_id)
-        
-        # Enhance the assets with room name and assignee information
-        for asset in room_assets:
+        room_assets = []
+        for asset, room_name, last_located_name, assignee_name in get_asset_views(room_id=room_id):
             # Add room names where possible
-            if 'room_id' in asset:
-                room = get_room(asset['room_id'])
-                if room:
-                    asset['room_name'] = room.room_name
-            
-            if 'last_located' in asset:
-                last_room = get_room(asset['last_located'])
-                if last_room:
-                    asset['last_located_name'] = last_room.room_name
-            
-            # Add assignee name information - THIS IS THE FIX
+            if room_name is not None:
+                asset['room_name'] = room_name
+            if last_located_name is not None:
+                asset['last_located_name'] = last_located_name
+
             if asset.get('assignee_id'):
-                assignee = get_assignee_by_id(asset['assignee_id'])
-                if assignee:
-                    asset['assignee_name'] = str(assignee)  # Use __str__
-                else:
-                    asset['assignee_name'] = f"Assignee ID: {asset['assignee_id']}"
+                asset['assignee_name'] = assignee_name if assignee_name is not None else f"Assignee ID: {asset['assignee_id']}"
             else:
                 asset['assignee_name'] = "Unassigned"
-        
+            room_assets.append(asset)
+
         return jsonify(room_assets)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -203,4 +208,134 @@ def update_location():
         'success': True,
         'message': 'Asset location updated',
         'asset': asset_json
-    })
\ No newline at end of file
+    })
+
+@audit_views.route('/api/scans/batch', methods=['POST'])
+@jwt_required()
+def ingest_scans():
+    """Apply buffered scanner reads: {scans: [{key, assetId, roomId, scannedAt?}, ...]}
+
+    Records whose key was already accepted are reported as duplicates and not
+    applied again, so a failed request can simply be resent.
+    """
+    data = request.get_json(silent=True) or {}
+    scans = data.get('scans')
+    if not isinstance(scans, list):
+        return jsonify({'success': False, 'message': 'scans must be a list'}), 400
+    if len(scans) > MAX_SCAN_BATCH:
+        return jsonify({'success': False, 'message': f'At most {MAX_SCAN_BATCH} scans per batch'}), 413
+
+    results = ingest_scan_batch(scans, current_user.id)
+    if results is None:
+        return jsonify({'success': False, 'message': 'Failed to record scans'}), 500
+
+    return jsonify({
+        'success': True,
+        'applied': sum(1 for r in results if not r['duplicate'] and r['result'] != "invalid"),
+        'duplicates': sum(1 for r in results if r['duplicate']),
+        'invalid': sum(1 for r in results if r['result'] == "invalid"),
+        'results': results
+    })
+
+# --- Audit sessions: scans are kept on the server and reconciled in one pass ---
+
+def _get_own_audit_session(session_id):
+    # Another user's session is reported as not found, like a missing one
+    session = get_audit_session(session_id)
+    if session and session.user_id == current_user.id:
+        return session
+    return None
+
+@audit_views.route('/api/audit-sessions', methods=['POST'])
+@jwt_required()
+def start_audit():
+    """Start an audit session for a room, floor or building (resumes the user's active one)"""
+    data = request.json or {}
+    scope_type = data.get('scopeType', 'room')
+    scope_id = data.get('scopeId')
+    if scope_type not in AUDIT_SCOPES or not scope_id:
+        return jsonify({'success': False, 'message': f'scopeType must be one of {", ".join(AUDIT_SCOPES)} and scopeId is required'}), 400
+
+    session, resumed = start_audit_session(scope_type, scope_id, current_user.id)
+    if not session:
+        return jsonify({'success': False, 'message': f'{scope_type.capitalize()} {scope_id} not found'}), 404
+
+    return jsonify({
+        'success': True,
+        'resumed': resumed,
+        'session': session.get_json(),
+        'scans': get_audit_scan_results(session.id) if resumed else []
+    }), 200 if resumed else 201
+
+@audit_views.route('/api/audit-sessions/<int:session_id>', methods=['GET'])
+@jwt_required()
+def get_audit(session_id):
+    """Get an audit session with its scans and the current reconciliation"""
+    session = _get_own_audit_session(session_id)
+    if not session:
+        return jsonify({'success': False, 'message': 'Audit session not found'}), 404
+
+    summary = reconcile_audit_session(session)
+    summary.pop('scans')
+    return jsonify({
+        'success': True,
+        'session': session.get_json(),
+        'scans': get_audit_scan_results(session_id),
+        'reconciliation': summary
+    })
+
+@audit_views.route('/api/audit-sessions/<int:session_id>/scans', methods=['POST'])
+@jwt_required()
+def add_audit_scan(session_id):
+    """Record one or more scanned tags in an audit session"""
+    if not _get_own_audit_session(session_id):
+        return jsonify({'success': False, 'message': 'Audit session not found'}), 404
+    data = request.json or {}
+    asset_ids = data.get('assetIds')
+    if not isinstance(asset_ids, list):
+        return jsonify({'success': False, 'message': 'assetIds must be a list'}), 400
+
+    results = add_audit_scans(session_id, asset_ids, data.get('roomId'))
+    if results is None:
+        return jsonify({'success': False, 'message': 'Audit session is not active or room is outside its scope'}), 409
+
+    return jsonify({'success': True, 'results': results})
+
+@audit_views.route('/api/audit-sessions/<int:session_id>/scans/<path:asset_id>', methods=['DELETE'])
+@jwt_required()
+def undo_audit_scan(session_id, asset_id):
+    """Undo a scan in an audit session"""
+    if not _get_own_audit_session(session_id):
+        return jsonify({'success': False, 'message': 'Audit session not found'}), 404
+    if not remove_audit_scan(session_id, asset_id):
+        return jsonify({'success': False, 'message': 'Scan not found in an active audit session'}), 404
+    return jsonify({'success': True})
+
+@audit_views.route('/api/audit-sessions/<int:session_id>/complete', methods=['POST'])
+@jwt_required()
+def complete_audit(session_id):
+    """Apply an audit session's results: update scanned assets and mark unscanned ones missing"""
+    if not _get_own_audit_session(session_id):
+        return jsonify({'success': False, 'message': 'Audit session not found'}), 404
+    data = request.json or {}
+    summary = complete_audit_session(session_id, current_user.id, mark_missing=data.get('markMissing', True))
+    if summary is None:
+        return jsonify({'success': False, 'message': 'Audit session is not active or could not be completed'}), 409
+
+    result = summary['result']
+    return jsonify({
+        'success': True,
+        'message': f"Audit completed: {result['found']} found, {result['misplaced']} misplaced, {result['marked_missing']} marked missing.",
+        'summary': summary
+    })
+
+@audit_views.route('/api/audit-sessions/<int:session_id>/cancel', methods=['POST'])
+@jwt_required()
+def cancel_audit(session_id):
+    """Cancel an audit session without changing any asset"""
+    if not _get_own_audit_session(session_id):
+        return jsonify({'success': False, 'message': 'Audit session not found'}), 404
+    session = cancel_audit_session(session_id)
+    if not session:
+        return jsonify({'success': False, 'message': 'Audit session is not active'}), 409
+    return jsonify({'success': True, 'session': session.get_json()})
@@ -0,0 +1,38 @@
+from functools import wraps
+from flask import make_response, request
+from App.controllers.dataversion import get_data_versions
+
+# Change when a versioned endpoint's response changes shape, so browsers
+# drop the copies they kept from before a deploy
+ETAG_FORMAT = 1
+
+
+def versioned(*names):
+    """Serve a read endpoint with an ETag built from the named DataVersion counters.
+
+    The ETag depends only on the counters, so it is worked out before the
+    view runs: while none of them has moved, a request carrying it in
+    If-None-Match gets 304 Not Modified for the cost of one small query.
+    Responses are marked private, no-cache, so browsers keep them but ask
+    again every time. Place it below @jwt_required so the login check still
+    comes first.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # Read before the view's data, so a write landing in between can
+            # only make the ETag look older than the body, never newer
+            versions = get_data_versions(names)
+            etag = f"v{ETAG_FORMAT}-" + "-".join(f"{name}{versions[name]}" for name in names)
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            # Weak, as the body may be compressed differently on the way out
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,113 @@
+import threading, zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # Optional; responses are gzipped without it
+    brotli = None
+
+# Buffered responses smaller than this many bytes are sent as they are.
+# Streamed ones are always compressed: their size is not known up front,
+# and the big lists and downloads are the ones that stream.
+COMPRESSION_MIN_SIZE = 1024
+
+# Bodies are compressed per request, so favour speed over the last few percent
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/csv', 'text/html', 'text/plain'}
+
+# endpoint -> [responses, bytes before, bytes after], for this worker since it started
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _compressor(encoding):
+    """Return (compress(chunk), finish()) for an encoding, both returning bytes ready to send.
+
+    Each compressed chunk is flushed, so a streamed response reaches the
+    client as it is produced rather than when the compressor's buffer fills.
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        return (lambda data: compressor.process(data) + compressor.flush()), compressor.finish
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # 31: gzip header and trailer
+    return (lambda data: compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)), compressor.flush
+
+def _record(endpoint, before, after):
+    with _stats_lock:
+        stats = _stats.setdefault(endpoint, [0, 0, 0])
+        stats[0] += 1
+        stats[1] += before
+        stats[2] += after
+
+def get_compression_stats():
+    """Per-endpoint totals for the responses this worker has compressed.
+
+    Returns:
+        {endpoint: {responses, bytes, compressed_bytes, ratio}} where ratio
+        is compressed over original size.
+    """
+    with _stats_lock:
+        return {
+            endpoint: {
+                'responses': responses,
+                'bytes': before,
+                'compressed_bytes': after,
+                'ratio': round(after / before, 3) if before else None
+            }
+            for endpoint, (responses, before, after) in _stats.items()
+        }
+
+def reset_compression_stats():
+    with _stats_lock:
+        _stats.clear()
+
+def _compress_stream(source, encoding, endpoint):
+    def generate():
+        compress, finish = _compressor(encoding)
+        before = after = 0
+        try:
+            for chunk in source:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode('utf-8')
+                before += len(chunk)
+                data = compress(chunk)
+                after += len(data)
+                yield data
+            data = finish()
+            yield data
+            _record(endpoint, before, after + len(data))
+        finally:
+            if hasattr(source, 'close'):
+                source.close()
+    return generate()
+
+def compress_response(response):
+    """Compress JSON, CSV and HTML responses with the best encoding the client accepts (br, then gzip)."""
+    if (request.method == 'HEAD' or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or response.direct_passthrough or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = request.accept_encodings.best_match(['br', 'gzip'] if brotli else ['gzip'])
+    if not encoding:
+        return response
+
+    endpoint = request.endpoint or request.path
+    if response.is_streamed:
+        response.response = _compress_stream(response.response, encoding, endpoint)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESSION_MIN_SIZE:
+            return response
+        compress, finish = _compressor(encoding)
+        body = compress(data) + finish()
+        response.set_data(body)
+        _record(endpoint, len(data), len(body))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+def setup_compression(app):
+    app.after_request(compress_response)
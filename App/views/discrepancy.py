@@ -1,22 +1,27 @@
 # ... (existing imports) ...
-import csv
-import io
 from flask import Blueprint, Response, render_template, jsonify, request
 from flask_jwt_extended import jwt_required, current_user
 from App.database import db
 from App.controllers.asset import (
     get_asset,
     get_assets_by_status,
-    get_discrepant_assets,
+    iter_asset_views,
+    iter_asset_report_rows,
+    ASSET_REPORT_COLUMNS,
     mark_asset_lost,
     mark_asset_found,
     update_asset_location,
     bulk_mark_assets_found, # Import new function
-    bulk_relocate_assets    # Import new function
+    bulk_relocate_assets,   # Import new function
+    touch_asset_version
 )
 from App.controllers.room import get_room, get_all_rooms
 from datetime import datetime
 from App.controllers.scanevent import add_scan_event
+from App.controllers.status_counts import adjust_status_counts
+from App.controllers.location_cache import LOCATION_VERSION
+from App.views.caching import versioned
+from App.views.streaming import stream_json_array, stream_csv
 
 discrepancy_views = Blueprint('discrepancy_views', __name__, template_folder='../templates')
 
@@ -27,36 +32,30 @@ def discrepancy_report_page():
     # Default without loading data in template (will be loaded via API)
     return render_template('discrepancy.html')
 
+def _discrepancy_asset_json(asset, room_name, last_located_name):
+    # Expected room name (if available)
+    if asset.get('room_id'):
+        asset['room_name'] = room_name if room_name is not None else f"Room {asset['room_id']}"
+    else:
+        asset['room_name'] = "Unknown"
+
+    # Last located room name, only when it differs from the expected room
+    if asset.get('last_located') and asset['last_located'] != asset['room_id']:
+        asset['last_located_name'] = last_located_name if last_located_name is not None else f"Room {asset['last_located']}"
+    return asset
+
 @discrepancy_views.route('/api/discrepancies', methods=['GET'])
 @jwt_required()
 def get_discrepancies():
     """API endpoint to get all discrepancy assets"""
-    discrepancies = get_discrepant_assets()
-
-    # Enrich with room information
-    for asset in discrepancies:
-        # Get expected room name (if available)
-        if asset.get('room_id'):
-            room = get_room(asset['room_id'])
-            if room:
-                asset['room_name'] = room.room_name
-            else:
-                asset['room_name'] = f"Room {asset['room_id']}"
-        else:
-            asset['room_name'] = "Unknown"
-
-        # Get last located room name (if available)
-        if asset.get('last_located') and asset['last_located'] != asset['room_id']:
-            last_room = get_room(asset['last_located'])
-            if last_room:
-                asset['last_located_name'] = last_room.room_name
-            else:
-                asset['last_located_name'] = f"Room {asset['last_located']}"
-
-    return jsonify(discrepancies)
+    return stream_json_array(
+        _discrepancy_asset_json(asset, room_name, last_located_name)
+        for asset, room_name, last_located_name, _ in iter_asset_views(statuses=["Missing", "Misplaced"])
+    )
 
 @discrepancy_views.route('/api/rooms/all', methods=['GET'])
 @jwt_required()
+@versioned(LOCATION_VERSION)
 def get_all_rooms_json():
     """API endpoint to get all rooms for relocation"""
     rooms = get_all_rooms()
@@ -161,13 +160,17 @@ def relocate_asset(asset_id):
         else:
             notes = system_notes
 
+        touch_asset_version()
+        adjust_status_counts([(old_location, old_status, new_room_id, "Good")])
+
         # Create a single scan event using the existing controller
         add_scan_event(
             asset_id=asset_id,
             user_id=current_user.id,
             room_id=new_room_id,
             status="Good",
-            notes=notes
+            notes=notes,
+            commit=False
         )
 
         # Commit all changes at once
@@ -262,84 +265,27 @@ def bulk_relocate_endpoint():
 @discrepancy_views.route('/api/discrepancies/download', methods=['GET'])
 @jwt_required()
 def download_discrepancies():
-    """API endpoint to download discrepancies as CSV"""
+    """API endpoint to download discrepancies as CSV, streamed as the rows are read"""
     filter_type = request.args.get('filter', 'all')
     
     # Get the appropriate discrepancies based on filter
-    if filter_type == 'all':
-        discrepancies = get_discrepant_assets()
-    elif filter_type == 'missing':
-        discrepancies = get_assets_by_status("Missing")
+    if filter_type == 'missing':
+        statuses = ["Missing"]
     elif filter_type == 'misplaced':
-        discrepancies = get_assets_by_status("Misplaced")
+        statuses = ["Misplaced"]
     else:
-        discrepancies = get_discrepant_assets()
+        statuses = ["Missing", "Misplaced"]
     
-    # Enrich with room information (same as in get_discrepancies endpoint)
-    for asset in discrepancies:
-        # Get expected room name (if available)
-        if asset.get('room_id'):
-            room = get_room(asset['room_id'])
-            if room:
-                asset['room_name'] = room.room_name
-            else:
-                asset['room_name'] = f"Room {asset['room_id']}"
-        else:
-            asset['room_name'] = "Unknown"
-
-        # Get last located room name (if available)
-        if asset.get('last_located') and asset['last_located'] != asset['room_id']:
-            last_room = get_room(asset['last_located'])
-            if last_room:
-                asset['last_located_name'] = last_room.room_name
-            else:
-                asset['last_located_name'] = f"Room {asset['last_located']}"
-        else:
-            asset['last_located_name'] = asset.get('room_name', 'Unknown')
-    
-    # Create in-memory CSV file
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Add a header row with audit information
-    writer.writerow(['Discrepancy Report'])
-    writer.writerow(['Generated By', current_user.username])
-    writer.writerow(['Date & Time', datetime.now().strftime('%Y-%m-%d %H:%M:%S')])
-    writer.writerow(['Filter', filter_type.capitalize()])
-    writer.writerow([]) # Empty row as separator
-    
-    # Write CSV header
-    header = [
-        'Asset ID', 'Description', 'Status', 
-        'Assigned Room', 'Last Located', 
-        'Brand', 'Model', 'Serial Number',
-        'Last Update'
+    # Header rows with audit information, then the column header
+    preamble = [
+        ['Discrepancy Report'],
+        ['Generated By', current_user.username],
+        ['Date & Time', datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
+        ['Filter', filter_type.capitalize()],
+        [], # Empty row as separator
+        ASSET_REPORT_COLUMNS
     ]
-    writer.writerow(header)
-    
-    # Write each discrepancy row
-    for asset in discrepancies:
-        writer.writerow([
-            asset.get('id', ''),
-            asset.get('description', ''),
-            asset.get('status', ''),
-            asset.get('room_name', 'Unknown'),
-            asset.get('last_located_name', asset.get('room_name', 'Unknown')),
-            asset.get('brand', ''),
-            asset.get('model', ''),
-            asset.get('serial_number', ''),
-            asset.get('last_update', '') # Format this if needed
-        ])
     
-    # Prepare response
-    output.seek(0)
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     filename = f"discrepancy_report_{timestamp}.csv"
-    
-    return Response(
-        output.getvalue(),
-        mimetype='text/csv',
-        headers={
-            'Content-Disposition': f'attachment; filename="{filename}"'
-        }
-    )
\ No newline at end of file
+    return stream_csv(iter_asset_report_rows(statuses=statuses), filename, preamble=preamble)
\ No newline at end of file
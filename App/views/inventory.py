@@ -1,9 +1,16 @@
 from flask import Blueprint, render_template, jsonify, request
 from flask_jwt_extended import jwt_required, current_user
-from App.controllers.asset import get_all_assets_json, get_asset, update_asset_details, add_asset
-from App.controllers.assignee import get_all_assignees_json, get_assignee_by_id, get_or_create_assignee_by_name # Import new function
+from App.controllers.asset import (
+    iter_asset_views, get_asset_views_page, get_asset, update_asset_details, add_asset,
+    iter_asset_report_rows, ASSET_REPORT_COLUMNS, ASSET_VERSION
+)
+from App.controllers.asset_search import search_assets
+from App.controllers.assignee import ASSIGNEE_VERSION, get_all_assignees_json, get_assignee_by_id, get_or_create_assignee_by_name # Import new function
 from App.controllers.room import get_room
-from App.controllers.scanevent import add_scan_event, get_scans_by_asset
+from App.controllers.scanevent import add_scan_event, get_scan_history_page, iter_recent_scans_json
+from App.controllers.location_cache import LOCATION_VERSION
+from App.views.caching import versioned
+from App.views.streaming import stream_json_array, stream_csv
 from datetime import datetime
 
 inventory_views = Blueprint('inventory_views', __name__, template_folder='../templates')
@@ -13,28 +20,129 @@ inventory_views = Blueprint('inventory_views', __name__, template_folder='../tem
 def inventory_page():
     return render_template('inventory.html')
 
+# Upper bound for the page size a client can ask for
+MAX_ASSET_PAGE_SIZE = 500
+
+# Scan events shown on the asset page, and the most one history page can hold
+SCAN_HISTORY_PAGE_SIZE = 50
+MAX_SCAN_HISTORY_PAGE_SIZE = 500
+
+# Most scan events /api/scans/recent returns, whatever limit is asked for
+MAX_RECENT_SCANS = 1000
+
+def _inventory_asset_json(asset, room_name, assignee_name):
+    if asset.get('room_id'):
+        asset['room_name'] = room_name if room_name is not None else f"Room {asset['room_id']}"
+    else:
+        asset['room_name'] = "Unknown"
+    if asset.get('assignee_id'):
+        asset['assignee_name'] = assignee_name if assignee_name is not None else f"Assignee ID: {asset['assignee_id']}"
+    else:
+        asset['assignee_name'] = "Unassigned"
+    return asset
+
 @inventory_views.route('/api/assets', methods=['GET'])
 @jwt_required()
+@versioned(ASSET_VERSION, ASSIGNEE_VERSION, LOCATION_VERSION)
 def get_assets():
-    assets = get_all_assets_json()
-    for asset in assets:
-        if asset.get('room_id'):
-            room = get_room(asset['room_id'])
-            if room:
-                asset['room_name'] = room.room_name
-            else:
-                asset['room_name'] = f"Room {asset['room_id']}"
-        else:
-            asset['room_name'] = "Unknown"
-        if asset.get('assignee_id'):
-            assignee = get_assignee_by_id(asset['assignee_id'])
-            if assignee:
-                asset['assignee_name'] = str(assignee) # Use __str__
-            else:
-                asset['assignee_name'] = f"Assignee ID: {asset['assignee_id']}"
-        else:
-            asset['assignee_name'] = "Unassigned"
-    return jsonify(assets)
+    """List assets.
+
+    Without a limit parameter every asset is streamed as a JSON array. With
+    limit the response is one page: {"assets": [...], "next_cursor": ...}.
+    Optional parameters: cursor, sort (id, last_update, status), order
+    (asc, desc), status (repeatable or comma separated), room_id, building
+    and assignee.
+    """
+    if 'limit' not in request.args:
+        return stream_json_array(_inventory_asset_json(asset, room_name, assignee_name)
+                                 for asset, room_name, _, assignee_name in iter_asset_views())
+
+    try:
+        limit = int(request.args['limit'])
+        assignee_id = request.args.get('assignee')
+        assignee_id = int(assignee_id) if assignee_id else None
+    except ValueError:
+        return jsonify({'success': False, 'message': 'limit and assignee must be integers'}), 400
+    limit = max(1, min(limit, MAX_ASSET_PAGE_SIZE))
+
+    statuses = [status.strip()
+                for value in request.args.getlist('status')
+                for status in value.split(',') if status.strip()]
+
+    try:
+        views, next_cursor = get_asset_views_page(
+            limit=limit,
+            cursor=request.args.get('cursor') or None,
+            sort=request.args.get('sort', 'id'),
+            descending=request.args.get('order', 'asc') == 'desc',
+            statuses=statuses,
+            room_id=request.args.get('room_id') or None,
+            building_id=request.args.get('building') or None,
+            assignee_id=assignee_id
+        )
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    assets = [_inventory_asset_json(asset, room_name, assignee_name)
+              for asset, room_name, _, assignee_name in views]
+    return jsonify({'assets': assets, 'next_cursor': next_cursor})
+
+@inventory_views.route('/api/assets/search', methods=['GET'])
+@jwt_required()
+def search_assets_api():
+    """Ranked full-text search: ?q=dell latitude, optional limit, cursor and status.
+
+    Returns one page: {"assets": [...], "next_cursor": ...}, best match first.
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'success': False, 'message': 'q is required'}), 400
+    try:
+        limit = int(request.args.get('limit', 50))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'limit must be an integer'}), 400
+    limit = max(1, min(limit, MAX_ASSET_PAGE_SIZE))
+    statuses = [status.strip()
+                for value in request.args.getlist('status')
+                for status in value.split(',') if status.strip()]
+
+    try:
+        views, next_cursor = search_assets(query, limit=limit, cursor=request.args.get('cursor') or None,
+                                           statuses=statuses or None)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    assets = [_inventory_asset_json(asset, room_name, assignee_name)
+              for asset, room_name, _, assignee_name in views]
+    return jsonify({'assets': assets, 'next_cursor': next_cursor})
+
+@inventory_views.route('/api/assets/download', methods=['GET'])
+@jwt_required()
+def download_inventory():
+    """Download every asset as CSV (optionally ?status=..., repeatable or comma separated), streamed as the rows are read"""
+    statuses = [status.strip()
+                for value in request.args.getlist('status')
+                for status in value.split(',') if status.strip()]
+    preamble = [
+        ['Inventory Report'],
+        ['Generated By', current_user.username],
+        ['Date & Time', datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
+        ['Filter', ', '.join(statuses) if statuses else 'All'],
+        [],
+        ASSET_REPORT_COLUMNS
+    ]
+    filename = f"inventory_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    return stream_csv(iter_asset_report_rows(statuses=statuses or None), filename, preamble=preamble)
+
+@inventory_views.route('/api/scans/recent', methods=['GET'])
+@jwt_required()
+def get_recent_scans_api():
+    """Stream the most recent scan events, newest first"""
+    try:
+        limit = int(request.args.get('limit', 50))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'limit must be an integer'}), 400
+    return stream_json_array(iter_recent_scans_json(max(0, min(limit, MAX_RECENT_SCANS))))
 
 @inventory_views.route('/asset/<asset_id>', methods=['GET'])
 @jwt_required()
@@ -50,59 +158,43 @@ def asset_report(asset_id):
     last_location_name = last_location.room_name if last_location else "Unknown"
     assignee = get_assignee_by_id(asset.assignee_id) if asset.assignee_id else None
     assignee_name = str(assignee) if assignee else "Unassigned" # Use __str__
-    scan_events = get_scans_by_asset(asset_id)
-    enriched_scan_events = []
-    for event in scan_events:
-        try:
-            event_dict = {}
-            if hasattr(event, 'get_json') and callable(event.get_json):
-                # Get the JSON representation and clean up the keys
-                raw_dict = event.get_json()
-                # Remove colons and spaces from keys
-                event_dict = {key.rstrip(': '): value for key, value in raw_dict.items()}
-            else:
-                event_dict_raw = event.__dict__.copy()
-                event_dict_raw.pop('_sa_instance_state', None)
-                for key, value in event_dict_raw.items():
-                    # Fix key names - remove trailing colons and spaces
-                    clean_key = key.rstrip(': ') if isinstance(key, str) else key
-                    if isinstance(value, datetime):
-                        # Store datetime objects directly instead of strings
-                        event_dict[clean_key] = value
-                    else:
-                        event_dict[clean_key] = value
-            
-            # Add room name
-            scan_room = get_room(event.room_id)
-            event_dict['room_name'] = scan_room.room_name if scan_room else f"Room {event.room_id}"
-            enriched_scan_events.append(event_dict)
-        except Exception as e:
-            print(f"Error processing scan event {getattr(event, 'scan_id', 'N/A')}: {e}")
-            enriched_scan_events.append({
-                'scan_id': getattr(event, 'scan_id', 'N/A'),  # Remove colon
-                'error': 'Could not process event data',
-                'scan_time': getattr(event, 'scan_time', datetime.now())  # Store as datetime object
-            })
-
-    def get_scan_time(event_dict):
-        time_val = event_dict.get('scan_time')  # Use clean key
-        if isinstance(time_val, str):
-            try:
-                return datetime.strptime(time_val, '%Y-%m-%d %H:%M:%S')
-            except ValueError:
-                return datetime.min
-        elif isinstance(time_val, datetime):
-            return time_val
-        else:
-            return datetime.min
-    
-    enriched_scan_events.sort(key=get_scan_time, reverse=True)
+    scan_events, next_cursor = get_scan_history_page(asset_id, limit=SCAN_HISTORY_PAGE_SIZE)
     return render_template('asset.html',
                           asset=asset,
                           room_name=room_name,
                           last_location_name=last_location_name,
                           assignee_name=assignee_name,
-                          scan_events=enriched_scan_events)
+                          scan_events=scan_events,
+                          next_cursor=next_cursor)
+
+def _scan_event_json(event):
+    # Same minute-precision local time the page renders, not an HTTP date
+    event['scan_time'] = event['scan_time'].isoformat() if event['scan_time'] else None
+    return event
+
+@inventory_views.route('/api/asset/<asset_id>/scans', methods=['GET'])
+@jwt_required()
+def get_asset_scan_history(asset_id):
+    """One page of an asset's scan history, newest first: {"scans": [...], "next_cursor": ...}
+
+    Archived events are included unless ?archived=0.
+    """
+    try:
+        limit = int(request.args.get('limit', SCAN_HISTORY_PAGE_SIZE))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'limit must be an integer'}), 400
+    limit = max(1, min(limit, MAX_SCAN_HISTORY_PAGE_SIZE))
+
+    try:
+        events, next_cursor = get_scan_history_page(
+            asset_id,
+            limit=limit,
+            cursor=request.args.get('cursor') or None,
+            include_archived=request.args.get('archived') != '0'
+        )
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    return jsonify({'scans': [_scan_event_json(event) for event in events], 'next_cursor': next_cursor})
 
 @inventory_views.route('/api/asset/<asset_id>/update', methods=['POST'])
 @jwt_required()
@@ -0,0 +1,31 @@
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required, current_user
+from App.controllers.job import get_job, iter_job_errors
+from App.views.streaming import stream_json_array
+
+job_views = Blueprint('job_views', __name__, template_folder='../templates')
+
+def _get_own_job(job_id):
+    # Someone else's job is reported as not found rather than forbidden, so job ids can't be probed
+    job = get_job(job_id)
+    if job and job.user_id == current_user.id:
+        return job
+    return None
+
+@job_views.route('/api/jobs/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_job_status(job_id):
+    """API endpoint to get a background job's status and progress"""
+    job = _get_own_job(job_id)
+    if not job:
+        return jsonify({'success': False, 'message': 'Job not found'}), 404
+    return jsonify(job.get_json())
+
+@job_views.route('/api/jobs/<int:job_id>/errors', methods=['GET'])
+@jwt_required()
+def get_job_errors(job_id):
+    """API endpoint to stream a job's errors, optionally only those after ?after=<error id>"""
+    if not _get_own_job(job_id):
+        return jsonify({'success': False, 'message': 'Job not found'}), 404
+    after = request.args.get('after', 0, type=int)
+    return stream_json_array(iter_job_errors(job_id, after=after))
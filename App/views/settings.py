@@ -1,7 +1,8 @@
 
 from flask import Blueprint, render_template, jsonify, request, send_file
 from flask_jwt_extended import jwt_required, current_user
-from App.controllers.asset import get_all_assets_by_room_id, get_all_assets_json, upload_csv
+from App.controllers.asset import get_all_assets_by_room_id, get_all_assets_json
+from App.controllers.job import enqueue_csv_import
 from App.controllers.user import update_user
 from App.controllers.building import (
     create_building, get_building, get_all_building_json, 
@@ -15,10 +16,11 @@ from App.controllers.room import (
     create_room, get_room, get_rooms_by_floor,
     update_room, delete_room
 )
+from App.controllers.location_cache import LOCATION_VERSION
+from App.views.caching import versioned
 import os
 import csv
 import io
-from werkzeug.utils import secure_filename
 from datetime import datetime
 
 
@@ -82,10 +84,8 @@ def update_user_settings():
         print(f"Exception in user update endpoint: {str(e)}")
         return jsonify({'success': False, 'message': f'Server error: {str(e)}'}), 500
     
-# CSV upload endpoints
-@settings_views.route('/api/upload/assets-csv', methods=['POST'])
-@jwt_required()
-def upload_assets_csv():
+# CSV upload endpoints - imports run as background jobs, poll /api/jobs/<id> for progress
+def _enqueue_upload(kind):
     if 'csvFile' not in request.files:
         return jsonify({'success': False, 'message': 'No file part'}), 400
     
@@ -96,234 +96,26 @@ def upload_assets_csv():
     
     if file and file.filename.endswith('.csv'):
         try:
-            # Make sure uploads directory exists
-            os.makedirs('App/uploads', exist_ok=True)
-            
-            filename = secure_filename(file.filename)
-            filepath = os.path.join('App/uploads', filename)
-            file.save(filepath)
-            
-            # Process the CSV file
-            result = upload_csv(filepath)
-            
-            # Clean up the uploaded file
-            if os.path.exists(filepath):
-                os.remove(filepath)
-            
-            if result['success']:
-                return jsonify({
-                    'success': True, 
-                    'message': f"Successfully imported {result['imported']} assets. {result['skipped']} skipped.",
-                    'details': result
-                })
-            else:
-                return jsonify({
-                    'success': False, 
-                    'message': f"Failed to import assets: {result['errors'][0] if result['errors'] else 'Unknown error'}",
-                    'details': result
-                }), 400
+            job, _ = enqueue_csv_import(kind, file, current_user.id)
+            return jsonify({
+                'success': True,
+                'message': 'Import started',
+                'job': job.get_json()
+            }), 202
         except Exception as e:
             return jsonify({'success': False, 'message': f'Error processing CSV: {str(e)}'}), 500
     else:
         return jsonify({'success': False, 'message': 'File must be a CSV'}), 400
+
+@settings_views.route('/api/upload/assets-csv', methods=['POST'])
+@jwt_required()
+def upload_assets_csv():
+    return _enqueue_upload('assets-csv')
     
 @settings_views.route('/api/upload/locations-csv', methods=['POST'])
 @jwt_required()
 def upload_locations_csv():
-    if 'csvFile' not in request.files:
-        return jsonify({'success': False, 'message': 'No file part'}), 400
-    
-    file = request.files['csvFile']
-    
-    if file.filename == '':
-        return jsonify({'success': False, 'message': 'No selected file'}), 400
-    
-    if file and file.filename.endswith('.csv'):
-        try:
-            # Read CSV file
-            stream = io.StringIO(file.stream.read().decode("UTF8"), newline=None)
-            csv_reader = csv.DictReader(stream)
-            
-            # Initialize counters and error collection
-            buildings_created = 0
-            floors_created = 0
-            rooms_created = 0
-            skipped_rows = 0
-            errors = []
-            
-            # Track which entities we've already processed to avoid duplicates
-            processed_buildings = {}  # Dict of id -> building object
-            processed_floors = {}  # Dict of id -> floor object
-            processed_rooms = {}  # Dict of id -> room object
-            
-            for row_num, row in enumerate(csv_reader, start=2):  # Start at 2 to account for header row
-                try:
-                    # Extract data with defaults for missing values
-                    building_id = row.get('building_id', '').strip()
-                    building_name = row.get('building_name', '').strip()
-                    floor_id = row.get('floor_id', '').strip()
-                    floor_name = row.get('floor_name', '').strip()
-                    room_id = row.get('room_id', '').strip()
-                    room_name = row.get('room_name', '').strip()
-                    
-                    # Skip empty rows
-                    if not building_name:
-                        errors.append(f"Row {row_num}: Missing building name (required)")
-                        skipped_rows += 1
-                        continue
-                    
-                    # BUILDING HANDLING
-                    current_building = None
-                    
-                    # If building_id provided, check if it exists
-                    if building_id:
-                        existing_building = get_building(building_id)
-                        if existing_building:
-                            # Building exists with this ID
-                            current_building = existing_building
-                            
-                            # Verify the building name matches
-                            if existing_building.building_name != building_name:
-                                errors.append(f"Row {row_num}: Building ID {building_id} exists but with name '{existing_building.building_name}' (not '{building_name}')")
-                                skipped_rows += 1
-                                continue
-                        else:
-                            # Building ID provided but doesn't exist, create it
-                            current_building = create_building(building_id, building_name)
-                            buildings_created += 1
-                    else:
-                        # No building_id provided, check if a building with this name exists
-                        buildings = get_all_building_json()
-                        existing_building = next((b for b in buildings if b['building_name'].lower() == building_name.lower()), None)
-                        
-                        if existing_building:
-                            # Building exists with this name
-                            current_building = get_building(existing_building['building_id'])
-                        else:
-                            # Generate a unique building ID
-                            new_building_id = f"B{datetime.now().strftime('%Y%m%d%H%M%S')}"
-                            current_building = create_building(new_building_id, building_name)
-                            buildings_created += 1
-                    
-                    # Store the building for reference
-                    processed_buildings[current_building.building_id] = current_building
-                    
-                    # If we don't have floor information, we're done with this row
-                    if not floor_name:
-                        continue
-                    
-                    # FLOOR HANDLING
-                    current_floor = None
-                    
-                    # If floor_id provided, check if it exists
-                    if floor_id:
-                        existing_floor = get_floor(floor_id)
-                        if existing_floor:
-                            # Floor exists with this ID
-                            current_floor = existing_floor
-                            
-                            # Verify the floor belongs to the right building
-                            if existing_floor.building_id != current_building.building_id:
-                                errors.append(f"Row {row_num}: Floor ID {floor_id} exists but belongs to building {existing_floor.building_id} (not {current_building.building_id})")
-                                skipped_rows += 1
-                                continue
-                                
-                            # Verify the floor name matches
-                            if existing_floor.floor_name != floor_name:
-                                errors.append(f"Row {row_num}: Floor ID {floor_id} exists but with name '{existing_floor.floor_name}' (not '{floor_name}')")
-                                skipped_rows += 1
-                                continue
-                        else:
-                            # Floor ID provided but doesn't exist, create it
-                            current_floor = create_floor(floor_id, current_building.building_id, floor_name)
-                            floors_created += 1
-                    else:
-                        # No floor_id provided, check if a floor with this name exists in the building
-                        floors = get_floors_by_building(current_building.building_id)
-                        existing_floor = next((f for f in floors if f.floor_name.lower() == floor_name.lower()), None)
-                        
-                        if existing_floor:
-                            # Floor exists with this name in this building
-                            current_floor = existing_floor
-                        else:
-                            # Generate a unique floor ID
-                            new_floor_id = f"F{datetime.now().strftime('%Y%m%d%H%M%S')}"
-                            current_floor = create_floor(new_floor_id, current_building.building_id, floor_name)
-                            floors_created += 1
-                    
-                    # Store the floor for reference
-                    processed_floors[current_floor.floor_id] = current_floor
-                    
-                    # If we don't have room information, we're done with this row
-                    if not room_name:
-                        continue
-                    
-                    # ROOM HANDLING
-                    current_room = None
-                    
-                    # If room_id provided, check if it exists
-                    if room_id:
-                        existing_room = get_room(room_id)
-                        if existing_room:
-                            # Room exists with this ID
-                            current_room = existing_room
-                            
-                            # Verify the room belongs to the right floor
-                            if existing_room.floor_id != current_floor.floor_id:
-                                errors.append(f"Row {row_num}: Room ID {room_id} exists but belongs to floor {existing_room.floor_id} (not {current_floor.floor_id})")
-                                skipped_rows += 1
-                                continue
-                                
-                            # Verify the room name matches
-                            if existing_room.room_name != room_name:
-                                errors.append(f"Row {row_num}: Room ID {room_id} exists but with name '{existing_room.room_name}' (not '{room_name}')")
-                                skipped_rows += 1
-                                continue
-                        else:
-                            # Room ID provided but doesn't exist, create it
-                            current_room = create_room(room_id, current_floor.floor_id, room_name)
-                            rooms_created += 1
-                    else:
-                        # No room_id provided, check if a room with this name exists in the floor
-                        rooms = get_rooms_by_floor(current_floor.floor_id)
-                        existing_room = next((r for r in rooms if r.room_name.lower() == room_name.lower()), None)
-                        
-                        if existing_room:
-                            # Room exists with this name in this floor
-                            current_room = existing_room
-                        else:
-                            # Generate a unique room ID
-                            new_room_id = f"R{datetime.now().strftime('%Y%m%d%H%M%S')}"
-                            current_room = create_room(new_room_id, current_floor.floor_id, room_name)
-                            rooms_created += 1
-                    
-                    # Store the room for reference
-                    processed_rooms[current_room.room_id] = current_room
-                    
-                except Exception as e:
-                    errors.append(f"Row {row_num}: Error - {str(e)}")
-                    skipped_rows += 1
-            
-            # Construct response
-            response_data = {
-                'success': buildings_created > 0 or floors_created > 0 or rooms_created > 0,
-                'message': f'Successfully imported {buildings_created} buildings, {floors_created} floors, and {rooms_created} rooms. {skipped_rows} rows skipped.',
-                'buildings_created': buildings_created,
-                'floors_created': floors_created,
-                'rooms_created': rooms_created,
-                'skipped_rows': skipped_rows,
-                'errors': errors[:10]  # Limit number of errors returned to avoid huge responses
-            }
-            
-            if errors and len(errors) > 10:
-                response_data['message'] += f" Showing first 10 of {len(errors)} errors."
-            
-            return jsonify(response_data)
-            
-        except Exception as e:
-            return jsonify({'success': False, 'message': f'Error processing CSV: {str(e)}'}), 500
-    else:
-        return jsonify({'success': False, 'message': 'File must be a CSV'}), 400
+    return _enqueue_upload('locations-csv')
 
 # Template download endpoints
 @settings_views.route('/api/download/asset-template', methods=['GET'])
@@ -380,6 +172,7 @@ def download_location_template():
 # Location management endpoints - Buildings
 @settings_views.route('/api/buildings', methods=['GET'])
 @jwt_required()
+@versioned(LOCATION_VERSION)
 def get_buildings():
     buildings = get_all_building_json()
     return jsonify(buildings)
@@ -471,6 +264,7 @@ def delete_building_endpoint(building_id):
 # Location management endpoints - Floors
 @settings_views.route('/api/floors/<building_id>', methods=['GET'])
 @jwt_required()
+@versioned(LOCATION_VERSION)
 def get_building_floors(building_id):
     floors = get_floors_by_building(building_id)
     if not floors:
@@ -565,6 +359,7 @@ def delete_floor_endpoint(floor_id):
 # Location management endpoints - Rooms
 @settings_views.route('/api/rooms/<floor_id>', methods=['GET'])
 @jwt_required()
+@versioned(LOCATION_VERSION)
 def get_floor_rooms(floor_id):
     rooms = get_rooms_by_floor(floor_id)
     if not rooms:
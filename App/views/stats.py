@@ -0,0 +1,36 @@
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required
+from App.controllers.stats import STATS_SCOPES, get_location_status_counts
+from App.views.compression import get_compression_stats
+
+stats_views = Blueprint('stats_views', __name__, template_folder='../templates')
+
+# Dashboards poll the counts; let the browser reuse them for a short while
+STATS_MAX_AGE = 30
+
+@stats_views.route('/api/stats/locations', methods=['GET'])
+@jwt_required()
+def location_stats():
+    """API endpoint for asset status counts per room, floor and building.
+
+    Optionally scoped with ?room=<id>, ?floor=<id> or ?building=<id>.
+    """
+    scopes = [(scope_type, request.args[scope_type]) for scope_type in STATS_SCOPES if request.args.get(scope_type)]
+    if len(scopes) > 1:
+        return jsonify({'success': False, 'message': 'Use only one of room, floor or building'}), 400
+    scope_type, scope_id = scopes[0] if scopes else (None, None)
+
+    summary = get_location_status_counts(scope_type, scope_id)
+    if summary is None:
+        return jsonify({'success': False, 'message': f'{scope_type.capitalize()} {scope_id} not found'}), 404
+
+    response = jsonify(summary)
+    response.cache_control.private = True
+    response.cache_control.max_age = STATS_MAX_AGE
+    return response
+
+@stats_views.route('/api/stats/compression', methods=['GET'])
+@jwt_required()
+def compression_stats():
+    """Bytes before and after compression per endpoint, for the worker that answers."""
+    return jsonify(get_compression_stats())
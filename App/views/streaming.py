@@ -0,0 +1,72 @@
+import csv
+from flask import Response, current_app, stream_with_context
+
+
+def stream_json_array(items, chunk_size=500):
+    """Return a response that streams an iterable of dicts as one JSON array.
+
+    Items are encoded one at a time with the app's JSON provider (so dates
+    look the same as with jsonify) and flushed every chunk_size items. Pair
+    it with a generator reading from a server-side cursor so memory stays
+    flat however many rows there are.
+    """
+    dumps = current_app.json.dumps
+
+    def generate():
+        chunk = ['[']
+        count = 0
+        for item in items:
+            if count:
+                chunk.append(',')
+            chunk.append(dumps(item, separators=(',', ':')))
+            count += 1
+            if count % chunk_size == 0:
+                yield ''.join(chunk)
+                chunk = []
+        chunk.append(']')
+        yield ''.join(chunk)
+
+    return Response(stream_with_context(generate()), mimetype=current_app.json.mimetype)
+
+
+class _LineBuffer:
+    """File-like sink for csv.writer that keeps the lines written so far."""
+
+    def __init__(self):
+        self.lines = []
+
+    def write(self, line):
+        self.lines.append(line)
+
+    def drain(self):
+        data = ''.join(self.lines)
+        self.lines = []
+        return data
+
+
+def stream_csv(rows, filename, preamble=(), chunk_size=500):
+    """Return a response that streams rows (lists of values) as a CSV download.
+
+    The preamble rows (title, header) are sent before the first data row is
+    read, so the download starts before the query behind rows has run.
+    Data rows are flushed every chunk_size rows; as with stream_json_array,
+    feed it a generator over a server-side cursor to keep memory flat.
+    """
+    def generate():
+        buffer = _LineBuffer()
+        writer = csv.writer(buffer)
+        writer.writerows(preamble)
+        yield buffer.drain()
+        count = 0
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+            if count % chunk_size == 0:
+                yield buffer.drain()
+        yield buffer.drain()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,103 @@
+"""Login and scan latency during a burst of logins, as on a gunicorn gevent worker.
+
+Serves the app from one gevent WSGI server (one worker's worth), keeps a
+number of scanners posting to /api/scans/batch and then logs a crowd of
+users in at once. It runs twice: with password hashes computed inline in
+the request (PASSWORD_HASH_THREADS = 0) and in the hashing pool.
+
+    python benchmarks/login_latency.py
+    python benchmarks/login_latency.py --logins 100 --scanners 20 --iterations 600000 --threads 1
+"""
+from gevent import monkey
+monkey.patch_all()
+
+import argparse, json, os, sys, tempfile, time, urllib.request
+from datetime import datetime
+import gevent
+from gevent.pywsgi import WSGIServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token
+from App import passwords
+from App.main import create_app
+from App.database import db, create_db
+from App.models import Asset, Assignee, Building, Floor, Room, User
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] if values else 0.0
+
+def post(url, body, headers=None):
+    request = urllib.request.Request(url, data=json.dumps(body).encode('utf-8'), method='POST')
+    request.add_header('Content-Type', 'application/json')
+    for name, value in (headers or {}).items():
+        request.add_header(name, value)
+    start = time.perf_counter()
+    with urllib.request.urlopen(request) as response:
+        response.read()
+    return (time.perf_counter() - start) * 1000
+
+def setup(args):
+    db.drop_all()
+    create_db()
+    db.session.add_all([Building("BB1", "Bench"), Floor("BF1", "BB1", "Bench floor"), Room("BR1", "BF1", "Bench room")])
+    assignee = Assignee("Bench", "Assignee", "bench@example.com", "BR1")
+    db.session.add(assignee)
+    db.session.flush()
+    db.session.add_all(Asset(f"BA{i:04}", "Bench asset", "Model", "Brand", f"SN{i}", "BR1", "BR1", assignee.id, datetime.now(), None, "Good")
+                       for i in range(100))
+    db.session.add(User("scanner@example.com", "scanner", "scanpass"))
+    db.session.add_all(User(f"user{i}@example.com", f"user{i}", "loginpass") for i in range(args.logins))
+    db.session.commit()
+
+def run(url, args, label):
+    headers = {'Authorization': f"Bearer {create_access_token(identity='scanner@example.com')}"}
+    scans, logins, done = [], [], False
+
+    def scanner(n):
+        i = 0
+        while not done:
+            record = {'key': f"{label}-{n}-{i}", 'assetId': f"BA{i % 100:04}", 'roomId': "BR1"}
+            scans.append(post(url + '/api/scans/batch', {'scans': [record]}, headers))
+            i += 1
+
+    def login(i):
+        logins.append(post(url + '/api/login', {'email': f"user{i}@example.com", 'password': "loginpass"}))
+
+    scanners = [gevent.spawn(scanner, n) for n in range(args.scanners)]
+    gevent.sleep(1)  # Let the scan traffic settle before the burst
+    scans.clear()
+    gevent.joinall([gevent.spawn(login, i) for i in range(args.logins)])
+    done = True
+    gevent.joinall(scanners)
+
+    print(f"{label:>8}  logins p50 {percentile(logins, 50):7.1f}  p99 {percentile(logins, 99):7.1f} ms"
+          f"   scans p50 {percentile(scans, 50):6.1f}  p99 {percentile(scans, 99):7.1f}"
+          f"  max {max(scans, default=0):7.1f} ms  ({len(scans)} scans)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--logins', type=int, default=50, help="users logging in at once")
+    parser.add_argument('--scanners', type=int, default=10, help="scanners posting scans throughout")
+    parser.add_argument('--threads', type=int, default=passwords.PASSWORD_HASH_THREADS, help="hashing threads")
+    parser.add_argument('--iterations', type=int, default=passwords.PASSWORD_HASH_ITERATIONS, help="PBKDF2 work factor")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix='bench-'), 'bench.db')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{path}", 'PASSWORD_HASH_ITERATIONS': args.iterations})
+    setup(args)
+    server = WSGIServer(('127.0.0.1', 0), app, log=None)
+    server.start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    print(f"{args.logins} logins, {args.scanners} scanners, {args.iterations} iterations, "
+          f"{args.threads} hashing threads")
+
+    for threads, label in ((0, "inline"), (args.threads, "pool")):
+        passwords.PASSWORD_HASH_THREADS = threads
+        run(url, args, label)
+    server.stop()
+
+if __name__ == '__main__':
+    main()
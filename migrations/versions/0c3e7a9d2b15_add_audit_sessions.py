@@ -0,0 +1,55 @@
+"""Add the audit_session and audit_scan tables
+
+Revision ID: 0c3e7a9d2b15
+Revises: f2c8a5d9b147
+Create Date: 2026-10-19 09:00:00
+
+Audit sessions keep scanned tags on the server until the audit is
+completed and reconciled.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0c3e7a9d2b15'
+down_revision = 'f2c8a5d9b147'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    # `flask init` (db.create_all) may already have created them
+    if not inspector.has_table('audit_session'):
+        op.create_table(
+            'audit_session',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('scope_type', sa.String(length=20), nullable=False),
+            sa.Column('scope_id', sa.String(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=True),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('started_at', sa.DateTime(), nullable=False),
+            sa.Column('completed_at', sa.DateTime(), nullable=True),
+            sa.Column('result', sa.JSON(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if not inspector.has_table('audit_scan'):
+        op.create_table(
+            'audit_scan',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('session_id', sa.Integer(), nullable=False),
+            sa.Column('asset_id', sa.String(), nullable=False),
+            sa.Column('room_id', sa.String(), nullable=False),
+            sa.Column('scanned_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['session_id'], ['audit_session.id']),
+            sa.ForeignKeyConstraint(['room_id'], ['room.room_id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('session_id', 'asset_id', name='uq_audit_scan_session_asset')
+        )
+
+
+def downgrade():
+    op.drop_table('audit_scan')
+    op.drop_table('audit_session')
@@ -0,0 +1,39 @@
+"""Add indexes for the hot query predicates
+
+Revision ID: 3f2a9c1d7b10
+Revises:
+Create Date: 2026-10-18 09:00:00
+
+Tables are created by `flask init` (db.create_all), which already creates
+these indexes on a fresh database, so each one is only added if missing.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2a9c1d7b10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# (index name, table, indexed columns or expressions)
+INDEXES = [
+    ('ix_asset_status', 'asset', 'status'),
+    ('ix_asset_room_id', 'asset', 'room_id'),
+    ('ix_scan_event_asset_id_scan_time', 'scan_event', 'asset_id, scan_time'),
+    ('ix_scan_event_room_id_scan_time', 'scan_event', 'room_id, scan_time'),
+    ('ix_assignee_lower_email', 'assignee', 'lower(email)'),
+    ('ix_assignee_lower_name', 'assignee', 'lower(fname), lower(lname)'),
+]
+
+
+# IF [NOT] EXISTS works on both SQLite and Postgres, and unlike reflection
+# it also sees the expression indexes.
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+
+
+def downgrade():
+    for name, _, _ in reversed(INDEXES):
+        op.execute(f"DROP INDEX IF EXISTS {name}")
@@ -0,0 +1,41 @@
+"""Add the scan_receipt table
+
+Revision ID: 5e9b1c4f8a27
+Revises: 0c3e7a9d2b15
+Create Date: 2026-10-19 09:30:00
+
+/api/scans/batch records every accepted scan here under the scanner's
+idempotency key, so a retried batch is not applied twice.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e9b1c4f8a27'
+down_revision = '0c3e7a9d2b15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # `flask init` (db.create_all) may already have created it
+    if not sa.inspect(op.get_bind()).has_table('scan_receipt'):
+        op.create_table(
+            'scan_receipt',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('idempotency_key', sa.String(length=64), nullable=False),
+            sa.Column('asset_id', sa.String(), nullable=False),
+            sa.Column('room_id', sa.String(), nullable=False),
+            sa.Column('result', sa.String(length=20), nullable=False),
+            sa.Column('scanned_at', sa.DateTime(), nullable=True),
+            sa.Column('received_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('user_id', 'idempotency_key', name='uq_scan_receipt_user_key')
+        )
+
+
+def downgrade():
+    op.drop_table('scan_receipt')
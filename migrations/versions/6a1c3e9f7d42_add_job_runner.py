@@ -0,0 +1,32 @@
+"""Record which process owns a job and where its file is
+
+Revision ID: 6a1c3e9f7d42
+Revises: 9d6f2b8e4c31
+Create Date: 2026-10-19 11:00:00
+
+At startup, Queued and Running jobs whose process has exited are marked
+Failed and their temp files deleted.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6a1c3e9f7d42'
+down_revision = '9d6f2b8e4c31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # `flask init` (db.create_all) may already have created them
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('job')}
+    if 'runner' not in columns:
+        op.add_column('job', sa.Column('runner', sa.String(length=100), nullable=True))
+    if 'temp_path' not in columns:
+        op.add_column('job', sa.Column('temp_path', sa.String(length=255), nullable=True))
+
+
+def downgrade():
+    op.drop_column('job', 'temp_path')
+    op.drop_column('job', 'runner')
@@ -0,0 +1,26 @@
+"""Index the asset list's last-update sort key
+
+Revision ID: 7b3e5d1a9c64
+Revises: 6a1c3e9f7d42
+Create Date: 2026-10-19 11:00:00
+
+The asset list pages by (coalesce(last_update, epoch), id) so assets without
+a last_update still have a cursor value; the expression must match
+App.models.asset.NO_LAST_UPDATE for the planner to use the index.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7b3e5d1a9c64'
+down_revision = '6a1c3e9f7d42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("CREATE INDEX IF NOT EXISTS ix_asset_last_update_key ON asset (coalesce(last_update, '1970-01-01 00:00:00.000000'), id)")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_asset_last_update_key")
@@ -0,0 +1,27 @@
+"""Cover per-room status counts with a (room_id, status) index
+
+Revision ID: 8b41e6d2c5a3
+Revises: 3f2a9c1d7b10
+Create Date: 2026-10-18 16:30:00
+
+The composite index also serves the room_id lookups, so it replaces
+ix_asset_room_id.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8b41e6d2c5a3'
+down_revision = '3f2a9c1d7b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("CREATE INDEX IF NOT EXISTS ix_asset_room_id_status ON asset (room_id, status)")
+    op.execute("DROP INDEX IF EXISTS ix_asset_room_id")
+
+
+def downgrade():
+    op.execute("CREATE INDEX IF NOT EXISTS ix_asset_room_id ON asset (room_id)")
+    op.execute("DROP INDEX IF EXISTS ix_asset_room_id_status")
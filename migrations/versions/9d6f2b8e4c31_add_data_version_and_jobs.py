@@ -0,0 +1,67 @@
+"""Add the data_version, job and job_error tables
+
+Revision ID: 9d6f2b8e4c31
+Revises: 5e9b1c4f8a27
+Create Date: 2026-10-19 10:00:00
+
+These tables were added to the models before the migration chain existed,
+so a database created with an older `flask init` did not get them from
+any revision.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d6f2b8e4c31'
+down_revision = '5e9b1c4f8a27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    # `flask init` (db.create_all) may already have created them
+    if not inspector.has_table('data_version'):
+        op.create_table(
+            'data_version',
+            sa.Column('name', sa.String(length=50), nullable=False),
+            sa.Column('version', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('name')
+        )
+    if not inspector.has_table('job'):
+        op.create_table(
+            'job',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('kind', sa.String(length=50), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('filename', sa.String(length=255), nullable=True),
+            sa.Column('user_id', sa.Integer(), nullable=True),
+            sa.Column('total', sa.Integer(), nullable=True),
+            sa.Column('processed', sa.Integer(), nullable=False),
+            sa.Column('skipped', sa.Integer(), nullable=False),
+            sa.Column('error_count', sa.Integer(), nullable=False),
+            sa.Column('message', sa.Text(), nullable=True),
+            sa.Column('result', sa.JSON(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('started_at', sa.DateTime(), nullable=True),
+            sa.Column('finished_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if not inspector.has_table('job_error'):
+        op.create_table(
+            'job_error',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('job_id', sa.Integer(), nullable=False),
+            sa.Column('message', sa.Text(), nullable=False),
+            sa.ForeignKeyConstraint(['job_id'], ['job.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_job_error_job_id ON job_error (job_id)")
+
+
+def downgrade():
+    op.drop_table('job_error')
+    op.drop_table('job')
+    op.drop_table('data_version')
@@ -0,0 +1,52 @@
+"""Add the scan_event_archive table and a scan_time index
+
+Revision ID: a3d6b8f04e21
+Revises: e5a8f3b19c72
+Create Date: 2026-10-18 19:00:00
+
+`flask scans archive` moves scan events past the retention period into
+scan_event_archive, oldest first, using the scan_time index.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3d6b8f04e21'
+down_revision = 'e5a8f3b19c72'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # `flask init` (db.create_all) may already have created it
+    if not sa.inspect(op.get_bind()).has_table('scan_event_archive'):
+        op.create_table(
+            'scan_event_archive',
+            sa.Column('scan_id', sa.String(), nullable=False),
+            sa.Column('asset_id', sa.String(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('room_id', sa.String(), nullable=False),
+            sa.Column('scan_time', sa.DateTime(), nullable=True),
+            sa.Column('status', sa.String(), nullable=False),
+            sa.Column('notes', sa.String(length=120), nullable=True),
+            sa.Column('last_update', sa.DateTime(), nullable=True),
+            sa.Column('changeLog', sa.String(length=200), nullable=True),
+            sa.Column('archived_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('scan_id')
+        )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_scan_event_archive_asset_id_scan_time "
+        "ON scan_event_archive (asset_id, scan_time, scan_id)"
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_scan_event_scan_time ON scan_event (scan_time)")
+
+
+def downgrade():
+    # Put archived events back rather than losing them
+    op.execute(
+        'INSERT INTO scan_event (scan_id, asset_id, user_id, room_id, scan_time, status, notes, last_update, "changeLog") '
+        'SELECT scan_id, asset_id, user_id, room_id, scan_time, status, notes, last_update, "changeLog" FROM scan_event_archive'
+    )
+    op.execute("DROP INDEX IF EXISTS ix_scan_event_scan_time")
+    op.drop_table('scan_event_archive')
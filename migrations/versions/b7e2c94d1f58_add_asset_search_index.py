@@ -0,0 +1,72 @@
+"""Add the asset full-text search index
+
+Revision ID: b7e2c94d1f58
+Revises: a3d6b8f04e21
+Create Date: 2026-10-18 20:00:00
+
+SQLite gets an FTS5 table over the asset rows, kept in step by triggers,
+and filled from the existing assets. Postgres gets a generated, weighted
+tsvector column with a GIN index. `flask init` (db.create_all) creates the
+same objects on a fresh database, so each one is only added if missing.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2c94d1f58'
+down_revision = 'a3d6b8f04e21'
+branch_labels = None
+depends_on = None
+
+COLUMNS = "id, description, model, brand, serial_number, notes"
+NEW_VALUES = "new.id, new.description, new.model, new.brand, new.serial_number, new.notes"
+OLD_VALUES = "old.id, old.description, old.model, old.brand, old.serial_number, old.notes"
+
+SQLITE_UPGRADE = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS asset_fts USING fts5({COLUMNS}, "
+    f"content='asset', content_rowid='rowid', prefix='2 3')",
+    f"CREATE TRIGGER IF NOT EXISTS asset_fts_insert AFTER INSERT ON asset BEGIN "
+    f"INSERT INTO asset_fts (rowid, {COLUMNS}) VALUES (new.rowid, {NEW_VALUES}); END",
+    f"CREATE TRIGGER IF NOT EXISTS asset_fts_delete AFTER DELETE ON asset BEGIN "
+    f"INSERT INTO asset_fts (asset_fts, rowid, {COLUMNS}) VALUES ('delete', old.rowid, {OLD_VALUES}); END",
+    f"CREATE TRIGGER IF NOT EXISTS asset_fts_update AFTER UPDATE OF {COLUMNS} ON asset BEGIN "
+    f"INSERT INTO asset_fts (asset_fts, rowid, {COLUMNS}) VALUES ('delete', old.rowid, {OLD_VALUES}); "
+    f"INSERT INTO asset_fts (rowid, {COLUMNS}) VALUES (new.rowid, {NEW_VALUES}); END",
+    "INSERT INTO asset_fts (asset_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS asset_fts_update",
+    "DROP TRIGGER IF EXISTS asset_fts_delete",
+    "DROP TRIGGER IF EXISTS asset_fts_insert",
+    "DROP TABLE IF EXISTS asset_fts",
+]
+
+POSTGRES_UPGRADE = [
+    "ALTER TABLE asset ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(id, '') || ' ' || coalesce(serial_number, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '') || ' ' || coalesce(model, '') || ' ' "
+    "|| coalesce(brand, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(notes, '')), 'C')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_asset_search_vector ON asset USING GIN (search_vector)",
+]
+
+POSTGRES_DOWNGRADE = [
+    "DROP INDEX IF EXISTS ix_asset_search_vector",
+    "ALTER TABLE asset DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _run(sqlite_statements, postgres_statements):
+    dialect = op.get_bind().dialect.name
+    statements = {'sqlite': sqlite_statements, 'postgresql': postgres_statements}.get(dialect, [])
+    for statement in statements:
+        op.execute(statement)
+
+
+def upgrade():
+    _run(SQLITE_UPGRADE, POSTGRES_UPGRADE)
+
+
+def downgrade():
+    _run(SQLITE_DOWNGRADE, POSTGRES_DOWNGRADE)
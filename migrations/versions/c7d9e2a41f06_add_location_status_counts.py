@@ -0,0 +1,39 @@
+"""Add the location_status_counts table
+
+Revision ID: c7d9e2a41f06
+Revises: 8b41e6d2c5a3
+Create Date: 2026-10-18 17:00:00
+
+Filled from the current assets; from then on every asset write keeps it
+up to date. `flask stats rebuild` recomputes it if it ever drifts.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7d9e2a41f06'
+down_revision = '8b41e6d2c5a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # `flask init` (db.create_all) may already have created it
+    if not sa.inspect(op.get_bind()).has_table('location_status_counts'):
+        op.create_table(
+            'location_status_counts',
+            sa.Column('room_id', sa.String(), nullable=False),
+            sa.Column('status', sa.String(length=120), nullable=False),
+            sa.Column('count', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('room_id', 'status')
+        )
+    op.execute("DELETE FROM location_status_counts")
+    op.execute(
+        "INSERT INTO location_status_counts (room_id, status, count) "
+        "SELECT room_id, status, count(*) FROM asset GROUP BY room_id, status"
+    )
+
+
+def downgrade():
+    op.drop_table('location_status_counts')
@@ -0,0 +1,46 @@
+"""Add an indexed name_key to assignees
+
+Revision ID: d4a1f7c8e3b6
+Revises: b7e2c94d1f58
+Create Date: 2026-10-18 21:00:00
+
+Names are matched on name_key (lower case "first last" with single
+spaces) instead of lower(fname), lower(lname), whose index is dropped.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a1f7c8e3b6'
+down_revision = 'b7e2c94d1f58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    # `flask init` (db.create_all) may already have created it
+    if 'name_key' not in {column['name'] for column in sa.inspect(bind).get_columns('assignee')}:
+        op.add_column('assignee', sa.Column('name_key', sa.String(length=101), nullable=True))
+
+    # Same normalization as App.models.assignee.assignee_name_key
+    assignee = sa.table('assignee', sa.column('id'), sa.column('fname'), sa.column('lname'), sa.column('name_key'))
+    rows = [
+        {'assignee_id': assignee_id, 'name_key': ' '.join(f"{fname or ''} {lname or ''}".split()).lower()}
+        for assignee_id, fname, lname in bind.execute(sa.select(assignee.c.id, assignee.c.fname, assignee.c.lname))
+    ]
+    if rows:
+        bind.execute(
+            assignee.update().where(assignee.c.id == sa.bindparam('assignee_id')).values(name_key=sa.bindparam('name_key')),
+            rows
+        )
+
+    op.execute("CREATE INDEX IF NOT EXISTS ix_assignee_name_key ON assignee (name_key)")
+    op.execute("DROP INDEX IF EXISTS ix_assignee_lower_name")
+
+
+def downgrade():
+    op.execute("CREATE INDEX IF NOT EXISTS ix_assignee_lower_name ON assignee (lower(fname), lower(lname))")
+    op.execute("DROP INDEX IF EXISTS ix_assignee_name_key")
+    op.drop_column('assignee', 'name_key')
@@ -0,0 +1,27 @@
+"""Add scan_id to the asset scan history index
+
+Revision ID: e5a8f3b19c72
+Revises: c7d9e2a41f06
+Create Date: 2026-10-18 18:00:00
+
+Asset history pages order by (scan_time, scan_id); with scan_id in the
+index they are read in index order without a sort.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a8f3b19c72'
+down_revision = 'c7d9e2a41f06'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("DROP INDEX IF EXISTS ix_scan_event_asset_id_scan_time")
+    op.execute("CREATE INDEX ix_scan_event_asset_id_scan_time ON scan_event (asset_id, scan_time, scan_id)")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_scan_event_asset_id_scan_time")
+    op.execute("CREATE INDEX ix_scan_event_asset_id_scan_time ON scan_event (asset_id, scan_time)")
@@ -0,0 +1,46 @@
+"""Add the outbox_message table
+
+Revision ID: f2c8a5d9b147
+Revises: d4a1f7c8e3b6
+Create Date: 2026-10-18 23:00:00
+
+Emails are queued in outbox_message by the request and sent by a
+background sender, or by `flask mail send`.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c8a5d9b147'
+down_revision = 'd4a1f7c8e3b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # `flask init` (db.create_all) may already have created it
+    if not sa.inspect(op.get_bind()).has_table('outbox_message'):
+        op.create_table(
+            'outbox_message',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('subject', sa.String(length=255), nullable=False),
+            sa.Column('recipients', sa.JSON(), nullable=False),
+            sa.Column('html', sa.Text(), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('attempts', sa.Integer(), nullable=False),
+            sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+            sa.Column('claimed_by', sa.String(length=32), nullable=True),
+            sa.Column('last_error', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('sent_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_outbox_message_status_next_attempt_at "
+        "ON outbox_message (status, next_attempt_at)"
+    )
+
+
+def downgrade():
+    op.drop_table('outbox_message')
@@ -13,6 +13,9 @@ from App.controllers.floor import *
 from App.controllers.provider import *
 from App.controllers.room import *
 from App.controllers.scanevent import *
+from App.controllers.status_counts import rebuild_status_counts
+from App.controllers.scan_retention import SCAN_ARCHIVE_BATCH, archive_scan_events, get_scan_retention_cutoff
+from App.controllers.mail import MAIL_BATCH_SIZE, send_outbox
 from App.main import create_app
 from App.controllers import ( create_user, get_all_users_json, get_all_users, initialize )
 
@@ -102,6 +105,43 @@ def list_user_command(format):
 
 app.cli.add_command(asset_cli) # add the group to the cli
 
+stats_cli = AppGroup('stats', help="Dashboard statistics commands")
+
+@stats_cli.command("rebuild", help="Recomputes the location status counts from the assets")
+def rebuild_stats_command():
+    drift = rebuild_status_counts()
+    if not drift:
+        print('Location status counts rebuilt, no drift found')
+        return
+    for room_id, status, stored, actual in drift:
+        print(f'{room_id} {status}: stored {stored}, actual {actual}')
+    print(f'Location status counts rebuilt, fixed {len(drift)} drifted count(s)')
+
+app.cli.add_command(stats_cli) # add the group to the cli
+
+scans_cli = AppGroup('scans', help="Scan event commands")
+
+@scans_cli.command("archive", help="Moves scan events older than the retention period to scan_event_archive")
+@click.option("--days", type=int, default=None, help="Retention period in days (default: SCAN_EVENT_RETENTION_DAYS)")
+@click.option("--batch-size", type=int, default=SCAN_ARCHIVE_BATCH, help="Events moved per transaction")
+@click.option("--max-batches", type=int, default=None, help="Stop after this many batches")
+def archive_scans_command(days, batch_size, max_batches):
+    cutoff = get_scan_retention_cutoff(days)
+    moved = archive_scan_events(cutoff, batch_size=batch_size, max_batches=max_batches)
+    print(f'Archived {moved} scan event(s) older than {cutoff:%Y-%m-%d %H:%M}')
+
+app.cli.add_command(scans_cli) # add the group to the cli
+
+mail_cli = AppGroup('mail', help="Outbound mail commands")
+
+@mail_cli.command("send", help="Sends the emails waiting in the outbox that are due")
+@click.option("--batch-size", type=int, default=MAIL_BATCH_SIZE, help="Emails sent per SMTP connection")
+def send_mail_command(batch_size):
+    sent, failed = send_outbox(batch_size)
+    print(f'Sent {sent} email(s), {failed} failed and will be retried or given up')
+
+app.cli.add_command(mail_cli) # add the group to the cli
+
 '''
 Test Commands
 '''